@@ -1,10 +1,35 @@
+import argparse
 import pathlib
 import csv
-from dataclasses import dataclass
+import heapq
+import io
+import json
+import math
+import operator
+import os
+import shutil
+import sqlite3
+import sys
+import time
+import unicodedata
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from functools import reduce
 from typing import List
 
+def parse_year(year: str) -> int:
+    year = year.strip()
+    return int(year) if year.isdigit() else 0
+
+def parse_rating(rating: str) -> float:
+    try:
+        return float(rating.split('/')[0]) / 100  # Convierte "98/100" a 0.98
+    except (ValueError, IndexError):
+        return 0.0
+
 # --- Clase que representa una película ---
-@dataclass
+@dataclass(slots=True)
 class MovieDto:
     title: str
     year: str
@@ -14,102 +39,737 @@ class MovieDto:
     hulu: bool
     prime_video: bool
     disney_plus: bool
+    # Valores numéricos calculados una sola vez al crear la película
+    year_value: int = field(init=False, repr=False, compare=False)
+    rating_value: float = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.year_value = parse_year(self.year)
+        self.rating_value = parse_rating(self.rating)
 
     def rating_as_float(self) -> float:
-        try:
-            return float(self.rating.split('/')[0]) / 100  # Convierte "98/100" a 0.98
-        except (ValueError, IndexError):
-            return 0.0
+        return self.rating_value
+
+CARPETA = pathlib.Path(__file__).parent
+RUTA_CSV = CARPETA / "movies.csv"
+# Archivo que se distribuye con el repositorio: se lee mientras no exista movies.csv, nunca se escribe
+RUTA_CSV_INCLUIDO = CARPETA / "movies (2).csv"
+
+def ruta_lectura() -> pathlib.Path:
+    """RUTA_CSV, o el archivo incluido si se usa la ruta por defecto y movies.csv todavía no existe"""
+    if RUTA_CSV == CARPETA / "movies.csv" and not RUTA_CSV.exists() and RUTA_CSV_INCLUIDO.exists():
+        return RUTA_CSV_INCLUIDO
+    return RUTA_CSV
+FIELDNAMES = ['Title', 'Release Year', 'Age', 'Rating', 'Netflix', 'Hulu', 'Prime Video', 'Disney+']
+
+# Nombres de columna aceptados para cada campo de MovieDto (sin distinguir mayúsculas)
+COLUMNAS = {
+    'title': ('Title', 'Titulo', 'Título'),
+    'year': ('Release Year', 'Year', 'Año', 'Anio'),
+    'age': ('Age', 'Edad'),
+    'rating': ('Rating', 'Rotten Tomatoes'),
+    'netflix': ('Netflix',),
+    'hulu': ('Hulu',),
+    'prime_video': ('Prime Video', 'Prime', 'Amazon Prime'),
+    'disney_plus': ('Disney+', 'Disney Plus'),
+}
+CAMPOS_OBLIGATORIOS = ('title',)
+
+def mapear_columnas(encabezado: List[str]) -> dict:
+    """Posición de cada campo en el encabezado (None si la columna no está)"""
+    posiciones = {nombre.strip().casefold(): i for i, nombre in enumerate(encabezado)}
+    mapa = {}
+    for campo, alias in COLUMNAS.items():
+        mapa[campo] = next((posiciones[a.casefold()] for a in alias if a.casefold() in posiciones), None)
+    faltantes = [campo for campo in CAMPOS_OBLIGATORIOS if mapa[campo] is None]
+    if faltantes:
+        raise ValueError(f"faltan las columnas: {', '.join(faltantes)}")
+    return mapa
+
+def row_to_movie(row: List[str], mapa: dict) -> MovieDto:
+    def valor(campo: str) -> str:
+        i = mapa[campo]
+        return row[i] if i is not None and i < len(row) else ''
+    return MovieDto(
+        valor('title'),
+        valor('year'),
+        valor('age'),
+        valor('rating'),
+        valor('netflix') == '1',
+        valor('hulu') == '1',
+        valor('prime_video') == '1',
+        valor('disney_plus') == '1',
+    )
 
 # --- Leer archivo CSV ---
-def parse_csv() -> List[MovieDto]:
-    movies = []
+def parse_csv(ruta: pathlib.Path = None) -> List[MovieDto]:
+    ruta = ruta_lectura() if ruta is None else ruta
     try:
-        ruta = pathlib.Path(__file__).parent / "movies.csv"
-        with open(ruta, 'r', encoding='utf-8') as archivo:
-            csv_reader = csv.DictReader(archivo, delimiter=',')
-            for row in csv_reader:
-                movie = MovieDto(
-                    row['Title'],
-                    row['Release Year'],
-                    row['Age'],
-                    row['Rating'],
-                    row['Netflix'] == '1',
-                    row['Hulu'] == '1',
-                    row['Prime Video'] == '1',
-                    row['Disney+'] == '1',
-                )
-                movies.append(movie)
-        return movies
+        with open(ruta, 'r', encoding='utf-8', newline='') as archivo:
+            csv_reader = csv.reader(archivo, delimiter=',')
+            mapa = mapear_columnas(next(csv_reader, []))
+            return [row_to_movie(row, mapa) for row in csv_reader if row]
     except FileNotFoundError:
-        print("Archivo movies.csv no encontrado.")
+        print(f"Archivo {ruta.name} no encontrado.")
+        exit(1)
+    except ValueError as e:
+        print(f"Formato de {ruta.name} no reconocido: {e}")
         exit(1)
 
-# --- Guardar archivo CSV ---
+def encabezado_del_archivo() -> List[str]:
+    """Encabezado actual del CSV, o FIELDNAMES si no existe o no se reconoce"""
+    try:
+        with open(ruta_lectura(), 'r', encoding='utf-8', newline='') as archivo:
+            encabezado = next(csv.reader(archivo), [])
+        mapear_columnas(encabezado)
+    except (FileNotFoundError, ValueError):
+        return FIELDNAMES
+    return FIELDNAMES if encabezado == FIELDNAMES else encabezado
+
+def movie_to_row(movie: MovieDto, encabezado: List[str] = FIELDNAMES) -> list:
+    """Fila en el orden de columnas de `encabezado` (las desconocidas quedan vacías)"""
+    valores = {
+        'title': movie.title,
+        'year': movie.year,
+        'age': movie.age,
+        'rating': movie.rating,
+        'netflix': '1' if movie.netflix else '0',
+        'hulu': '1' if movie.hulu else '0',
+        'prime_video': '1' if movie.prime_video else '0',
+        'disney_plus': '1' if movie.disney_plus else '0',
+    }
+    if encabezado == FIELDNAMES:
+        return list(valores.values())
+    fila = [''] * len(encabezado)
+    for campo, i in mapear_columnas(encabezado).items():
+        if i is not None:
+            fila[i] = valores[campo]
+    return fila
+
+# --- Agregar películas al final del CSV (sin reescribirlo) ---
+def append_csv(nuevas: List[MovieDto]):
+    # Todo el lote se arma en memoria y se escribe con una sola llamada
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    if ruta_lectura() != RUTA_CSV:
+        # Primera escritura: se parte de una copia del archivo incluido
+        shutil.copyfile(ruta_lectura(), RUTA_CSV)
+    try:
+        size = os.path.getsize(RUTA_CSV)
+    except FileNotFoundError:
+        size = 0
+    if size == 0:
+        encabezado = FIELDNAMES
+        writer.writerow(encabezado)
+    else:
+        # Respetar el orden de columnas del archivo existente
+        encabezado = encabezado_del_archivo()
+        with open(RUTA_CSV, 'rb') as archivo:
+            archivo.seek(-1, os.SEEK_END)
+            if archivo.read(1) != b'\n':
+                # La última fila no terminaba en salto de línea
+                buffer.write('\n')
+    writer.writerows(movie_to_row(movie, encabezado) for movie in nuevas)
+
+    with open(RUTA_CSV, 'a', encoding='utf-8', newline='') as archivo:
+        archivo.write(buffer.getvalue())
+
+# --- Guardar archivo CSV completo (solo al compactar) ---
 def save_csv(movies: List[MovieDto]):
-    ruta = pathlib.Path(__file__).parent / "movies.csv"
-    with open(ruta, 'w', encoding='utf-8', newline='') as archivo:
-        fieldnames = ['Title', 'Release Year', 'Age', 'Rating', 'Netflix', 'Hulu', 'Prime Video', 'Disney+']
-        writer = csv.DictWriter(archivo, fieldnames=fieldnames)
-        writer.writeheader()
+    # Se escribe un temporal y se renombra: una caída no deja el CSV a medias
+    temporal = RUTA_CSV.with_name(RUTA_CSV.name + '.tmp')
+    encabezado = encabezado_del_archivo()
+    with open(temporal, 'w', encoding='utf-8', newline='') as archivo:
+        writer = csv.writer(archivo, lineterminator='\n')
+        writer.writerow(encabezado)
+        writer.writerows(movie_to_row(movie, encabezado) for movie in movies)
+        archivo.flush()
+        os.fsync(archivo.fileno())
+    os.replace(temporal, RUTA_CSV)
+
+# --- Índices de bits por plataforma y categoría de edad ---
+PLATAFORMAS = {
+    "Netflix": "netflix",
+    "Hulu": "hulu",
+    "Prime Video": "prime_video",
+    "Disney+": "disney_plus"
+}
+# Categorías de edad de menos a más restrictiva (para consultas "13+ o menor")
+EDADES = ['all', '7+', '13+', '16+', '18+']
+
+def _bitmap(codigos: bytes, codigo: int) -> int:
+    """Entero cuyo bit i vale 1 si codigos[i] == codigo (la conversión se hace en C)"""
+    if not codigos:
+        return 0
+    tabla = bytes(0x31 if i == codigo else 0x30 for i in range(256))  # b'1' / b'0'
+    return int(codigos.translate(tabla)[::-1], 2)
+
+class BitmapIndex:
+    """Bitsets (enteros de Python) donde el bit i representa a la película i.
+
+    Hay uno por plataforma y uno por categoría de edad; las consultas
+    combinadas se resuelven con AND/OR sobre enteros en lugar de recorrer
+    la lista de películas.
+    """
+
+    def __init__(self, movies: List[MovieDto] = ()):
+        plataformas = {atributo: bytearray() for atributo in PLATAFORMAS.values()}
+        edades = bytearray()
+        codigos = {}
         for movie in movies:
-            writer.writerow({
-                'Title': movie.title,
-                'Release Year': movie.year,
-                'Age': movie.age,
-                'Rating': movie.rating,
-                'Netflix': '1' if movie.netflix else '0',
-                'Hulu': '1' if movie.hulu else '0',
-                'Prime Video': '1' if movie.prime_video else '0',
-                'Disney+': '1' if movie.disney_plus else '0',
-            })
+            for atributo, columna in plataformas.items():
+                columna.append(getattr(movie, atributo))
+            codigo = codigos.get(movie.age)
+            if codigo is None:
+                # El código 255 agrupa las categorías que no entran en un byte
+                codigo = codigos[movie.age] = min(len(codigos), 255)
+            edades.append(codigo)
+        self._desde_columnas(plataformas, edades, [e for e, c in codigos.items() if c < 255])
+        if len(codigos) > 255:
+            # Más de 255 categorías distintas (datos sucios): las restantes bit a bit
+            for i, movie in enumerate(movies):
+                if codigos[movie.age] == 255:
+                    self.edades[movie.age] = self.edades.get(movie.age, 0) | 1 << i
+
+    @classmethod
+    def desde_columnas(cls, plataformas: dict, edades: bytes, etiquetas: list) -> 'BitmapIndex':
+        """Construye el índice desde columnas ya codificadas (un byte 0/1 por plataforma
+        y un código de edad por película, con etiquetas[código] = categoría)"""
+        indice = cls.__new__(cls)
+        indice._desde_columnas(plataformas, edades, etiquetas)
+        return indice
+
+    def _desde_columnas(self, plataformas: dict, edades: bytes, etiquetas: list) -> None:
+        self.n = len(edades)
+        self.plataformas = {atributo: _bitmap(bytes(columna), 1) for atributo, columna in plataformas.items()}
+        self.edades = {etiqueta: _bitmap(bytes(edades), codigo) for codigo, etiqueta in enumerate(etiquetas)}
+
+    def agregar(self, movie: MovieDto) -> None:
+        """Agrega la película siguiente (bit n)"""
+        bit = 1 << self.n
+        for atributo in self.plataformas:
+            if getattr(movie, atributo):
+                self.plataformas[atributo] |= bit
+        self.edades[movie.age] = self.edades.get(movie.age, 0) | bit
+        self.n += 1
+
+    def consultar(self, plataformas: List[str], edad: str = 'all', todas: bool = True) -> int:
+        """Bitset de las películas en todas (AND) o alguna (OR) de las plataformas con esa edad.
+
+        edad puede ser una categoría exacta, 'all' (sin filtro) o '<=13+' (esa o menor).
+        """
+        if plataformas:
+            mascara = reduce(operator.and_ if todas else operator.or_,
+                             (self.plataformas[PLATAFORMAS[p]] for p in plataformas))
+        else:
+            mascara = (1 << self.n) - 1
+        if edad == 'all':
+            return mascara
+        if edad.startswith('<='):
+            limite = EDADES.index(edad[2:])
+            edades = reduce(operator.or_, (self.edades.get(e, 0) for e in EDADES[:limite + 1]))
+        else:
+            edades = self.edades.get(edad, 0)
+        return mascara & edades
+
+def posiciones(mascara: int):
+    """Índices de los bits en 1, de menor a mayor"""
+    bits = bin(mascara)[:1:-1]  # sin '0b' y con el bit 0 primero
+    i = bits.find('1')
+    while i >= 0:
+        yield i
+        i = bits.find('1', i + 1)
+
+# --- Índice de títulos por trigramas ---
+def normalizar(texto: str) -> str:
+    """Texto en minúsculas y sin acentos, para comparar títulos"""
+    if texto.isascii():
+        return texto.lower()
+    descompuesto = unicodedata.normalize('NFKD', texto.casefold())
+    return ''.join(c for c in descompuesto if not unicodedata.combining(c))
+
+class TitleIndex:
+    """Títulos normalizados con listas de posiciones por trigrama.
+
+    Responde búsquedas por subcadena y aproximadas (tolerantes a errores de
+    tipeo): la similitud es la fracción de trigramas de la búsqueda que
+    aparecen en el título.
+    """
+
+    NGRAM = 3
+    SIMILITUD_MINIMA = 0.5
+
+    def __init__(self, movies: List[MovieDto] = ()):
+        self.textos = [normalizar(movie.title) for movie in movies]
+        self._postings = postings = {}
+        n = self.NGRAM
+        for i, texto in enumerate(self.textos):
+            for grama in {texto[j:j + n] for j in range(len(texto) - n + 1)}:
+                posting = postings.get(grama)
+                if posting is None:
+                    posting = postings[grama] = array('I')
+                posting.append(i)
+
+    @classmethod
+    def _gramas(cls, texto: str) -> set:
+        return {texto[i:i + cls.NGRAM] for i in range(len(texto) - cls.NGRAM + 1)}
+
+    def agregar(self, movie: MovieDto) -> None:
+        i = len(self.textos)
+        texto = normalizar(movie.title)
+        self.textos.append(texto)
+        for grama in self._gramas(texto):
+            posting = self._postings.get(grama)
+            if posting is None:
+                posting = self._postings[grama] = array('I')
+            posting.append(i)
+
+    def buscar(self, consulta: str) -> list:
+        """Lista de (película, similitud, es_subcadena) sin ordenar"""
+        termino = normalizar(consulta.strip())
+        textos = self.textos
+        if len(termino) < self.NGRAM:
+            # Sin trigramas que comparar: solo coincidencias exactas
+            return [(i, 1.0, True) for i, texto in enumerate(textos) if termino in texto]
+
+        gramas = self._gramas(termino)
+        necesarios = math.ceil(self.SIMILITUD_MINIMA * len(gramas))
+        # Un título con `necesarios` trigramas en común aparece por fuerza en
+        # alguna de las len(gramas) - necesarios + 1 listas más cortas
+        postings = sorted((self._postings.get(grama, ()) for grama in gramas), key=len)
+        candidatos = set()
+        for posting in postings[:len(gramas) - necesarios + 1]:
+            candidatos.update(posting)
+
+        resultados = []
+        for i in candidatos:
+            texto = textos[i]
+            if termino in texto:
+                resultados.append((i, 1.0, True))
+                continue
+            similitud = sum(grama in texto for grama in gramas) / len(gramas)
+            if similitud >= self.SIMILITUD_MINIMA:
+                resultados.append((i, similitud, False))
+        return resultados
+
+# --- Columnas numéricas para consultas por rango ---
+class RangeIndex:
+    """Año y rating en columnas (array) con su orden precalculado.
+
+    Un rango "año entre A y B" o "rating >= X" se resuelve con bisect sobre la
+    columna ordenada, sin recorrer ni parsear las películas.
+    """
+
+    def __init__(self, movies: List[MovieDto] = ()):
+        self.anios = array('i', (movie.year_value for movie in movies))
+        self.ratings = array('d', (movie.rating_value for movie in movies))
+        self._por_anio, self._anios = self._ordenar(self.anios)
+        self._por_rating, self._ratings = self._ordenar(self.ratings)
+
+    @staticmethod
+    def _ordenar(columna: array) -> tuple:
+        ids = array('I', sorted(range(len(columna)), key=columna.__getitem__))
+        return ids, array(columna.typecode, (columna[i] for i in ids))
+
+    def agregar(self, movie: MovieDto) -> None:
+        i = len(self.anios)
+        self.anios.append(movie.year_value)
+        self.ratings.append(movie.rating_value)
+        for ids, claves, valor in ((self._por_anio, self._anios, movie.year_value),
+                                   (self._por_rating, self._ratings, movie.rating_value)):
+            posicion = bisect_right(claves, valor)
+            claves.insert(posicion, valor)
+            ids.insert(posicion, i)
+
+    @staticmethod
+    def _rango(ids: array, claves: array, minimo, maximo) -> array:
+        inicio = 0 if minimo is None else bisect_left(claves, minimo)
+        fin = len(claves) if maximo is None else bisect_right(claves, maximo)
+        return ids[inicio:fin]
+
+    def consultar(self, anio_min: int = None, anio_max: int = None, rating_min: float = None) -> list:
+        """Ids de las películas con año en [anio_min, anio_max] y rating >= rating_min"""
+        por_anio = por_rating = None
+        if anio_min is not None or anio_max is not None:
+            por_anio = self._rango(self._por_anio, self._anios, anio_min, anio_max)
+        if rating_min is not None:
+            por_rating = self._rango(self._por_rating, self._ratings, rating_min, None)
+
+        if por_anio is None and por_rating is None:
+            return list(range(len(self.anios)))
+        if por_rating is None:
+            return list(por_anio)
+        if por_anio is None:
+            return list(por_rating)
+        # Partir del rango más chico y filtrar con la columna del otro
+        if len(por_anio) <= len(por_rating):
+            ratings = self.ratings
+            return [i for i in por_anio if ratings[i] >= rating_min]
+        anios = self.anios
+        minimo = -math.inf if anio_min is None else anio_min
+        maximo = math.inf if anio_max is None else anio_max
+        return [i for i in por_rating if minimo <= anios[i] <= maximo]
+
+    def ordenar(self, ids: list, por: str = 'rating') -> list:
+        """Ids ordenados por rating (mayor primero) o por año (más reciente primero)"""
+        columna = self.ratings if por == 'rating' else self.anios
+        return sorted(ids, key=columna.__getitem__, reverse=True)
+
+class MovieCatalog:
+    """Películas cargadas una sola vez junto con sus índices"""
+
+    def __init__(self, movies: List[MovieDto]):
+        self.movies = movies
+        self.bitmaps = BitmapIndex(movies)
+        self.titulos = TitleIndex(movies)
+        self.rangos = RangeIndex(movies)
+
+    def __len__(self) -> int:
+        return len(self.movies)
+
+    def agregar(self, nuevas: List[MovieDto]) -> None:
+        for movie in nuevas:
+            self.movies.append(movie)
+            self.bitmaps.agregar(movie)
+            self.titulos.agregar(movie)
+            self.rangos.agregar(movie)
+
+    def insertar(self, nuevas: List[MovieDto]) -> None:
+        """Agrega las películas a los índices y al final del CSV"""
+        self.agregar(nuevas)
+        append_csv(nuevas)
+
+    def compactar(self) -> int:
+        save_csv(self.movies)
+        return len(self.movies)
+
+    def por_plataforma(self, plataformas: List[str], edad: str = 'all', todas: bool = True) -> list:
+        """Películas en todas (o alguna) de las plataformas con esa edad, en el orden del archivo"""
+        return [self.movies[i] for i in posiciones(self.bitmaps.consultar(plataformas, edad, todas))]
+
+    def por_anio_y_rating(self, anio_min: int = None, anio_max: int = None, rating_min: float = None,
+                          por: str = 'rating') -> list:
+        ids = self.rangos.ordenar(self.rangos.consultar(anio_min, anio_max, rating_min), por)
+        return [self.movies[i] for i in ids]
+
+    def informe_edades(self) -> dict:
+        """Películas por plataforma y categoría de edad (AND de bitsets + popcount)"""
+        bitmaps = self.bitmaps
+        edades = [e for e in EDADES if e in bitmaps.edades] + [e for e in bitmaps.edades if e not in EDADES]
+        return {
+            plataforma: {_etiqueta_edad(edad): (bitmaps.plataformas[atributo] & bitmaps.edades[edad]).bit_count()
+                         for edad in edades}
+            for plataforma, atributo in PLATAFORMAS.items()
+        }
+
+    def informe_solapamiento(self) -> dict:
+        bitmaps = self.bitmaps.plataformas
+        return {
+            p1: {p2: (bitmaps[a1] & bitmaps[a2]).bit_count() for p2, a2 in PLATAFORMAS.items()}
+            for p1, a1 in PLATAFORMAS.items()
+        }
+
+    def informe_ratings(self) -> dict:
+        """Cada plataforma recorre una sola vez sus películas, ordenadas por rating"""
+        ratings, anios = self.rangos.ratings, self.rangos.anios
+        informe = {}
+        for plataforma, atributo in PLATAFORMAS.items():
+            ids = [i for i in posiciones(self.bitmaps.plataformas[atributo]) if ratings[i] > 0]
+            ids.sort(key=ratings.__getitem__)
+            informe[plataforma] = _estadisticas_por_anio((anios[i], ratings[i]) for i in ids)
+        return informe
+
+    def buscar_titulo(self, consulta: str, limite: int = None) -> tuple:
+        """Total de coincidencias y las `limite` mejores como (película, similitud, es_subcadena),
+        ordenadas por similitud y después por rating"""
+        movies, ratings = self.movies, self.rangos.ratings
+        resultados = self.titulos.buscar(consulta)
+        clave = lambda r: (-r[1], not r[2], -ratings[r[0]], r[0])  # noqa: E731
+        if limite is None or limite >= len(resultados):
+            mejores = sorted(resultados, key=clave)
+        else:
+            mejores = heapq.nsmallest(limite, resultados, key=clave)
+        return len(resultados), [(movies[i], similitud, subcadena) for i, similitud, subcadena in mejores]
+
+# --- Almacenamiento opcional en SQLite (--db) ---
+ESQUEMA_PELICULAS = """
+CREATE TABLE IF NOT EXISTS movies (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    year TEXT NOT NULL,
+    age TEXT NOT NULL,
+    rating TEXT NOT NULL,
+    netflix INTEGER NOT NULL,
+    hulu INTEGER NOT NULL,
+    prime_video INTEGER NOT NULL,
+    disney_plus INTEGER NOT NULL,
+    year_value INTEGER NOT NULL,
+    rating_value REAL NOT NULL,
+    title_norm TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS movies_title ON movies(title);
+CREATE INDEX IF NOT EXISTS movies_year ON movies(year_value);
+CREATE INDEX IF NOT EXISTS movies_rating ON movies(rating_value);
+CREATE INDEX IF NOT EXISTS movies_age ON movies(age);
+""" + ''.join(
+    # Índices parciales: solo las películas de cada plataforma, por edad
+    f"CREATE INDEX IF NOT EXISTS movies_{atributo} ON movies(age) WHERE {atributo} = 1;\n"
+    for atributo in PLATAFORMAS.values())
+
+COLUMNAS_PELICULA = "title, year, age, rating, netflix, hulu, prime_video, disney_plus"
+
+class SqliteMovieCatalog:
+    """Películas guardadas en una base SQLite, con la misma interfaz que MovieCatalog.
+
+    Los filtros usan los índices de la base, los títulos se buscan con una
+    tabla FTS5 (tokenizador trigram, si este SQLite lo trae) y cada lote de
+    inserciones es una sola transacción.
+    """
+
+    def __init__(self, ruta: pathlib.Path):
+        self.ruta = pathlib.Path(ruta)
+        self.conexion = sqlite3.connect(self.ruta)
+        self.conexion.execute("PRAGMA journal_mode=WAL")
+        self.conexion.execute("PRAGMA synchronous=NORMAL")
+        self.conexion.executescript(ESQUEMA_PELICULAS)
+        self.fts = self._crear_fts()
+
+    def _crear_fts(self) -> bool:
+        """Tabla FTS5 de títulos; False si este SQLite no tiene FTS5 o trigram"""
+        existia = self.conexion.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'movies_fts'").fetchone() is not None
+        try:
+            with self.conexion:
+                self.conexion.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS movies_fts USING fts5(title_norm, "
+                    "content='movies', content_rowid='id', tokenize='trigram')")
+                if not existia:
+                    self.conexion.execute("INSERT INTO movies_fts(movies_fts) VALUES ('rebuild')")
+        except sqlite3.OperationalError:
+            return False
+        return True
+
+    def __len__(self) -> int:
+        return self.conexion.execute("SELECT COUNT(*) FROM movies").fetchone()[0]
+
+    def _peliculas(self, consulta: str, parametros=()) -> list:
+        filas = self.conexion.execute(f"SELECT {COLUMNAS_PELICULA} FROM movies " + consulta, parametros)
+        return [MovieDto(t, y, a, r, bool(n), bool(h), bool(p), bool(d)) for t, y, a, r, n, h, p, d in filas]
+
+    def insertar(self, nuevas: List[MovieDto]) -> None:
+        """Inserta el lote en una sola transacción"""
+        with self.conexion:
+            ultimo = self.conexion.execute("SELECT COALESCE(MAX(id), 0) FROM movies").fetchone()[0]
+            self.conexion.executemany(
+                f"INSERT INTO movies ({COLUMNAS_PELICULA}, year_value, rating_value, title_norm) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(m.title, m.year, m.age, m.rating, m.netflix, m.hulu, m.prime_video, m.disney_plus,
+                  m.year_value, m.rating_value, normalizar(m.title)) for m in nuevas])
+            if self.fts:
+                self.conexion.execute("INSERT INTO movies_fts(rowid, title_norm) "
+                                      "SELECT id, title_norm FROM movies WHERE id > ?", (ultimo,))
+
+    def compactar(self) -> int:
+        self.conexion.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self.conexion.execute("VACUUM")
+        return len(self)
+
+    def cerrar(self) -> None:
+        self.conexion.close()
+
+    def buscar_titulo(self, consulta: str, limite: int = None) -> tuple:
+        """Mismo resultado que MovieCatalog.buscar_titulo: subcadenas y títulos parecidos"""
+        termino = normalizar(consulta.strip())
+        if len(termino) < TitleIndex.NGRAM or not self.fts:
+            filas = self.conexion.execute(
+                "SELECT id, title_norm, rating_value FROM movies WHERE instr(title_norm, ?) > 0", (termino,))
+            gramas = TitleIndex._gramas(termino) if len(termino) >= TitleIndex.NGRAM else set()
+        else:
+            # Candidatos: títulos con al menos un trigrama de la búsqueda
+            gramas = TitleIndex._gramas(termino)
+            filas = self.conexion.execute(
+                "SELECT m.id, m.title_norm, m.rating_value FROM movies_fts JOIN movies m "
+                "ON m.id = movies_fts.rowid WHERE movies_fts MATCH ?",
+                (' OR '.join('"' + g.replace('"', '""') + '"' for g in gramas),))
+
+        resultados = []
+        for i, texto, rating in filas:
+            if termino in texto:
+                resultados.append((i, 1.0, True, rating))
+            elif gramas:
+                similitud = sum(grama in texto for grama in gramas) / len(gramas)
+                if similitud >= TitleIndex.SIMILITUD_MINIMA:
+                    resultados.append((i, similitud, False, rating))
+        clave = lambda r: (-r[1], not r[2], -r[3], r[0])  # noqa: E731
+        if limite is None or limite >= len(resultados):
+            mejores = sorted(resultados, key=clave)
+        else:
+            mejores = heapq.nsmallest(limite, resultados, key=clave)
+
+        peliculas = {}
+        if mejores:
+            ids = [r[0] for r in mejores]
+            filas = self.conexion.execute(
+                f"SELECT id, {COLUMNAS_PELICULA} FROM movies WHERE id IN ({','.join('?' * len(ids))})", ids)
+            peliculas = {i: MovieDto(t, y, a, r, bool(n), bool(h), bool(p), bool(d))
+                         for i, t, y, a, r, n, h, p, d in filas}
+        return len(resultados), [(peliculas[i], similitud, subcadena) for i, similitud, subcadena, _ in mejores]
+
+    def por_plataforma(self, plataformas: List[str], edad: str = 'all', todas: bool = True) -> list:
+        """Películas en todas (o alguna) de las plataformas con esa edad, en el orden del archivo"""
+        condiciones, parametros = [], []
+        if plataformas:
+            union = ' AND ' if todas else ' OR '
+            condiciones.append('(' + union.join(f"{PLATAFORMAS[p]} = 1" for p in plataformas) + ')')
+        if edad.startswith('<='):
+            edades = EDADES[:EDADES.index(edad[2:]) + 1]
+            condiciones.append(f"age IN ({','.join('?' * len(edades))})")
+            parametros.extend(edades)
+        elif edad != 'all':
+            condiciones.append("age = ?")
+            parametros.append(edad)
+        where = f"WHERE {' AND '.join(condiciones)} " if condiciones else ''
+        return self._peliculas(where + "ORDER BY id", parametros)
+
+    def por_anio_y_rating(self, anio_min: int = None, anio_max: int = None, rating_min: float = None,
+                          por: str = 'rating') -> list:
+        condiciones, parametros = [], []
+        for condicion, valor in (("year_value >= ?", anio_min), ("year_value <= ?", anio_max),
+                                 ("rating_value >= ?", rating_min)):
+            if valor is not None:
+                condiciones.append(condicion)
+                parametros.append(valor)
+        where = f"WHERE {' AND '.join(condiciones)} " if condiciones else ''
+        orden = "rating_value DESC" if por == 'rating' else "year_value DESC"
+        return self._peliculas(where + f"ORDER BY {orden}, id", parametros)
+
+    def informe_edades(self) -> dict:
+        sumas = ', '.join(f"SUM({atributo})" for atributo in PLATAFORMAS.values())
+        filas = self.conexion.execute(f"SELECT age, {sumas} FROM movies GROUP BY age ORDER BY MIN(id)").fetchall()
+        # Mismo orden de columnas que con los bitsets: las categorías conocidas primero
+        filas.sort(key=lambda fila: EDADES.index(fila[0]) if fila[0] in EDADES else len(EDADES))
+        return {plataforma: {_etiqueta_edad(fila[0]): fila[j + 1] for fila in filas}
+                for j, plataforma in enumerate(PLATAFORMAS)}
+
+    def informe_solapamiento(self) -> dict:
+        pares = [(p1, p2, f"COALESCE(SUM({a1} AND {a2}), 0)")
+                 for p1, a1 in PLATAFORMAS.items() for p2, a2 in PLATAFORMAS.items()]
+        valores = self.conexion.execute(f"SELECT {', '.join(s for _, _, s in pares)} FROM movies").fetchone()
+        informe = {p1: {} for p1 in PLATAFORMAS}
+        for (p1, p2, _), valor in zip(pares, valores):
+            informe[p1][p2] = valor
+        return informe
+
+    def informe_ratings(self) -> dict:
+        return {
+            plataforma: _estadisticas_por_anio(self.conexion.execute(
+                f"SELECT year_value, rating_value FROM movies WHERE {atributo} = 1 AND rating_value > 0 "
+                "ORDER BY rating_value, id"))
+            for plataforma, atributo in PLATAFORMAS.items()
+        }
+
+    def importar_csv(self, ruta: pathlib.Path, tam_lote: int = 5_000) -> int:
+        """Copia el CSV de películas a la base vacía; devuelve cuántas se copiaron"""
+        if len(self):
+            raise ValueError(f"la base {self.ruta} ya tiene películas")
+        peliculas = parse_csv(ruta)
+        for inicio in range(0, len(peliculas), tam_lote):
+            self.insertar(peliculas[inicio:inicio + tam_lote])
+        return len(self)
+
+    def exportar_csv(self) -> int:
+        """Reescribe RUTA_CSV (temporal + rename) con las películas de la base"""
+        peliculas = self._peliculas("ORDER BY id")
+        save_csv(peliculas)
+        return len(peliculas)
 
 # --- Mostrar película encontrada ---
 def mostrar_pelicula(m: MovieDto):
     print(f"{m.title} ({m.year}) - Edad: {m.age} - Rating: {m.rating}")
 
 # --- Opción 1: Buscar por título ---
-def buscar_por_titulo(movies: List[MovieDto]):
-    busqueda = input("Ingrese parte del título de la película: ").lower().strip()
-    encontrados = [m for m in movies if busqueda in m.title.lower()]
+MAX_RESULTADOS_TITULO = 100
+
+def buscar_por_titulo(catalogo: MovieCatalog):
+    busqueda = input("Ingrese parte del título de la película: ").strip()
+    total, encontrados = catalogo.buscar_titulo(busqueda, MAX_RESULTADOS_TITULO)
 
     if encontrados:
-        print(f"\nSe encontraron {len(encontrados)} resultado(s):\n")
-        for m in encontrados:
+        print(f"\nSe encontraron {total} resultado(s):\n")
+        if total > len(encontrados):
+            print(f"(se muestran los {len(encontrados)} más parecidos)\n")
+        for m, similitud, subcadena in encontrados:
+            if not subcadena:
+                print(f"~{similitud:.0%} ", end='')
             mostrar_pelicula(m)
     else:
         print("No se encontraron películas con ese título.")
 
 # --- Opción 2: Buscar por plataforma y categoría ---
-def buscar_por_plataforma_y_categoria(movies: List[MovieDto]):
-    plataformas = {
-        "Netflix": "netflix",
-        "Hulu": "hulu",
-        "Prime Video": "prime_video",
-        "Disney+": "disney_plus"
-    }
-    plataforma = input("Ingrese la plataforma (Netflix, Hulu, Prime Video, Disney+): ").strip()
-    categoria = input("Ingrese la categoría de edad (7+, 13+, 16+, 18+, all): ").strip()
+def buscar_por_plataforma_y_categoria(catalogo: MovieCatalog):
+    plataforma = input("Ingrese la plataforma (Netflix, Hulu, Prime Video, Disney+; "
+                       "combine con & para 'y' o | para 'o'): ").strip()
+    categoria = input("Ingrese la categoría de edad (7+, 13+, 16+, 18+, all; <=13+ para esa o menor): ").strip()
 
-    if plataforma not in plataformas:
+    if '&' in plataforma and '|' in plataforma:
+        print("No se pueden combinar & y | en la misma búsqueda.")
+        return
+    todas = '|' not in plataforma
+    seleccion = [p.strip() for p in plataforma.replace('|', '&').split('&')]
+    if not all(p in PLATAFORMAS for p in seleccion):
         print("Plataforma no válida.")
         return
+    if categoria.startswith('<=') and categoria[2:] not in EDADES:
+        print("Categoría no válida.")
+        return
 
-    encontrados = [
-        m for m in movies
-        if getattr(m, plataformas[plataforma]) and (m.age == categoria or categoria == "all")
-    ]
+    peliculas = catalogo.por_plataforma(seleccion, categoria, todas)
 
-    if encontrados:
-        print(f"\nSe encontraron {len(encontrados)} resultado(s):\n")
-        for m in encontrados:
+    if peliculas:
+        print(f"\nSe encontraron {len(peliculas)} resultado(s):\n")
+        for m in peliculas:
             mostrar_pelicula(m)
     else:
         print("No se encontraron películas para esa plataforma y categoría.")
 
+# --- Opción 6: Buscar por rango de año y rating mínimo ---
+def leer_entero(mensaje: str):
+    texto = input(mensaje).strip()
+    return int(texto) if texto else None
+
+def leer_rating(mensaje: str):
+    """Acepta 80, 80/100 o 0.8; devuelve el valor en la escala de rating_as_float"""
+    texto = input(mensaje).strip()
+    if not texto:
+        return None
+    if '/' in texto:
+        return parse_rating(texto)
+    valor = float(texto)
+    return valor / 100 if valor > 1 else valor
+
+def buscar_por_anio_y_rating(catalogo: MovieCatalog):
+    try:
+        anio_min = leer_entero("Año desde (vacío = sin límite): ")
+        anio_max = leer_entero("Año hasta (vacío = sin límite): ")
+        rating_min = leer_rating("Rating mínimo, por ejemplo 80 o 80/100 (vacío = sin límite): ")
+    except ValueError:
+        print("Valor no válido.")
+        return
+    orden = input("Ordenar por (rating/año) [rating]: ").strip().lower()
+
+    peliculas = catalogo.por_anio_y_rating(anio_min, anio_max, rating_min,
+                                           'año' if orden in ('año', 'anio') else 'rating')
+    if peliculas:
+        print(f"\nSe encontraron {len(peliculas)} resultado(s):\n")
+        for m in peliculas:
+            mostrar_pelicula(m)
+    else:
+        print("No se encontraron películas en ese rango.")
+
 # --- Opción 3: Insertar una nueva película ---
-def insertar_pelicula(movies: List[MovieDto]):
-    title = input("Ingrese el título de la película: ").strip()
+def leer_pelicula(title: str = None) -> MovieDto:
+    if title is None:
+        title = input("Ingrese el título de la película: ").strip()
     year = input("Ingrese el año de lanzamiento: ").strip()
     age = input("Ingrese la categoría de edad (7+, 13+, 16+, 18+): ").strip()
     rating = input("Ingrese el rating (por ejemplo, 85/100): ").strip()
@@ -117,35 +777,250 @@ def insertar_pelicula(movies: List[MovieDto]):
     hulu = input("¿Está disponible en Hulu? (s/n): ").strip().lower() == 's'
     prime_video = input("¿Está disponible en Prime Video? (s/n): ").strip().lower() == 's'
     disney_plus = input("¿Está disponible en Disney+? (s/n): ").strip().lower() == 's'
+    return MovieDto(title, year, age, rating, netflix, hulu, prime_video, disney_plus)
 
-    nueva_pelicula = MovieDto(title, year, age, rating, netflix, hulu, prime_video, disney_plus)
-    movies.append(nueva_pelicula)
-    save_csv(movies)
+def insertar_pelicula(catalogo: MovieCatalog):
+    nueva_pelicula = leer_pelicula()
+    catalogo.insertar([nueva_pelicula])
     print("Película agregada exitosamente.")
 
+# --- Opción 4: Insertar varias películas (una sola escritura por lote) ---
+def insertar_varias_peliculas(catalogo: MovieCatalog):
+    lote = []
+    while True:
+        print(f"\nPelícula {len(lote) + 1}:")
+        title = input("Ingrese el título de la película (vacío para terminar): ").strip()
+        if not title:
+            break
+        lote.append(leer_pelicula(title))
+
+    if not lote:
+        print("No se agregaron películas.")
+        return
+    catalogo.insertar(lote)
+    print(f"{len(lote)} película(s) agregada(s) exitosamente.")
+
+# --- Opción 5: Compactar el archivo (reescritura completa y atómica) ---
+def compactar_csv(catalogo: MovieCatalog):
+    print(f"Archivo reescrito con {catalogo.compactar()} películas.")
+
+# --- Opción 7: Informes por plataforma ---
+def _etiqueta_edad(edad: str) -> str:
+    return edad or 'sin categoría'
+
+def _estadisticas(valores: list) -> dict:
+    """Cantidad, media y mediana de una lista ya ordenada"""
+    n = len(valores)
+    mitad = n // 2
+    mediana = valores[mitad] if n % 2 else (valores[mitad - 1] + valores[mitad]) / 2
+    return {'n': n, 'media': sum(valores) / n, 'mediana': mediana}
+
+def _estadisticas_por_anio(pares) -> dict:
+    """Estadísticas total y por año de pares (año, rating) ya ordenados por rating:
+    así cada grupo por año queda ordenado y la mediana sale sin ordenar de nuevo"""
+    valores, por_anio = [], {}
+    for anio, rating in pares:
+        valores.append(rating)
+        por_anio.setdefault(anio, []).append(rating)
+    return {
+        'total': _estadisticas(valores) if valores else None,
+        'por_anio': {anio: _estadisticas(v) for anio, v in sorted(por_anio.items())},
+    }
+
+def informe_edades(catalogo: MovieCatalog) -> dict:
+    """Películas por plataforma y categoría de edad"""
+    return catalogo.informe_edades()
+
+def informe_solapamiento(catalogo: MovieCatalog) -> dict:
+    """Películas disponibles a la vez en cada par de plataformas"""
+    return catalogo.informe_solapamiento()
+
+def informe_ratings(catalogo: MovieCatalog) -> dict:
+    """Media y mediana del rating por plataforma y por año (sin las películas sin rating)"""
+    return catalogo.informe_ratings()
+
+INFORMES = {
+    'edades': informe_edades,
+    'ratings': informe_ratings,
+    'solapamiento': informe_solapamiento,
+}
+
+def medir(funcion, *args):
+    inicio = time.perf_counter()
+    resultado = funcion(*args)
+    return resultado, time.perf_counter() - inicio
+
+def _tabla(filas: dict, ancho: int = 14) -> None:
+    """Imprime {fila: {columna: valor}} como tabla"""
+    columnas = list(next(iter(filas.values())))
+    print(f"{'':<{ancho}}" + ''.join(f"{c:>{ancho}}" for c in columnas))
+    for fila, valores in filas.items():
+        print(f"{fila:<{ancho}}" + ''.join(f"{valores[c]:>{ancho}}" for c in columnas))
+
+def mostrar_informe(tipo: str, resultado: dict) -> None:
+    if tipo == 'edades':
+        print("\nPelículas por plataforma y categoría de edad:\n")
+        _tabla(resultado)
+    elif tipo == 'solapamiento':
+        print("\nPelículas compartidas entre plataformas (la diagonal es el total de cada una):\n")
+        _tabla(resultado)
+    else:
+        print("\nRating por plataforma (media / mediana sobre 100, cantidad de películas):\n")
+        formato = lambda e: f"{e['media'] * 100:.1f}/{e['mediana'] * 100:.0f} ({e['n']})" if e else '-'  # noqa: E731
+        _tabla({'Total': {p: formato(r['total']) for p, r in resultado.items()}}, ancho=20)
+        anios = sorted({anio for r in resultado.values() for anio in r['por_anio']})
+        print()
+        _tabla({anio or 'sin año': {p: formato(r['por_anio'].get(anio)) for p, r in resultado.items()}
+                for anio in anios}, ancho=20)
+
+def ver_informes(catalogo: MovieCatalog):
+    print("\nInformes:")
+    print("1 - Películas por plataforma y categoría de edad")
+    print("2 - Rating medio y mediano por plataforma y año")
+    print("3 - Solapamiento entre plataformas")
+    tipo = {'1': 'edades', '2': 'ratings', '3': 'solapamiento'}.get(input("Seleccione un informe: ").strip())
+    if tipo is None:
+        print("Opción no válida.")
+        return
+    resultado, segundos = medir(INFORMES[tipo], catalogo)
+    mostrar_informe(tipo, resultado)
+    print(f"\nCalculado en {segundos * 1000:.1f} ms sobre {len(catalogo)} películas.")
+
+# --- Perfilado opcional (profiling.py, en la raíz del repositorio) ---
+FUNCIONES_PERFILADAS = [
+    'open', 'print', 'parse_csv', 'row_to_movie', 'parse_year', 'parse_rating', 'append_csv',
+    'save_csv', 'BitmapIndex.__init__', 'BitmapIndex.consultar', 'posiciones', 'TitleIndex.__init__',
+    'TitleIndex.buscar', 'RangeIndex.__init__', 'RangeIndex.consultar', 'RangeIndex.ordenar',
+    'MovieCatalog.buscar_titulo', 'mostrar_pelicula', 'mostrar_informe', 'SqliteMovieCatalog.buscar_titulo',
+    'SqliteMovieCatalog.por_plataforma', 'SqliteMovieCatalog.por_anio_y_rating', 'SqliteMovieCatalog.insertar',
+]
+# Opciones del menú e informes: agrupan lo que se mide mientras corren
+COMANDOS_PERFILADOS = [
+    'buscar_por_titulo', 'buscar_por_plataforma_y_categoria', 'insertar_pelicula',
+    'insertar_varias_peliculas', 'compactar_csv', 'buscar_por_anio_y_rating', 'ver_informes',
+    'informe_edades', 'informe_ratings', 'informe_solapamiento', 'migrar_catalogo',
+]
+
+def perfilado_pedido(bandera: bool = False) -> bool:
+    """Mismo criterio que profiling.requested, sin importar el módulo"""
+    return bandera or os.environ.get('PROFILE', '') not in ('', '0') or bool(os.environ.get('PROFILE_DUMP'))
+
+def activar_perfilado(bandera: bool = False, volcado: str = None) -> bool:
+    """Envuelve las funciones calientes si se pidió con --profile o PROFILE=1"""
+    if not perfilado_pedido(bandera or volcado is not None):
+        return False
+    sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+    import profiling
+    profiling.instrument(globals(), FUNCIONES_PERFILADAS, COMANDOS_PERFILADOS, dump_path=volcado)
+    # INFORMES guarda las funciones originales
+    INFORMES.update({tipo: globals()[funcion.__name__] for tipo, funcion in INFORMES.items()})
+    return True
+
 # --- Menú principal ---
-def menu():
-    movies = parse_csv()
+def menu(catalogo: MovieCatalog = None):
+    # Los índices se construyen una sola vez después de leer el CSV
+    if catalogo is None:
+        catalogo = MovieCatalog(parse_csv())
     while True:
         print("\nMenú:")
         print("1 - Buscar por título")
         print("2 - Buscar por plataforma y categoría")
         print("3 - Insertar una nueva película")
-        print("4 - Salir")
+        print("4 - Insertar varias películas")
+        print("5 - Compactar archivo")
+        print("6 - Buscar por año y rating")
+        print("7 - Informes por plataforma")
+        print("8 - Salir")
         opcion = input("Seleccione una opción: ").strip()
 
         if opcion == "1":
-            buscar_por_titulo(movies)
+            buscar_por_titulo(catalogo)
         elif opcion == "2":
-            buscar_por_plataforma_y_categoria(movies)
+            buscar_por_plataforma_y_categoria(catalogo)
         elif opcion == "3":
-            insertar_pelicula(movies)
+            insertar_pelicula(catalogo)
         elif opcion == "4":
+            insertar_varias_peliculas(catalogo)
+        elif opcion == "5":
+            compactar_csv(catalogo)
+        elif opcion == "6":
+            buscar_por_anio_y_rating(catalogo)
+        elif opcion == "7":
+            ver_informes(catalogo)
+        elif opcion == "8":
             print("Saliendo del programa...")
             break
         else:
             print("Opción no válida. Intente nuevamente.")
 
+# --- Línea de comandos ---
+def migrar_catalogo(ruta_db: pathlib.Path, sentido: str) -> int:
+    """Copia única de las películas del CSV a la base SQLite o al revés"""
+    if sentido == 'a-csv' and not ruta_db.exists():
+        print(f"La base {ruta_db} no existe.", file=sys.stderr)
+        return 1
+    catalogo = SqliteMovieCatalog(ruta_db)
+    try:
+        if sentido == 'a-db':
+            cantidad, segundos = medir(catalogo.importar_csv, ruta_lectura())
+        else:
+            cantidad, segundos = medir(catalogo.exportar_csv)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        catalogo.cerrar()
+    print(f"{cantidad} películas copiadas en {segundos:.2f}s ({sentido}).")
+    return 0
+
+def cli(argv: List[str] = None) -> int:
+    global RUTA_CSV
+    parser = argparse.ArgumentParser(description="Catálogo de películas. Sin subcomando abre el menú interactivo.")
+    parser.add_argument('--csv', type=pathlib.Path,
+                        help="archivo de películas (por defecto, movies.csv junto al programa; "
+                             "mientras no exista se lee movies (2).csv)")
+    parser.add_argument('--db', type=pathlib.Path, metavar='ARCHIVO',
+                        help="usar una base SQLite en lugar del CSV (crearla con el comando migrar)")
+    parser.add_argument('--profile', action='store_true',
+                        help="medir las funciones calientes e imprimir un desglose al salir (o PROFILE=1)")
+    parser.add_argument('--profile-dump', metavar='ARCHIVO',
+                        help="guardar además un volcado de cProfile (o PROFILE_DUMP=ARCHIVO)")
+    subparsers = parser.add_subparsers(dest='comando')
+    informe = subparsers.add_parser('informe', help="informes por plataforma")
+    informe.add_argument('tipo', choices=list(INFORMES) + ['todos'])
+    informe.add_argument('--json', action='store_true', help="una línea JSON por informe")
+    migrar = subparsers.add_parser('migrar', help="copiar las películas entre el CSV y la base de --db")
+    migrar.add_argument('sentido', choices=['a-db', 'a-csv'],
+                        help="a-db: del CSV a una base vacía; a-csv: reescribe el CSV desde la base")
+    args = parser.parse_args(argv)
+
+    if args.csv is not None:
+        RUTA_CSV = args.csv
+    activar_perfilado(args.profile, args.profile_dump)
+    if args.comando == 'migrar':
+        if args.db is None:
+            parser.error("migrar necesita --db")
+        return migrar_catalogo(args.db, args.sentido)
+
+    if args.db is not None:
+        cargar = lambda: SqliteMovieCatalog(args.db)  # noqa: E731
+    else:
+        cargar = lambda: MovieCatalog(parse_csv())  # noqa: E731
+    if args.comando is None:
+        menu(cargar())
+        return 0
+
+    catalogo, segundos = medir(cargar)
+    print(f"Catálogo cargado en {segundos:.2f}s ({len(catalogo)} películas)", file=sys.stderr)
+    for tipo in (INFORMES if args.tipo == 'todos' else [args.tipo]):
+        resultado, segundos = medir(INFORMES[tipo], catalogo)
+        if args.json:
+            print(json.dumps({'informe': tipo, 'segundos': segundos, 'resultado': resultado}, ensure_ascii=False))
+        else:
+            mostrar_informe(tipo, resultado)
+            print(f"\nCalculado en {segundos * 1000:.1f} ms.")
+    return 0
+
 # --- Ejecutar el programa ---
 if __name__ == "__main__":
-    menu()
\ No newline at end of file
+    sys.exit(cli())
\ No newline at end of file
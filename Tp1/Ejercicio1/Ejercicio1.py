@@ -1,14 +1,90 @@
-import re
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+# Un bit por condición, en el mismo orden que la lista de validate_string
+WORD, ALPHA, UPPER, LOWER, DIGIT, LONG = (1 << i for i in range(6))
+FLAG_COUNT = 6
+MIN_LENGTH = 8
+
+def _class_table() -> bytes:
+    """Clase de cada byte ASCII; cualquier otro carácter no cuenta para ninguna condición"""
+    table = bytearray(256)
+    for c in range(ord('A'), ord('Z') + 1):
+        table[c] = WORD | ALPHA | UPPER
+    for c in range(ord('a'), ord('z') + 1):
+        table[c] = WORD | ALPHA | LOWER
+    for c in range(ord('0'), ord('9') + 1):
+        table[c] = WORD | DIGIT
+    table[ord('_')] = WORD
+    return bytes(table)
+
+CLASS_TABLE = _class_table()
+
+def classify(input_string) -> int:
+    """Las seis condiciones empaquetadas en un entero, recorriendo la cadena una sola vez"""
+    # translate pasa cada carácter a su clase; quedan a lo sumo cinco clases distintas
+    flags = 0
+    for char_class in set(input_string.encode('ascii', 'replace').translate(CLASS_TABLE)):
+        flags |= char_class
+    return flags | LONG if len(input_string) >= MIN_LENGTH else flags
+
+def unpack_flags(flags: int) -> list:
+    return [bool(flags & (1 << i)) for i in range(FLAG_COUNT)]
 
 def validate_string(input_string):
-    return [
-        bool(re.search(r'[a-zA-Z0-9_]', input_string)), 
-        bool(re.search(r'[a-zA-Z]', input_string)), 
-        bool (re.search(r'[A-Z]', input_string)), 
-        bool(re.search(r'[a-z]', input_string)), 
-        bool(re.search(r'[0-9]', input_string)), 
-        len(input_string) >= 8
-        ]
-
-print(validate_string("xYz8")) # [True, False, False, False, True, True]
-    
\ No newline at end of file
+    return unpack_flags(classify(input_string))
+
+def classify_batch(strings) -> bytes:
+    """Un byte de condiciones por cadena"""
+    return bytes(map(classify, strings))
+
+def _line_chunks(file, chunk_lines: int):
+    chunk = []
+    for line in file:
+        chunk.append(line.rstrip('\r\n'))
+        if len(chunk) == chunk_lines:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def classify_file(path, processes: int = 1, chunk_lines: int = 100_000) -> bytes:
+    """Un byte de condiciones por línea del archivo ('-' para stdin), en orden"""
+    file = sys.stdin if path == '-' else open(path, 'r', encoding='utf-8', errors='replace')
+    try:
+        chunks = _line_chunks(file, chunk_lines)
+        if processes <= 1:
+            return b''.join(map(classify_batch, chunks))
+
+        results, pending = [], deque()
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            for chunk in chunks:
+                pending.append(pool.submit(classify_batch, chunk))
+                # Pocos bloques en vuelo para no leer todo el archivo a memoria
+                if len(pending) >= processes * 2:
+                    results.append(pending.popleft().result())
+            results.extend(future.result() for future in pending)
+        return b''.join(results)
+    finally:
+        if file is not sys.stdin:
+            file.close()
+
+def flag_counts(flags: bytes) -> list:
+    """Cuántas cadenas cumplen cada condición"""
+    # Se cuentan los valores distintos (a lo sumo 64) en lugar de cada cadena
+    values = [0] * (1 << FLAG_COUNT)
+    for value in set(flags):
+        values[value] = flags.count(value)
+    return [sum(count for value, count in enumerate(values) if value & (1 << i))
+            for i in range(FLAG_COUNT)]
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        flags = classify_file(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 1)
+        names = ['alfanumérico o _', 'letra', 'mayúscula', 'minúscula', 'dígito', f'largo >= {MIN_LENGTH}']
+        print(f"Cadenas: {len(flags):,}")
+        for name, count in zip(names, flag_counts(flags)):
+            print(f"{name:<18}{count:>12,}")
+    else:
+        print(validate_string("xYz8")) # [True, True, True, True, True, False]
@@ -1,28 +1,157 @@
+import argparse
+import mmap
+import os
+import pathlib
 import re
-from collections import Counter
+import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 
 #Ejercicio hecho por: Alexander Ovalle, Maximo Catalan 
 
+OCTETO = r'(25[0-5]|2[0-4][0-9]|1?[0-9]{1,2})'
+PATRON_EMAIL = re.compile(r'^[a-zA-Z][a-zA-Z0-9_.-]*@[a-zA-Z]+\.(com|net|org|edu|gov)\.(arg|cl|es|mx|eeuu)$')
+DOMINIOS_URL = 'com|net|org|edu|gov'
+PATRON_URL = re.compile(rf'^(https?:\/\/)?(www\.)?[a-zA-Z0-9.-]+\.({DOMINIOS_URL})(\/|\?.*)?$')
+PATRON_IPV4 = re.compile(rf'^{OCTETO}\.{OCTETO}\.{OCTETO}\.{OCTETO}$')
+
 def validar_email(email):
-    patron = re.compile(r'^[a-zA-Z][a-zA-Z0-9_.-]*@[a-zA-Z]+\.(com|net|org|edu|gov)\.(arg|cl|es|mx|eeuu)$')
-    return bool(patron.match(email))
+    return bool(PATRON_EMAIL.match(email))
 
 def validar_url(url):
-    patron = re.compile(r'^(https?:\/\/)?(www\.)?[a-zA-Z0-9.-]+\.(com|net|org|edu|gov)(\/|\?.*)?$')
-    return bool(patron.match(url))
+    return bool(PATRON_URL.match(url))
 
 def validar_ipv4(ip):
-    patron = re.compile(r'^(25[0-5]|2[0-4][0-9]|1?[0-9]{1,2})\.(25[0-5]|2[0-4][0-9]|1?[0-9]{1,2})\.'
-                        r'(25[0-5]|2[0-4][0-9]|1?[0-9]{1,2})\.(25[0-5]|2[0-4][0-9]|1?[0-9]{1,2})$')
-    return bool(patron.match(ip))
+    return bool(PATRON_IPV4.match(ip))
+
+PATRON_PALABRA = re.compile(r'\b\w+\b')
+# Tamaño de cada bloque leído (se corta en un salto de línea o espacio, así
+# ninguna palabra ni carácter UTF-8 queda partido entre dos bloques)
+TAM_BLOQUE = 8 << 20
+# Por debajo de este tamaño no compensa levantar procesos
+MIN_BYTES_PARALELO = 32 << 20
+
+def _contar_bloque(bloque: bytes) -> Counter:
+    # Los bytes inválidos se reemplazan (U+FFFD no es parte de ninguna palabra)
+    return Counter(PATRON_PALABRA.findall(bloque.decode('utf-8', errors='replace').lower()))
+
+def _aplicar_a_rango(funcion, archivo, inicio: int, fin: int, *args):
+    """Aplica funcion a un rango del archivo abriéndolo por su cuenta (se ejecuta en el pool)"""
+    with open(archivo, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as datos:
+        return funcion(datos[inicio:fin], *args)
+
+def _corte(datos, inicio: int, fin: int) -> int:
+    """Última posición de corte segura (después de un salto de línea o espacio), o -1"""
+    corte = datos.rfind(b'\n', inicio, fin)
+    if corte < 0:
+        corte = datos.rfind(b' ', inicio, fin)
+    return corte + 1 if corte >= 0 else -1
+
+def rangos_de_bloques(datos, tam_bloque: int = TAM_BLOQUE):
+    """(inicio, fin) de bloques de unos tam_bloque bytes sobre datos mapeados en memoria"""
+    inicio, total = 0, len(datos)
+    while inicio < total:
+        fin = min(inicio + tam_bloque, total)
+        if fin < total:
+            corte = _corte(datos, inicio, fin)
+            while corte < 0 and fin < total:
+                # Ningún separador en el bloque: extenderlo hasta encontrar uno
+                fin = min(fin + tam_bloque, total)
+                corte = _corte(datos, fin - tam_bloque, fin)
+            fin = corte if corte > 0 else total
+        yield inicio, fin
+        inicio = fin
+
+def bloques_de_flujo(f, tam_bloque: int = TAM_BLOQUE):
+    """Bloques leídos secuencialmente de un archivo binario (o stdin) sin palabras partidas"""
+    resto = b''
+    while True:
+        leido = f.read(tam_bloque)
+        if not leido:
+            break
+        datos = resto + leido
+        corte = _corte(datos, 0, len(datos))
+        if corte < 0:
+            resto = datos
+            continue
+        resto = datos[corte:]
+        yield datos[:corte]
+    if resto:
+        yield resto
+
+def _en_orden(pool, tareas, limite: int):
+    """Envía tareas (función, args) al pool con un máximo en vuelo y devuelve sus resultados"""
+    pendientes = deque()
+    for funcion, *args in tareas:
+        pendientes.append(pool.submit(funcion, *args))
+        if len(pendientes) >= limite:
+            yield pendientes.popleft().result()
+    while pendientes:
+        yield pendientes.popleft().result()
+
+def _procesos_por_defecto(archivo) -> int:
+    if archivo == '-' or os.path.getsize(archivo) < MIN_BYTES_PARALELO:
+        return 1
+    return os.cpu_count() or 1
+
+def procesar_por_bloques(archivo, funcion, *args, procesos: int = 1,
+                         tam_bloque: int = TAM_BLOQUE, usar_mmap: bool = True):
+    """Devuelve funcion(bloque, *args) para cada bloque del archivo, en orden.
+
+    La memoria queda acotada por el tamaño de bloque. Con usar_mmap cada
+    proceso mapea su propio rango del archivo; sin mmap (o con '-' para stdin)
+    los bloques se leen en orden y se envían al pool.
+    """
+    if archivo == '-':
+        f, usar_mmap = open(sys.stdin.fileno(), 'rb', closefd=False), False
+    else:
+        f = open(archivo, 'rb')
+    with f:
+        if usar_mmap:
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as datos:
+                rangos = list(rangos_de_bloques(datos, tam_bloque))
+                if procesos <= 1:
+                    for inicio, fin in rangos:
+                        yield funcion(datos[inicio:fin], *args)
+                    return
+            tareas = ((_aplicar_a_rango, funcion, archivo, inicio, fin, *args) for inicio, fin in rangos)
+        else:
+            bloques = bloques_de_flujo(f, tam_bloque)
+            if procesos <= 1:
+                for bloque in bloques:
+                    yield funcion(bloque, *args)
+                return
+            tareas = ((funcion, bloque, *args) for bloque in bloques)
+
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            yield from _en_orden(pool, tareas, procesos * 2)
+
+def contar_frecuencias(archivo, procesos: int = None, tam_bloque: int = TAM_BLOQUE,
+                       usar_mmap: bool = True) -> Counter:
+    """Frecuencia de cada palabra (en minúsculas) leyendo el archivo por bloques.
+
+    La memoria queda acotada por el tamaño de bloque y el vocabulario.
+    """
+    if procesos is None:
+        procesos = _procesos_por_defecto(archivo)
+    contador = Counter()
+    for parcial in procesar_por_bloques(archivo, _contar_bloque, procesos=procesos,
+                                        tam_bloque=tam_bloque, usar_mmap=usar_mmap):
+        contador.update(parcial)
+    return contador
+
+def palabras_mas_comunes(archivo, k: int = 10, **opciones):
+    """Total de palabras y las k más repetidas"""
+    contador = contar_frecuencias(archivo, **opciones)
+    return contador.total(), contador.most_common(k)
 
 def contar_palabras(archivo):
-    with open(archivo, 'r', encoding='utf-8') as f:
-        texto = f.read().lower()
-        palabras = re.findall(r'\b\w+\b', texto)
-        contador = Counter(palabras)
-        palabra_mas_comun = contador.most_common(1)
-        return len(palabras), palabra_mas_comun[0] if palabra_mas_comun else (None, 0)
+    total, mas_comunes = palabras_mas_comunes(archivo, 1)
+    return total, mas_comunes[0] if mas_comunes else (None, 0)
 
 def analizar_archivo(archivo, funcion_validadora):
     with open(archivo, 'r', encoding='utf-8') as f:
@@ -31,6 +160,73 @@ def analizar_archivo(archivo, funcion_validadora):
             resultado = "Válido" if funcion_validadora(cadena) else "Inválido"
             print(f"{cadena}: {resultado}")
 
+# Candidatos en texto libre; cada uno se valida después con su validador
+CANDIDATOS = {
+    # Con esquema o www., o un dominio sin ellos terminado en uno de DOMINIOS_URL (como acepta PATRON_URL)
+    'url': r'\b(?:https?://|www\.)[^\s"\'<>]+'
+           rf'|(?<![\w.@/-])[\w-]+(?:\.[\w-]+)*\.(?:{DOMINIOS_URL})(?![\w-])[^\s"\'<>]*',
+    'email': r'(?<![\w.+-])[\w.+-]+@[\w-]+(?:\.[\w-]+)+',
+    'ipv4': r'(?<![\w.])\d{1,3}(?:\.\d{1,3}){3}(?!\.?\w)',
+}
+VALIDADORES = {'email': validar_email, 'url': validar_url, 'ipv4': validar_ipv4}
+# Puntuación que cierra una oración y no forma parte de la URL
+PUNTUACION_FINAL = '.,;:!?)]}'
+
+@lru_cache(maxsize=None)
+def _patron_candidatos(tipos: tuple):
+    # Un solo patrón con un grupo por tipo: una pasada por el texto
+    return re.compile('|'.join(f'(?P<{tipo}>{CANDIDATOS[tipo]})' for tipo in tipos))
+
+def _escanear_bloque(bloque: bytes, tipos: tuple):
+    """Saltos de línea del bloque, si termina en uno y los (tipo, válido, valor) hallados"""
+    texto = bloque.decode('utf-8', errors='replace')
+    hallazgos = []
+    for coincidencia in _patron_candidatos(tipos).finditer(texto):
+        tipo, valor = coincidencia.lastgroup, coincidencia.group()
+        if tipo == 'url':
+            valor = valor.rstrip(PUNTUACION_FINAL)
+        hallazgos.append((tipo, VALIDADORES[tipo](valor), valor))
+    return texto.count('\n'), texto.endswith('\n'), hallazgos
+
+def escanear(archivo, tipos=tuple(CANDIDATOS), salida=None, procesos: int = None,
+             tam_bloque: int = TAM_BLOQUE, usar_mmap: bool = True) -> dict:
+    """Busca emails, URLs e IPv4 en texto libre (un log, '-' para stdin).
+
+    Cuenta válidos e inválidos por tipo y, si se indica salida, escribe cada
+    hallazgo como "tipo<TAB>válido|inválido<TAB>valor" en el orden del archivo.
+    """
+    tipos = tuple(tipos)
+    if procesos is None:
+        procesos = _procesos_por_defecto(archivo)
+    conteos = {tipo: {'validos': 0, 'invalidos': 0} for tipo in tipos}
+    lineas, termina_en_salto = 0, True
+    inicio = time.perf_counter()
+    destino = open(salida, 'w', encoding='utf-8') if salida else None
+    try:
+        for saltos, termina_en_salto, hallazgos in procesar_por_bloques(
+                archivo, _escanear_bloque, tipos, procesos=procesos,
+                tam_bloque=tam_bloque, usar_mmap=usar_mmap):
+            lineas += saltos
+            for tipo, valido, _ in hallazgos:
+                conteos[tipo]['validos' if valido else 'invalidos'] += 1
+            if destino:
+                destino.write(''.join(f"{tipo}\t{'válido' if valido else 'inválido'}\t{valor}\n"
+                                      for tipo, valido, valor in hallazgos))
+    finally:
+        if destino:
+            destino.close()
+    if not termina_en_salto:
+        lineas += 1
+    segundos = time.perf_counter() - inicio
+    return {'lineas': lineas, 'segundos': segundos,
+            'lineas_por_segundo': lineas / segundos if segundos else 0.0, 'tipos': conteos}
+
+def mostrar_escaneo(resumen: dict) -> None:
+    print(f"Líneas: {resumen['lineas']:,} en {resumen['segundos']:.2f}s "
+          f"({resumen['lineas_por_segundo']:,.0f} líneas/s)")
+    for tipo, conteo in resumen['tipos'].items():
+        print(f"{tipo:<6} válidos: {conteo['validos']:>10,}  inválidos: {conteo['invalidos']:>10,}")
+
 def menu():
     while True:
         print("\n--- MENÚ ---")
@@ -38,7 +234,8 @@ def menu():
         print("2. Validar URLs")
         print("3. Validar IPv4")
         print("4. Contar palabras en un texto")
-        print("5. Salir")
+        print("5. Palabras más frecuentes de un archivo")
+        print("6. Salir")
         opcion = input("Seleccione una opción: ")
         
         if opcion == "1":
@@ -56,10 +253,74 @@ def menu():
             print(f"Total de palabras: {num_palabras}")
             print(f"Palabra más repetida: '{palabra_mas_repetida[0]}' con {palabra_mas_repetida[1]} apariciones")
         elif opcion == "5":
+            ruta = input("Ruta del archivo (Enter para texto.txt): ").strip() or "texto.txt"
+            k = input("Cantidad de palabras a mostrar (Enter para 10): ").strip()
+            try:
+                total, mas_comunes = palabras_mas_comunes(ruta, int(k) if k else 10)
+            except (OSError, ValueError) as e:
+                print(f"No se pudo contar: {e}")
+                continue
+            print(f"Total de palabras: {total}")
+            for posicion, (palabra, cantidad) in enumerate(mas_comunes, 1):
+                print(f"{posicion}. '{palabra}' con {cantidad} apariciones")
+        elif opcion == "6":
             print("Saliendo...")
             break
         else:
             print("Opción no válida. Intente nuevamente.")
 
+# --- Perfilado opcional (profiling.py, en la raíz del repositorio) ---
+FUNCIONES_PERFILADAS = [
+    'open', 'print', 'validar_email', 'validar_url', 'validar_ipv4', 'procesar_por_bloques',
+    'contar_frecuencias', '_contar_bloque', '_escanear_bloque',
+]
+# Opciones del menú y subcomandos: agrupan lo que se mide mientras corren
+COMANDOS_PERFILADOS = ['analizar_archivo', 'contar_palabras', 'palabras_mas_comunes', 'escanear']
+# Su primer argumento es el bloque de bytes leído
+FUNCIONES_POR_BLOQUE = ['_contar_bloque', '_escanear_bloque']
+
+def perfilado_pedido(bandera: bool = False) -> bool:
+    """Mismo criterio que profiling.requested, sin importar el módulo"""
+    return bandera or os.environ.get('PROFILE', '') not in ('', '0') or bool(os.environ.get('PROFILE_DUMP'))
+
+def activar_perfilado(bandera: bool = False, volcado: str = None) -> bool:
+    """Envuelve las funciones calientes si se pidió con --profile o PROFILE=1"""
+    if not perfilado_pedido(bandera or volcado is not None):
+        return False
+    sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2]))
+    import profiling
+    profiling.instrument(globals(), FUNCIONES_PERFILADAS, COMANDOS_PERFILADOS,
+                         sized=FUNCIONES_POR_BLOQUE, dump_path=volcado)
+    # VALIDADORES guarda las funciones originales
+    VALIDADORES.update({tipo: globals()[funcion.__name__] for tipo, funcion in VALIDADORES.items()})
+    return True
+
+def cli(argv=None):
+    parser = argparse.ArgumentParser(description="Validadores de emails, URLs e IPv4 y conteo de palabras")
+    parser.add_argument('--profile', action='store_true',
+                        help="medir las funciones calientes e imprimir un desglose al salir (o PROFILE=1)")
+    parser.add_argument('--profile-dump', metavar='ARCHIVO',
+                        help="guardar además un volcado de cProfile (o PROFILE_DUMP=ARCHIVO)")
+    subparsers = parser.add_subparsers(dest='comando')
+    escaneo = subparsers.add_parser('escanear', help="buscar emails, URLs e IPv4 en un log")
+    escaneo.add_argument('archivo', help="archivo a escanear ('-' para stdin)")
+    escaneo.add_argument('-t', '--tipos', nargs='+', choices=list(CANDIDATOS), default=list(CANDIDATOS))
+    escaneo.add_argument('-o', '--salida', help="archivo donde escribir cada valor encontrado")
+    escaneo.add_argument('-p', '--procesos', type=int, help="procesos en paralelo (por defecto según el tamaño)")
+    escaneo.add_argument('--bloque', type=int, default=TAM_BLOQUE, help="bytes por bloque")
+    args = parser.parse_args(argv)
+    activar_perfilado(args.profile, args.profile_dump)
+
+    if args.comando is None:
+        menu()
+        return 0
+    try:
+        resumen = escanear(args.archivo, args.tipos, args.salida, args.procesos, args.bloque)
+    except OSError as e:
+        print(f"No se pudo escanear: {e}", file=sys.stderr)
+        return 1
+    mostrar_escaneo(resumen)
+    return 0
+
 if __name__ == "__main__":
-    menu()
+    sys.exit(cli())
@@ -0,0 +1,60 @@
+"""Benchmark: memoria por canción de list[SongDto] vs el SongCatalog completo.
+
+Carga el mismo music.csv sintético de las dos formas y mide con tracemalloc
+lo que queda en memoria: la lista que devolvía parse_csv y el catálogo
+entero (almacén columnar, índice de búsqueda e índice de artistas), con el
+desglose de cada parte.
+
+Uso: python benchmarks/bench_memory.py [--size 200000]
+"""
+import argparse
+import gc
+import pathlib
+import tempfile
+import tracemalloc
+
+from synthetic import write_music_csv
+from final import ArtistIndex, QueryCache, SearchIndex, SongCatalog, load_song_store, parse_csv
+
+def measure(build) -> tuple:
+    """Memoria retenida por la estructura que devuelve build()"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=200_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = pathlib.Path(tmp) / 'music.csv'
+        write_music_csv(csv_path, args.size)
+
+        songs, list_bytes = measure(lambda: parse_csv(csv_path))
+        catalog, catalog_bytes = measure(
+            lambda: SongCatalog(csv_path, use_snapshot=False, cache=QueryCache(maxsize=0)))
+        catalog.close()
+        assert catalog.songs[args.size - 1] == songs[-1]
+        del songs, catalog
+
+        (store, _), store_bytes = measure(lambda: load_song_store(csv_path, use_snapshot=False))
+        _, search_bytes = measure(lambda: SearchIndex(store))
+        _, artist_bytes = measure(lambda: ArtistIndex(store))
+
+    per_song = lambda size: size / args.size  # noqa: E731
+    print(f"Canciones: {args.size:,}")
+    print(f"list[SongDto]:       {per_song(list_bytes):8.1f} bytes/canción")
+    print(f"SongCatalog:         {per_song(catalog_bytes):8.1f} bytes/canción")
+    print(f"  SongStore:         {per_song(store_bytes):8.1f}")
+    print(f"  SearchIndex:       {per_song(search_bytes):8.1f}")
+    print(f"  ArtistIndex:       {per_song(artist_bytes):8.1f}")
+    print(f"Reducción (catálogo):{list_bytes / catalog_bytes:8.1f}x")
+    print(f"Reducción (almacén): {list_bytes / store_bytes:8.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Benchmark: filtros por plataforma y edad con BitmapIndex vs recorrido lineal.
+
+Genera las columnas de un catálogo sintético de películas (un byte por
+plataforma y un código de edad por película) sin crear objetos MovieDto, para
+poder llegar a 10M de películas en memoria.
+
+Uso: python benchmarks/bench_movies_bitmap.py [--size 10000000]
+"""
+import argparse
+import time
+
+from synthetic import AGE_LABELS, synthetic_movie_columns
+from Programa1 import EDADES, PLATAFORMAS, BitmapIndex, posiciones
+
+# Mismo orden que EDADES, más la edad vacía
+ETIQUETAS_EDAD = AGE_LABELS
+
+CONSULTAS = [
+    (['Netflix'], '13+', True),
+    (['Netflix', 'Hulu'], '<=13+', True),
+    (['Prime Video', 'Disney+'], '18+', False),
+    (['Netflix', 'Hulu', 'Prime Video', 'Disney+'], 'all', False),
+]
+
+def lineal(plataformas: dict, edades: bytes, seleccion: list, edad: str, todas: bool) -> list:
+    """Recorrido por película como el filtro original (getattr + comparación de la edad)"""
+    columnas = [plataformas[PLATAFORMAS[p]] for p in seleccion]
+    combinar = all if todas else any
+    if edad == 'all':
+        permitidas = set(range(len(ETIQUETAS_EDAD)))
+    elif edad.startswith('<='):
+        permitidas = set(range(EDADES.index(edad[2:]) + 1))
+    else:
+        permitidas = {ETIQUETAS_EDAD.index(edad)}
+    return [i for i, codigo in enumerate(edades)
+            if codigo in permitidas and combinar(columna[i] for columna in columnas)]
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=10_000_000)
+    args = parser.parse_args()
+
+    (plataformas, edades), elapsed = timed(synthetic_movie_columns, args.size, PLATAFORMAS)
+    print(f"Catálogo sintético: {args.size:,} películas ({elapsed:.1f}s)")
+    indice, elapsed = timed(BitmapIndex.desde_columnas, plataformas, edades, ETIQUETAS_EDAD)
+    print(f"Construcción de los bitsets: {elapsed:.2f}s\n")
+
+    print(f"{'consulta':<44}{'resultados':>12}{'lineal (s)':>12}{'bitset (ms)':>13}{'posiciones (s)':>16}")
+    for seleccion, edad, todas in CONSULTAS:
+        nombre = f"{(' & ' if todas else ' | ').join(seleccion)}, {edad}"
+        esperado, lineal_time = timed(lineal, plataformas, edades, seleccion, edad, todas)
+        mascara, bitset_time = timed(indice.consultar, seleccion, edad, todas)
+        resultado, posiciones_time = timed(lambda m: list(posiciones(m)), mascara)
+        if resultado != esperado or mascara.bit_count() != len(esperado):
+            print(f"  aviso: resultados distintos para {nombre!r}")
+        print(f"{nombre:<44}{len(esperado):>12,}{lineal_time:>12.2f}"
+              f"{bitset_time * 1000:>13.2f}{posiciones_time:>16.2f}")
+
+if __name__ == "__main__":
+    main()
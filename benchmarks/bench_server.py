@@ -0,0 +1,120 @@
+"""Benchmark de tasa de peticiones contra music_server.py en localhost.
+
+Abre varias conexiones keep-alive y reparte entre ellas una mezcla de
+búsquedas, tops y álbumes; informa peticiones/segundo y percentiles de latencia.
+
+Uso:
+    python benchmarks/bench_server.py --start --csv music.csv   (levanta el servicio)
+    python benchmarks/bench_server.py --port 8080               (servicio ya corriendo)
+"""
+import argparse
+import asyncio
+import json
+import pathlib
+import random
+import subprocess
+import sys
+import time
+from urllib.parse import quote
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+QUERIES = ['gor', 'love', 'the', 'shakira', 'daft', 'queen', 'night', 'a', 'bad bunny', 'xyzw']
+
+async def request(reader, writer, path: str) -> int:
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode('latin-1'))
+    await writer.drain()
+    status_line = await reader.readline()
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    await reader.readexactly(length)
+    return int(status_line.split()[1])
+
+async def client(host: str, port: int, paths: list, latencies: list, errors: list) -> None:
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for path in paths:
+            start = time.perf_counter()
+            status = await request(reader, writer, path)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+def build_paths(total: int, seed: int = 42) -> list:
+    rng = random.Random(seed)
+    paths = []
+    for _ in range(total):
+        query = quote(rng.choice(QUERIES))
+        paths.append(rng.choice([f"/search?q={query}&limit=20", f"/top?artist={query}&n=5",
+                                 f"/albums?artist={query}"]))
+    return paths
+
+async def wait_for_port(host: str, port: int, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.2)
+
+async def run(args) -> dict:
+    await wait_for_port(args.host, args.port, args.startup_timeout)
+    paths = build_paths(args.requests)
+    latencies, errors = [], []
+    per_client = [paths[i::args.connections] for i in range(args.connections)]
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(args.host, args.port, chunk, latencies, errors) for chunk in per_client))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    percentile = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))]  # noqa: E731
+    return {
+        'requests': len(latencies),
+        'connections': args.connections,
+        'errors': len(errors),
+        'seconds': elapsed,
+        'requests_per_second': len(latencies) / elapsed,
+        'p50_ms': percentile(0.50),
+        'p95_ms': percentile(0.95),
+        'p99_ms': percentile(0.99),
+        'max_ms': latencies[-1],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de tasa de peticiones del servicio musical")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--requests', type=int, default=5_000)
+    parser.add_argument('--connections', type=int, default=16)
+    parser.add_argument('--start', action='store_true', help="levantar music_server.py durante la prueba")
+    parser.add_argument('--csv', help="music.csv a servir (con --start)")
+    parser.add_argument('--startup-timeout', type=float, default=120.0)
+    args = parser.parse_args()
+
+    server = None
+    if args.start:
+        command = [sys.executable, str(ROOT / 'music_server.py'), '--host', args.host, '--port', str(args.port)]
+        if args.csv:
+            command += ['--csv', args.csv]
+        server = subprocess.Popen(command)
+    try:
+        print(json.dumps(asyncio.run(run(args)), indent=2))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Benchmark: validate_string original (cinco re.search) vs clasificación en una pasada.
+
+Genera cadenas parecidas a un volcado de credenciales e identificadores y
+mide cadenas/segundo de cada variante, verificando que coincidan.
+
+Uso: python benchmarks/bench_string_classes.py [--size 1000000] [--processes 4]
+"""
+import argparse
+import pathlib
+import re
+import tempfile
+import time
+
+from synthetic import synthetic_strings
+from Ejercicio1 import classify, classify_batch, classify_file, validate_string
+
+def original_validate_string(input_string):
+    """Copia de la versión original (cinco re.search y un len)"""
+    return [
+        bool(re.search(r'[a-zA-Z0-9_]', input_string)),
+        bool(re.search(r'[a-zA-Z]', input_string)),
+        bool(re.search(r'[A-Z]', input_string)),
+        bool(re.search(r'[a-z]', input_string)),
+        bool(re.search(r'[0-9]', input_string)),
+        len(input_string) >= 8
+    ]
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=1_000_000)
+    parser.add_argument('--processes', type=int, default=4)
+    args = parser.parse_args()
+
+    strings = synthetic_strings(args.size)
+    expected, original_time = timed(lambda: [original_validate_string(s) for s in strings])
+    # Las variantes empaquetadas se desempaquetan fuera de la medición para comparar
+    unpack = lambda flags: [[bool(f & (1 << i)) for i in range(6)] for f in flags]  # noqa: E731
+    identity = lambda result: result  # noqa: E731
+
+    with tempfile.NamedTemporaryFile('w', encoding='utf-8', suffix='.txt', delete=False) as dump:
+        dump.write('\n'.join(strings) + '\n')
+    try:
+        runs = {
+            'original (re.search)': ((expected, original_time), identity),
+            'validate_string()': (timed(lambda: [validate_string(s) for s in strings]), identity),
+            'classify()': (timed(lambda: [classify(s) for s in strings]), unpack),
+            'classify_batch()': (timed(lambda: classify_batch(strings)), unpack),
+            'classify_file()': (timed(lambda: classify_file(dump.name)), unpack),
+            f'classify_file() x{args.processes}': (timed(lambda: classify_file(dump.name, args.processes)), unpack),
+        }
+    finally:
+        pathlib.Path(dump.name).unlink()
+
+    print(f"Cadenas: {args.size:,}\n")
+    print(f"{'variante':<24}{'seg':>10}{'cadenas/s':>14}{'vs original':>14}")
+    for name, ((result, elapsed), to_lists) in runs.items():
+        if to_lists(result) != expected:
+            print(f"  aviso: {name} no coincide con el original")
+        print(f"{name:<24}{elapsed:>10.3f}{args.size / elapsed:>14,.0f}{original_time / elapsed:>13.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Microbenchmark: validate_song_data original vs SongValidator (por fila, por lote y rápido).
+
+Uso: python benchmarks/bench_validation.py [--size 100000] [--invalid 0.3]
+"""
+import argparse
+import contextlib
+import os
+import re
+import time
+
+from synthetic import synthetic_song_records
+from final import SongValidator
+
+def original_validate_song_data(data: dict):
+    """Copia de la versión original (patrones por llamada y print en cada fallo)"""
+    patterns = {
+        'artist': r'^[A-Za-z0-9\s\.\,\-\_\'\&\(\)]+$',
+        'track': r'^[A-Za-z0-9\s\.\,\-\_\'\&\(\)]+$',
+        'album': r'^[A-Za-z0-9\s\.\,\-\_\'\&\(\)]+$',
+        'spotify_uri': r'^spotify:(track|album|playlist|artist|show|episode):[a-zA-Z0-9]{22}$',
+        'duration_ms': r'^\d+$',
+        'spotify_url': r'^https://open\.spotify\.com/(intl-[a-z]{2}/)?((track|album|playlist|artist|show|episode)/[a-zA-Z0-9]{22})(\?.*)?$',
+        'youtube_url': r'^https://(www\.)?(youtube\.com/watch\?v=|youtu\.be/)[a-zA-Z0-9_\-]{11}.*$',
+        'likes': r'^\d+(\.\d+)?$',
+        'views': r'^\d+(\.\d+)?$'
+    }
+    for field, pattern in patterns.items():
+        if field in data and data[field]:
+            if not re.match(pattern, str(data[field])):
+                print(f"Formato inválido para {field}: {data[field]}")
+                return False
+    if 'likes' in data and 'views' in data and data['likes'] and data['views']:
+        try:
+            if float(data['likes']) > float(data['views']):
+                print("Error: Los likes no pueden ser más que las vistas.")
+                return False
+        except ValueError:
+            print("Error: Los likes y vistas deben ser valores numéricos.")
+            return False
+    return True
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=100_000)
+    parser.add_argument('--invalid', type=float, default=0.3, help="fracción de filas inválidas")
+    args = parser.parse_args()
+
+    records = synthetic_song_records(args.size, args.invalid)
+    regex_validator = SongValidator()
+    fast_validator = SongValidator(fast=True)
+
+    # Los print del original van a /dev/null para no medir la terminal
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        expected, original_time = timed(lambda: [original_validate_song_data(r) for r in records])
+
+    runs = {
+        'original (print)': (expected, original_time),
+        'validate() regex': timed(lambda: [regex_validator.validate(r) == 0 for r in records]),
+        'validate() rápido': timed(lambda: [fast_validator.validate(r) == 0 for r in records]),
+        'lote regex': timed(lambda: [m == 0 for m in regex_validator.validate_batch(records)]),
+        'lote rápido': timed(lambda: [m == 0 for m in fast_validator.validate_batch(records)]),
+    }
+
+    print(f"Registros: {args.size:,} ({sum(not ok for ok in expected):,} inválidos)\n")
+    print(f"{'variante':<20}{'seg':>10}{'filas/s':>14}{'vs original':>14}")
+    for name, (result, elapsed) in runs.items():
+        if result != expected:
+            print(f"  aviso: {name} no coincide con el original")
+        print(f"{name:<20}{elapsed:>10.3f}{args.size / elapsed:>14,.0f}{original_time / elapsed:>13.1f}x")
+
+if __name__ == "__main__":
+    main()
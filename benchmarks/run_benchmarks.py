@@ -0,0 +1,336 @@
+"""Suite de benchmarks reproducible para final.py, Programa1.py y los ejercicios del Tp1.
+
+Genera una sola vez los datos sintéticos de la escala pedida (ver
+synthetic.py), mide carga, búsqueda, top, álbumes, inserción, conteo de
+palabras y validación (la búsqueda y la inserción también sobre el almacenamiento
+SQLite), y guarda los resultados en JSON para comparar corridas:
+
+    python benchmarks/run_benchmarks.py run --scale 1m -o base.json
+    python benchmarks/run_benchmarks.py run --scale 1m -o nuevo.json --baseline base.json
+    python benchmarks/run_benchmarks.py compare base.json nuevo.json [--threshold 0.15]
+
+compare (y run con --baseline) termina con código 1 si alguna medición es
+más lenta que la base por encima del umbral.
+"""
+import argparse
+import dataclasses
+import datetime
+import itertools
+import json
+import os
+import pathlib
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+from synthetic import (KNOWN_ARTISTS, ROOT, ensure_file, synthetic_song_records, synthetic_strings,
+                       write_access_log, write_movies_csv, write_music_csv, write_text_corpus)
+
+import final
+import Programa1
+from Ejercicio1 import classify_batch
+from Ejercicio3 import contar_frecuencias, escanear
+
+SCALES = {'10k': 10_000, '1m': 1_000_000, '10m': 10_000_000}
+SUITES = ['music', 'movies', 'sqlite', 'text', 'validation']
+# El corpus de texto crece con la escala: unos 100 bytes por fila
+TEXT_BYTES_PER_ROW = 100
+# Tope de registros en memoria para los validadores por lote
+MAX_RECORDS = 1_000_000
+
+SONG_QUERIES = ['gor', 'shakira', 'love', 'the', 'song 4242', 'björk', 'zq', 'daft punk', 'xyzw']
+MOVIE_QUERIES = ['love', 'the last', 'nigth', 'secret island', 'x', 'king of the city']
+PLATFORM_QUERIES = [
+    (['Netflix'], '13+', True),
+    (['Netflix', 'Hulu'], '<=13+', True),
+    (['Prime Video', 'Disney+'], '18+', False),
+]
+RANGE_QUERIES = [(2000, 2010, None), (None, None, 0.9), (1990, 1999, 0.5)]
+
+class Recorder:
+    """Mide funciones y acumula {nombre: {'seconds', 'count', 'per_second'}}"""
+
+    def __init__(self, repeat: int):
+        self.repeat = repeat
+        self.results = {}
+
+    def measure(self, name: str, func, repeat: int = None) -> None:
+        """func() devuelve la cantidad procesada; se guarda la mejor de repeat corridas"""
+        best = None
+        for _ in range(repeat or self.repeat):
+            start = time.perf_counter()
+            count = func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        self.results[name] = {'seconds': best, 'count': count,
+                              'per_second': count / best if best else None}
+        print(f"  {name:<34}{best * 1000:>12.2f} ms{count:>14,}", file=sys.stderr)
+
+def remove_derived(csv_path: pathlib.Path) -> None:
+    """Borra snapshot, metadatos y WAL que final.py deja junto al CSV"""
+    for path in (final.snapshot_path(csv_path), final.index_meta_path(csv_path), final.wal_path(csv_path)):
+        path.unlink(missing_ok=True)
+
+def music_suite(recorder: Recorder, data_dir: pathlib.Path, rows: int, seed: int) -> None:
+    csv_path = ensure_file(data_dir, f"music-{rows}-{seed}.csv", write_music_csv, rows, seed)
+    remove_derived(csv_path)
+    no_cache = lambda: final.QueryCache(maxsize=0)  # noqa: E731
+
+    def load_csv():
+        catalog = final.SongCatalog(csv_path, use_snapshot=False, cache=no_cache())
+        catalog.close()
+        return len(catalog.songs)
+
+    # Arranque original (list[SongDto] sin índices): referencia para las dos cargas siguientes
+    recorder.measure('music.load_baseline', lambda: len(final.parse_csv(csv_path)), repeat=1)
+    recorder.measure('music.load_csv', load_csv, repeat=1)
+    # La primera carga con snapshot lo escribe; la segunda lo lee
+    final.SongCatalog(csv_path, use_snapshot=True, cache=no_cache()).close()
+    catalog = None
+
+    def load_snapshot():
+        nonlocal catalog
+        catalog = final.SongCatalog(csv_path, use_snapshot=True, cache=no_cache())
+        return len(catalog.songs)
+
+    recorder.measure('music.load_snapshot', load_snapshot, repeat=1)
+    try:
+        recorder.measure('music.search_all', lambda: sum(len(list(catalog.search(q))) for q in SONG_QUERIES))
+        recorder.measure('music.search_first_page', lambda: sum(
+            len(list(itertools.islice(catalog.search(q), final.SEARCH_PAGE_SIZE))) for q in SONG_QUERIES))
+        recorder.measure('music.top', lambda: sum(len(catalog.top_songs(a, 5)) for a in KNOWN_ARTISTS))
+        recorder.measure('music.albums', lambda: sum(len(catalog.albums(a)) for a in KNOWN_ARTISTS))
+
+        records = synthetic_song_records(1_100, invalid_ratio=0.0, seed=seed)
+        next_index = catalog.next_index()
+        song_rows = [final.build_song_row(next_index + i, data) for i, data in enumerate(records)]
+
+        def insert_grouped():
+            # Como el servicio: escribir sin fsync y un solo fsync al final
+            for row in song_rows[:1_000]:
+                catalog.insert_rows([row], sync=False)
+            catalog.log.sync()
+            return 1_000
+
+        def insert_durable():
+            for row in song_rows[1_000:]:
+                catalog.insert_rows([row])
+            return len(song_rows) - 1_000
+
+        recorder.measure('music.insert_grouped', insert_grouped, repeat=1)
+        recorder.measure('music.insert_fsync', insert_durable, repeat=1)
+    finally:
+        catalog.close()
+        # Las inserciones quedan solo en el WAL: borrarlo deja el CSV como se generó
+        remove_derived(csv_path)
+
+def movies_suite(recorder: Recorder, data_dir: pathlib.Path, rows: int, seed: int) -> None:
+    csv_path = ensure_file(data_dir, f"movies-{rows}-{seed}.csv", write_movies_csv, rows, seed)
+    movies = None
+    catalog = None
+
+    def load():
+        nonlocal movies
+        movies = Programa1.parse_csv(csv_path)
+        return len(movies)
+
+    def build_indexes():
+        nonlocal catalog
+        catalog = Programa1.MovieCatalog(movies)
+        return len(movies)
+
+    recorder.measure('movies.load_csv', load, repeat=1)
+    recorder.measure('movies.build_indexes', build_indexes, repeat=1)
+    recorder.measure('movies.title_search', lambda: sum(
+        catalog.buscar_titulo(q, Programa1.MAX_RESULTADOS_TITULO)[0] for q in MOVIE_QUERIES))
+    recorder.measure('movies.platform_filter', lambda: sum(
+        len(list(Programa1.posiciones(catalog.bitmaps.consultar(*q)))) for q in PLATFORM_QUERIES))
+    recorder.measure('movies.year_rating_range', lambda: sum(
+        len(catalog.rangos.ordenar(catalog.rangos.consultar(*q))) for q in RANGE_QUERIES))
+    for name, report in Programa1.INFORMES.items():
+        recorder.measure(f'movies.report_{name}', lambda report=report: len(report(catalog)))
+
+    # Inserción: un lote de 1.000 películas agregado al final de un CSV aparte
+    new_movies = [dataclasses.replace(movie) for movie in movies[:1_000]]
+    original_path = Programa1.RUTA_CSV
+    with tempfile.TemporaryDirectory() as tmp:
+        Programa1.RUTA_CSV = pathlib.Path(tmp) / 'movies.csv'
+
+        def insert():
+            Programa1.append_csv(new_movies)
+            catalog.agregar(new_movies)
+            return len(new_movies)
+
+        try:
+            recorder.measure('movies.insert_batch', insert, repeat=1)
+        finally:
+            Programa1.RUTA_CSV = original_path
+
+def sqlite_suite(recorder: Recorder, data_dir: pathlib.Path, rows: int, seed: int) -> None:
+    """Las mismas consultas sobre el almacenamiento opcional en SQLite (--db)"""
+    music_csv = ensure_file(data_dir, f"music-{rows}-{seed}.csv", write_music_csv, rows, seed)
+    movies_csv = ensure_file(data_dir, f"movies-{rows}-{seed}.csv", write_movies_csv, rows, seed)
+    remove_derived(music_csv)
+    with tempfile.TemporaryDirectory() as tmp:
+        songs = final.SqliteSongCatalog(pathlib.Path(tmp) / 'music.db')
+        movies = Programa1.SqliteMovieCatalog(pathlib.Path(tmp) / 'movies.db')
+        try:
+            recorder.measure('sqlite.music_migrate', lambda: songs.import_csv(music_csv), repeat=1)
+            recorder.measure('sqlite.music_search_all', lambda: sum(
+                len(list(songs.search(q))) for q in SONG_QUERIES))
+            recorder.measure('sqlite.music_search_first_page', lambda: sum(
+                len(list(itertools.islice(songs.search(q), final.SEARCH_PAGE_SIZE))) for q in SONG_QUERIES))
+            recorder.measure('sqlite.music_top', lambda: sum(len(songs.top_songs(a, 5)) for a in KNOWN_ARTISTS))
+            recorder.measure('sqlite.music_albums', lambda: sum(len(songs.albums(a)) for a in KNOWN_ARTISTS))
+            records = synthetic_song_records(1_000, invalid_ratio=0.0, seed=seed)
+            next_index = songs.next_index()
+            song_rows = [final.build_song_row(next_index + i, data) for i, data in enumerate(records)]
+            recorder.measure('sqlite.music_insert_batch', lambda: songs.insert_rows(song_rows) or len(song_rows),
+                             repeat=1)
+
+            recorder.measure('sqlite.movies_migrate', lambda: movies.importar_csv(movies_csv), repeat=1)
+            recorder.measure('sqlite.movies_title_search', lambda: sum(
+                movies.buscar_titulo(q, Programa1.MAX_RESULTADOS_TITULO)[0] for q in MOVIE_QUERIES))
+            recorder.measure('sqlite.movies_platform_filter', lambda: sum(
+                len(movies.por_plataforma(*q)) for q in PLATFORM_QUERIES))
+            recorder.measure('sqlite.movies_year_rating_range', lambda: sum(
+                len(movies.por_anio_y_rating(*q)) for q in RANGE_QUERIES))
+        finally:
+            songs.close()
+            movies.cerrar()
+            # import_csv pliega el WAL y puede dejar el snapshot: volver al CSV tal como se generó
+            remove_derived(music_csv)
+
+def text_suite(recorder: Recorder, data_dir: pathlib.Path, rows: int, seed: int) -> None:
+    size = rows * TEXT_BYTES_PER_ROW
+    corpus = ensure_file(data_dir, f"texto-{size}-{seed}.txt", write_text_corpus, size, seed)
+    corpus_bytes = corpus.stat().st_size
+
+    def count(processes: int):
+        contar_frecuencias(corpus, procesos=processes)
+        return corpus_bytes
+
+    recorder.measure('text.word_count', lambda: count(1), repeat=1)
+    if (os.cpu_count() or 1) > 1:
+        recorder.measure('text.word_count_parallel', lambda: count(os.cpu_count()), repeat=1)
+
+def validation_suite(recorder: Recorder, data_dir: pathlib.Path, rows: int, seed: int) -> None:
+    log = ensure_file(data_dir, f"access-{rows}-{seed}.log", write_access_log, rows, seed)
+    recorder.measure('validation.scan_log', lambda: escanear(log, procesos=1)['lineas'], repeat=1)
+
+    records = synthetic_song_records(min(rows, MAX_RECORDS), invalid_ratio=0.3, seed=seed)
+    validator = final.SongValidator(fast=True)
+    recorder.measure('validation.song_batch', lambda: len(validator.validate_batch(records)))
+    del records
+
+    strings = synthetic_strings(min(rows, MAX_RECORDS), seed)
+    recorder.measure('validation.string_classes', lambda: len(classify_batch(strings)))
+
+SUITE_FUNCTIONS = {
+    'music': music_suite,
+    'movies': movies_suite,
+    'sqlite': sqlite_suite,
+    'text': text_suite,
+    'validation': validation_suite,
+}
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(args) -> dict:
+    rows = SCALES[args.scale]
+    recorder = Recorder(args.repeat)
+    for suite in args.only:
+        print(f"[{suite}] {rows:,} filas", file=sys.stderr)
+        SUITE_FUNCTIONS[suite](recorder, args.data_dir, rows, args.seed)
+    return {
+        'meta': {
+            'scale': args.scale, 'rows': rows, 'seed': args.seed, 'repeat': args.repeat,
+            'date': datetime.datetime.now().isoformat(timespec='seconds'), 'commit': git_commit(),
+            'python': platform.python_version(), 'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+        },
+        'results': recorder.results,
+    }
+
+def compare(baseline: dict, current: dict, threshold: float, min_ms: float = 2.0, out=sys.stdout) -> int:
+    """Imprime la comparación y devuelve la cantidad de regresiones.
+
+    Diferencias de menos de min_ms no cuentan: en mediciones muy cortas son ruido.
+    """
+    for key in ('scale', 'seed'):
+        if baseline['meta'].get(key) != current['meta'].get(key):
+            print(f"aviso: {key} distinto ({baseline['meta'].get(key)} vs {current['meta'].get(key)})", file=out)
+    regressions = 0
+    print(f"{'medición':<34}{'base (ms)':>12}{'actual (ms)':>13}{'cambio':>10}", file=out)
+    for name in sorted(baseline['results'].keys() | current['results'].keys()):
+        before, after = baseline['results'].get(name), current['results'].get(name)
+        if before is None or after is None:
+            print(f"{name:<34}{'solo en ' + ('actual' if before is None else 'base'):>35}", file=out)
+            continue
+        ratio = after['seconds'] / before['seconds'] if before['seconds'] else 1.0
+        mark = ''
+        if abs(after['seconds'] - before['seconds']) * 1000 < min_ms:
+            pass
+        elif ratio > 1 + threshold:
+            mark = '  REGRESIÓN'
+            regressions += 1
+        elif ratio < 1 - threshold:
+            mark = '  mejora'
+        print(f"{name:<34}{before['seconds'] * 1000:>12.2f}{after['seconds'] * 1000:>13.2f}"
+              f"{(ratio - 1) * 100:>+9.1f}%{mark}", file=out)
+    return regressions
+
+def load_results(path: str) -> dict:
+    with open(path, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="Suite de benchmarks con datos sintéticos")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help="generar los datos (si faltan) y medir")
+    run_parser.add_argument('--scale', choices=list(SCALES), default='10k')
+    run_parser.add_argument('--only', nargs='+', choices=SUITES, default=SUITES)
+    run_parser.add_argument('--seed', type=int, default=42)
+    run_parser.add_argument('--repeat', type=int, default=3, help="corridas de cada consulta (se toma la mejor)")
+    run_parser.add_argument('--data-dir', type=pathlib.Path,
+                            default=pathlib.Path(tempfile.gettempdir()) / 'music-benchmarks',
+                            help="dónde generar y reutilizar los datos sintéticos")
+    run_parser.add_argument('-o', '--output', help="archivo JSON de resultados (por defecto, stdout)")
+    run_parser.add_argument('--baseline', help="JSON de una corrida anterior para comparar")
+    run_parser.add_argument('--threshold', type=float, default=0.15, help="tolerancia relativa (0.15 = 15%%)")
+    run_parser.add_argument('--min-ms', type=float, default=2.0, help="diferencia mínima en ms para marcar un cambio")
+
+    compare_parser = subparsers.add_parser('compare', help="comparar dos archivos de resultados")
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.15, help="tolerancia relativa (0.15 = 15%%)")
+    compare_parser.add_argument('--min-ms', type=float, default=2.0, help="diferencia mínima en ms para marcar un cambio")
+    args = parser.parse_args(argv)
+
+    if args.command == 'compare':
+        return 1 if compare(load_results(args.baseline), load_results(args.current),
+                            args.threshold, args.min_ms) else 0
+
+    results = run(args)
+    text = json.dumps(results, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(text + '\n')
+    else:
+        print(text)
+    if args.baseline:
+        # Sin -o el JSON ya ocupa stdout
+        out = sys.stdout if args.output else sys.stderr
+        return 1 if compare(load_results(args.baseline), results, args.threshold, args.min_ms, out) else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,228 @@
+"""Generadores de datos sintéticos reproducibles para los benchmarks.
+
+Todo depende solo del tamaño y de la semilla, así que dos corridas con los
+mismos parámetros miden exactamente los mismos datos:
+
+    music.csv     las 27 columnas de final.FIELDNAMES
+    películas     el esquema de Programa1.FIELDNAMES, con proporciones de plataformas y edades parecidas a movies.csv
+    texto         corpus en castellano con frecuencias tipo Zipf (conteo de palabras)
+    logs          líneas de acceso con IPv4, URLs y emails válidos e inválidos
+    registros     datos de canciones para los validadores, con una fracción inválida
+    cadenas       identificadores y contraseñas para Ejercicio1.classify
+
+Los archivos se generan una vez en un directorio de datos y se reutilizan
+(ensure_file) mientras no cambien tamaño ni semilla.
+"""
+import csv
+import pathlib
+import random
+import string
+import sys
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+for path in (ROOT, ROOT / "Peliculas_csv", ROOT / "Tp1" / "Ejercicio1", ROOT / "Tp1" / "Ejercicio3"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from final import FIELDNAMES, row_to_song  # noqa: E402
+
+ID_CHARS = string.ascii_letters + string.digits
+KNOWN_ARTISTS = ['Gorillaz', 'Shakira', 'Björk', 'Daft Punk', 'The Beatles', 'Queen', 'Bad Bunny']
+TRACK_WORDS = ['love', 'night', 'the', 'fire', 'heart', 'dance', 'rain', 'song', 'baby', 'dream']
+ALBUM_TYPES = ['album', 'single', 'compilation']
+
+def _ids(rng: random.Random, k: int) -> str:
+    return ''.join(rng.choices(ID_CHARS, k=k))
+
+def synthetic_song_rows(size: int, seed: int = 42):
+    """Filas completas de music.csv (dict por columna, todo como texto)"""
+    rng = random.Random(seed)
+    artists = KNOWN_ARTISTS + [''.join(rng.choices(string.ascii_letters, k=rng.randint(4, 14)))
+                               for _ in range(max(1, size // 10))]
+    for i in range(size):
+        artist = rng.choice(artists)
+        track = f"{rng.choice(TRACK_WORDS).title()} {rng.choice(TRACK_WORDS)} {i}"
+        track_id = _ids(rng, 22)
+        # Como en el archivo real, algunas canciones no tienen datos de YouTube
+        has_video = rng.random() > 0.05
+        views = rng.randint(0, 5_000_000_000)
+        row = {
+            'Index': str(i),
+            'Artist': artist,
+            'Url_spotify': f"https://open.spotify.com/track/{track_id}",
+            'Track': track,
+            'Album': f"Album {rng.randint(1, 8)}",
+            'Album_type': rng.choice(ALBUM_TYPES),
+            'Uri': f"spotify:track:{track_id}",
+            'Danceability': f"{rng.random():.3f}",
+            'Energy': f"{rng.random():.3f}",
+            'Key': f"{rng.randint(0, 11)}.0",
+            'Loudness': f"{rng.uniform(-30, 0):.3f}",
+            'Speechiness': f"{rng.random():.4f}",
+            'Acousticness': f"{rng.random():.4f}",
+            'Instrumentalness': f"{rng.random():.6f}",
+            'Liveness': f"{rng.random():.4f}",
+            'Valence': f"{rng.random():.3f}",
+            'Tempo': f"{rng.uniform(60, 200):.3f}",
+            'Duration_ms': f"{rng.randint(90_000, 420_000)}.0",
+            'Url_youtube': f"https://www.youtube.com/watch?v={_ids(rng, 11)}" if has_video else '',
+            'Title': f"{artist} - {track} (Official Video)" if has_video else '',
+            'Channel': artist if has_video else '',
+            'Views': f"{views}.0" if has_video else '',
+            'Likes': f"{rng.randint(0, views // 100)}.0" if has_video else '',
+            'Comments': f"{rng.randint(0, 100_000)}.0" if has_video else '',
+            'Licensed': str(rng.random() > 0.3) if has_video else '',
+            'official_video': str(rng.random() > 0.2) if has_video else '',
+            'Stream': f"{rng.randint(0, 3_000_000_000)}.0",
+        }
+        yield row
+
+def synthetic_songs(size: int, seed: int = 42):
+    """SongDto equivalentes a cargar synthetic_song_rows desde music.csv"""
+    return (row_to_song(row) for row in synthetic_song_rows(size, seed))
+
+def write_music_csv(path: pathlib.Path, size: int, seed: int = 42) -> None:
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=FIELDNAMES)
+        writer.writeheader()
+        writer.writerows(synthetic_song_rows(size, seed))
+
+def synthetic_song_records(size: int, invalid_ratio: float, seed: int = 42) -> list:
+    """Registros como los que arma insert_song_batch, con una fracción inválida"""
+    rng = random.Random(seed)
+    records = []
+    for i in range(size):
+        track_id = _ids(rng, 22)
+        views = rng.randint(1, 10_000_000)
+        record = {
+            'artist': f"Artist {rng.randint(0, 5000)}",
+            'track': f"Track {i}",
+            'album': f"Album {rng.randint(0, 10)}",
+            'spotify_uri': f"spotify:track:{track_id}",
+            'duration_ms': str(rng.randint(60_000, 400_000)),
+            'spotify_url': f"https://open.spotify.com/track/{track_id}",
+            'youtube_url': f"https://www.youtube.com/watch?v={_ids(rng, 11)}",
+            'likes': str(rng.randint(0, views)),
+            'views': str(views),
+        }
+        if rng.random() < invalid_ratio:
+            field = rng.choice(list(record))
+            record[field] = record[field] + '#'
+        records.append(record)
+    return records
+
+# --- Películas ---
+
+# Proporciones aproximadas de movies.csv
+PLATFORM_SHARE = {'Netflix': 0.37, 'Hulu': 0.11, 'Prime Video': 0.42, 'Disney+': 0.06}
+AGE_LABELS = ['all', '7+', '13+', '16+', '18+', '']
+AGE_WEIGHTS = [0.07, 0.11, 0.10, 0.03, 0.24, 0.45]
+TITLE_WORDS = ['the', 'last', 'night', 'love', 'story', 'dark', 'return', 'king', 'city', 'secret',
+               'war', 'life', 'girl', 'man', 'house', 'dream', 'summer', 'lost', 'island', 'road']
+
+def synthetic_movie_rows(size: int, seed: int = 42):
+    """Filas en el orden de Programa1.FIELDNAMES"""
+    rng = random.Random(seed)
+    for i in range(size):
+        title = ' '.join(rng.choices(TITLE_WORDS, k=rng.randint(1, 4))).title()
+        # Algunos títulos se repiten con variantes, como las secuelas
+        if rng.random() < 0.1:
+            title += f" {rng.randint(2, 5)}"
+        rating = f"{rng.randint(10, 100)}/100" if rng.random() > 0.2 else ''
+        yield [f"{title} {i}", str(rng.randint(1920, 2023)), rng.choices(AGE_LABELS, AGE_WEIGHTS)[0], rating,
+               *('1' if rng.random() < share else '0' for share in PLATFORM_SHARE.values())]
+
+def write_movies_csv(path: pathlib.Path, size: int, seed: int = 42) -> None:
+    from Programa1 import FIELDNAMES as MOVIE_FIELDNAMES
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(MOVIE_FIELDNAMES)
+        writer.writerows(synthetic_movie_rows(size, seed))
+
+def synthetic_movie_columns(size: int, platforms: dict, seed: int = 42) -> tuple:
+    """Columnas ya codificadas como las arma BitmapIndex (sin crear películas).
+
+    platforms: nombre visible -> atributo de MovieDto. Devuelve un bytes 0/1 por
+    plataforma y un código de edad por película (índice en AGE_LABELS).
+    """
+    rng = random.Random(seed)
+    columns = {}
+    for name, attribute in platforms.items():
+        table = bytes(1 if i < PLATFORM_SHARE[name] * 256 else 0 for i in range(256))
+        columns[attribute] = rng.randbytes(size).translate(table)
+
+    table, accumulated = bytearray(), 0.0
+    for code, weight in enumerate(AGE_WEIGHTS):
+        accumulated += weight
+        table.extend([code] * (round(accumulated * 256) - len(table)))
+    return columns, rng.randbytes(size).translate(bytes(table))
+
+# --- Texto, logs y cadenas ---
+
+SPANISH_WORDS = (
+    "que de no a la el es y en lo un por qué me una te los se con para mi está si bien pero yo eso las "
+    "sí su tu aquí del al como le más esto ya todo esta vamos muy hay ahora algo estoy tengo nos tú nada "
+    "cuando ha este sé estás así puedo cómo quiero sólo soy tiene gracias o él bueno fue ser hacer son "
+    "todos era eres vez tienes creo ella he ese voy puede sabes hola sus porque dios quién nunca dónde "
+    "corazón noche canción año niño mañana también después siempre tiempo vida amor calle ciudad música"
+).split()
+
+def write_text_corpus(path: pathlib.Path, size_bytes: int, seed: int = 42) -> None:
+    """Texto de unos size_bytes bytes con palabras repartidas según la ley de Zipf"""
+    rng = random.Random(seed)
+    weights = [1 / rank for rank in range(1, len(SPANISH_WORDS) + 1)]
+    written = 0
+    with open(path, 'w', encoding='utf-8') as file:
+        while written < size_bytes:
+            lines = []
+            for _ in range(1000):
+                words = rng.choices(SPANISH_WORDS, weights, k=rng.randint(3, 16))
+                words[0] = words[0].capitalize()
+                lines.append(' '.join(words) + rng.choice(['.', ',', '!', '?', '', '...']) + '\n')
+            chunk = ''.join(lines)
+            file.write(chunk)
+            written += len(chunk.encode('utf-8'))
+
+def _ipv4(rng: random.Random) -> str:
+    # Uno de cada diez fuera de rango
+    high = 999 if rng.random() < 0.1 else 255
+    return '.'.join(str(rng.randint(0, high)) for _ in range(4))
+
+def write_access_log(path: pathlib.Path, lines: int, seed: int = 42) -> None:
+    """Log de accesos con IPv4, URLs de referencia y emails (algunos inválidos)"""
+    rng = random.Random(seed)
+    domains = ['google.com', 'mercadolibre.com', 'um.edu', 'gob.gov', 'example.org', 'foo.net', 'bar.io']
+    suffixes = ['ar', 'arg', 'cl', 'es', 'mx', 'eeuu']
+    paths = ['/', '/index.html', '/api/songs?q=love', '/login', '/static/app.js', '']
+    with open(path, 'w', encoding='utf-8') as file:
+        batch = []
+        for i in range(lines):
+            line = (f'{_ipv4(rng)} - - [17/Oct/2026:10:{i % 60:02d}:00] "GET {rng.choice(paths) or "/"} HTTP/1.1" '
+                    f'{rng.choice([200, 200, 200, 304, 404, 500])} {rng.randint(0, 50_000)} '
+                    f'"{rng.choice(["https://", "http://www.", "www."])}{rng.choice(domains)}{rng.choice(paths)}"')
+            if rng.random() < 0.3:
+                user = ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 10)))
+                line += f" user={user}@{rng.choice(['gmail', 'hotmail', 'alumno'])}.com.{rng.choice(suffixes)}"
+            batch.append(line + '\n')
+            if len(batch) == 10_000:
+                file.write(''.join(batch))
+                batch = []
+        file.write(''.join(batch))
+
+STRING_ALPHABETS = [string.ascii_lowercase, string.ascii_letters + string.digits, string.digits,
+                    string.ascii_letters + string.digits + string.punctuation, 'ñáéíóú€ ' + string.ascii_lowercase]
+
+def synthetic_strings(size: int, seed: int = 42) -> list:
+    """Identificadores y contraseñas de largo y alfabeto variables"""
+    rng = random.Random(seed)
+    return [''.join(rng.choices(rng.choice(STRING_ALPHABETS), k=rng.randint(0, 24))) for _ in range(size)]
+
+def ensure_file(directory: pathlib.Path, name: str, write, *args) -> pathlib.Path:
+    """Genera el archivo con write(path, *args) solo si todavía no existe"""
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / name
+    if not path.exists():
+        partial = path.with_name(path.name + '.tmp')
+        write(partial, *args)
+        partial.replace(path)
+    return path
@@ -1,9 +1,29 @@
+import argparse
 import csv
+import hashlib
+import io
+import itertools
+import json
+import mmap
 import re
 import os
 import pathlib
+import shutil
+import sqlite3
+import struct
+import sys
+import threading
+import time
+import heapq
+import unicodedata
+import zlib
+from array import array
+from bisect import bisect_left, insort
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from datetime import timedelta
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 from urllib.parse import urlparse
 
 @dataclass
@@ -24,48 +44,1767 @@ def convert_duration(ms: int) -> str:
     seconds = int(float(ms)) // 1000
     return str(timedelta(seconds=seconds))
 
-def parse_csv() -> list:
-    songs = []
+def popularity(song: SongDto) -> int:
+    """Clave de orden: vistas si hay, de lo contrario streams"""
+    return song.views if song.views > 0 else song.stream
+
+def normalize_text(text: str) -> str:
+    """Pasa el texto a minúsculas (casefold) y le quita los acentos"""
+    if text.isascii():
+        return text.lower()
+    decomposed = unicodedata.normalize('NFKD', text.casefold())
+    return ''.join(c for c in decomposed if not unicodedata.combining(c))
+
+def writable_array(column):
+    """Copia a un array modificable una columna mapeada desde el snapshot"""
+    if type(column) is not memoryview:
+        return column
+    copy = array(column.format)
+    copy.frombytes(column.cast('B'))
+    return copy
+
+def array_slice(column, start: int, end: int):
+    """Copia column[start:end] (array o vista de un mmap) a un array modificable"""
+    copy = array(memoryview(column).format)
+    copy.frombytes(memoryview(column)[start:end].cast('B'))
+    return copy
+
+class StringColumn:
+    """Columna de textos guardada en un único bloque UTF-8 con offsets"""
+
+    __slots__ = ('_blob', '_offsets')
+
+    def __init__(self):
+        self._blob = bytearray()
+        self._offsets = array('I', [0])
+
+    def append(self, text: str) -> None:
+        if type(self._blob) is not bytearray:
+            # Columna mapeada desde el snapshot: se copia recién al modificarla
+            self._blob = bytearray(self._blob)
+            self._offsets = writable_array(self._offsets)
+        self._blob += text.encode('utf-8')
+        try:
+            self._offsets.append(len(self._blob))
+        except OverflowError:
+            # Más de 4 GB de texto: pasar a offsets de 64 bits
+            self._offsets = array('Q', self._offsets)
+            self._offsets.append(len(self._blob))
+
+    def __getitem__(self, row_id: int) -> str:
+        return str(self._blob[self._offsets[row_id]:self._offsets[row_id + 1]], 'utf-8')
+
+    def contains(self, row_id: int, needle: bytes) -> bool:
+        """True si el texto de la fila contiene needle (en UTF-8 basta comparar bytes)"""
+        if type(self._blob) is memoryview:
+            # Una vista del mmap no tiene find: se copia una sola vez
+            self._blob = bytes(self._blob)
+        return self._blob.find(needle, self._offsets[row_id], self._offsets[row_id + 1]) >= 0
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def buffers(self, prefix: str) -> dict:
+        return {f'{prefix}.blob': self._blob, f'{prefix}.offsets': self._offsets}
+
+    @classmethod
+    def from_buffers(cls, buffers: dict, prefix: str):
+        column = cls()
+        column._blob = buffers[f'{prefix}.blob']
+        column._offsets = buffers[f'{prefix}.offsets']
+        return column
+
+class DictColumn:
+    """Columna de textos codificada por diccionario (artistas, álbumes)"""
+
+    __slots__ = ('values', '_codes', '_ids')
+
+    def __init__(self):
+        self.values = []
+        self._codes = {}
+        self._ids = array('I')
+
+    def append(self, text: str) -> None:
+        code = self._codes.get(text)
+        if code is None:
+            code = self._codes[text] = len(self.values)
+            self.values.append(text)
+        if type(self._ids) is memoryview:
+            self._ids = writable_array(self._ids)
+        self._ids.append(code)
+
+    def __getitem__(self, row_id: int) -> str:
+        return self.values[self._ids[row_id]]
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def codes(self):
+        """Código de cada fila (posición de su valor en values)"""
+        return self._ids
+
+    def buffers(self, prefix: str) -> dict:
+        values = StringColumn()
+        for value in self.values:
+            values.append(value)
+        return {**values.buffers(f'{prefix}.values'), f'{prefix}.ids': self._ids}
+
+    @classmethod
+    def from_buffers(cls, buffers: dict, prefix: str):
+        column = cls()
+        values = StringColumn.from_buffers(buffers, f'{prefix}.values')
+        column.values = [values[code] for code in range(len(values))]
+        column._codes = {value: code for code, value in enumerate(column.values)}
+        column._ids = buffers[f'{prefix}.ids']
+        return column
+
+class PrefixColumn:
+    """Columna de textos que guarda aparte los prefijos conocidos (URIs, URLs)"""
+
+    __slots__ = ('_prefixes', '_prefix_ids', '_suffixes')
+
+    def __init__(self, prefixes: tuple):
+        # El código 0 significa "sin prefijo conocido"
+        self._prefixes = ('',) + prefixes
+        self._prefix_ids = array('B')
+        self._suffixes = StringColumn()
+
+    def append(self, text: str) -> None:
+        if type(self._prefix_ids) is memoryview:
+            self._prefix_ids = writable_array(self._prefix_ids)
+        for code in range(len(self._prefixes) - 1, 0, -1):
+            prefix = self._prefixes[code]
+            if text.startswith(prefix):
+                self._prefix_ids.append(code)
+                self._suffixes.append(text[len(prefix):])
+                return
+        self._prefix_ids.append(0)
+        self._suffixes.append(text)
+
+    def __getitem__(self, row_id: int) -> str:
+        return self._prefixes[self._prefix_ids[row_id]] + self._suffixes[row_id]
+
+    def __len__(self) -> int:
+        return len(self._prefix_ids)
+
+    def buffers(self, prefix: str) -> dict:
+        return {**self._suffixes.buffers(f'{prefix}.suffixes'), f'{prefix}.prefix_ids': self._prefix_ids}
+
+    @classmethod
+    def from_buffers(cls, buffers: dict, prefix: str, prefixes: tuple):
+        column = cls(prefixes)
+        column._prefix_ids = buffers[f'{prefix}.prefix_ids']
+        column._suffixes = StringColumn.from_buffers(buffers, f'{prefix}.suffixes')
+        return column
+
+SPOTIFY_URI_PREFIXES = ('spotify:track:', 'spotify:album:')
+SPOTIFY_URL_PREFIXES = ('https://open.spotify.com/track/', 'https://open.spotify.com/album/')
+YOUTUBE_URL_PREFIXES = ('https://youtu.be/', 'https://www.youtube.com/watch?v=')
+
+def spotify_uri_to_url(uri: str) -> str:
+    """Arma la URL canónica de Spotify a partir de la URI (spotify:tipo:id)"""
+    parts = uri.split(':')
+    if len(parts) != 3 or parts[0] != 'spotify':
+        return ''
+    return f"https://open.spotify.com/{parts[1]}/{parts[2]}"
+
+class SongStore:
+    """Almacén columnar de canciones.
+
+    Los números van en arrays compactos y los textos en columnas codificadas;
+    los SongDto se arman recién cuando se pide una fila (por ejemplo, para imprimirla).
+    """
+
+    def __init__(self, songs=()):
+        self.artist = DictColumn()
+        self.album = DictColumn()
+        self.track = StringColumn()
+        self.spotify_uri = PrefixColumn(SPOTIFY_URI_PREFIXES)
+        self.spotify_url = PrefixColumn(SPOTIFY_URL_PREFIXES)
+        # 1 si la URL de Spotify es la canónica de la URI y no se guarda aparte
+        self.url_from_uri = array('B')
+        self.youtube_url = PrefixColumn(YOUTUBE_URL_PREFIXES)
+        self.duration_ms = array('q')
+        self.stream = array('q')
+        self.likes = array('q')
+        self.views = array('q')
+        # Index del CSV de cada fila (-1 si no tiene): las actualizaciones del WAL lo referencian
+        self.index = array('q')
+        for song in songs:
+            self.append(song)
+
+    def append(self, song: SongDto, index: int = -1) -> int:
+        """Agrega una canción y devuelve su id de fila"""
+        row_id = len(self.duration_ms)
+        if type(self.duration_ms) is memoryview:
+            self.make_writable()
+        self.artist.append(song.artist)
+        self.album.append(song.album)
+        self.track.append(song.track)
+        self.spotify_uri.append(song.spotify_uri)
+        if song.spotify_url and song.spotify_url == spotify_uri_to_url(song.spotify_uri):
+            self.url_from_uri.append(1)
+            self.spotify_url.append('')
+        else:
+            self.url_from_uri.append(0)
+            self.spotify_url.append(song.spotify_url)
+        self.youtube_url.append(song.youtube_url)
+        self.duration_ms.append(song.duration_ms)
+        self.stream.append(song.stream)
+        self.likes.append(song.likes)
+        self.views.append(song.views)
+        self.index.append(-1 if index is None else index)
+        return row_id
+
+    def set_counts(self, row_id: int, views: int, likes: int, stream: int) -> None:
+        """Reemplaza los contadores de una fila existente"""
+        if type(self.views) is memoryview:
+            self.make_writable()
+        self.views[row_id] = views
+        self.likes[row_id] = likes
+        self.stream[row_id] = stream
+
+    def spotify_url_at(self, row_id: int) -> str:
+        if self.url_from_uri[row_id]:
+            return spotify_uri_to_url(self.spotify_uri[row_id])
+        return self.spotify_url[row_id]
+
+    NUMERIC_COLUMNS = ('duration_ms', 'stream', 'likes', 'views', 'url_from_uri', 'index')
+
+    def make_writable(self) -> None:
+        """Pasa a arrays modificables las columnas numéricas mapeadas"""
+        for name in self.NUMERIC_COLUMNS:
+            setattr(self, name, writable_array(getattr(self, name)))
+
+    def buffers(self) -> dict:
+        """Buffers crudos de todas las columnas (para el snapshot binario)"""
+        buffers = {name: getattr(self, name) for name in self.NUMERIC_COLUMNS}
+        buffers.update(self.artist.buffers('artist'))
+        buffers.update(self.album.buffers('album'))
+        buffers.update(self.track.buffers('track'))
+        buffers.update(self.spotify_uri.buffers('spotify_uri'))
+        buffers.update(self.spotify_url.buffers('spotify_url'))
+        buffers.update(self.youtube_url.buffers('youtube_url'))
+        return buffers
+
+    @classmethod
+    def from_buffers(cls, buffers: dict):
+        """Arma el almacén sobre buffers ya tipados (por ejemplo, vistas de un mmap)"""
+        store = cls()
+        for name in cls.NUMERIC_COLUMNS:
+            setattr(store, name, buffers[name])
+        store.artist = DictColumn.from_buffers(buffers, 'artist')
+        store.album = DictColumn.from_buffers(buffers, 'album')
+        store.track = StringColumn.from_buffers(buffers, 'track')
+        store.spotify_uri = PrefixColumn.from_buffers(buffers, 'spotify_uri', SPOTIFY_URI_PREFIXES)
+        store.spotify_url = PrefixColumn.from_buffers(buffers, 'spotify_url', SPOTIFY_URL_PREFIXES)
+        store.youtube_url = PrefixColumn.from_buffers(buffers, 'youtube_url', YOUTUBE_URL_PREFIXES)
+        return store
+
+    def popularity(self, row_id: int) -> int:
+        """Vistas si hay, de lo contrario streams (sin armar el SongDto)"""
+        views = self.views[row_id]
+        return views if views > 0 else self.stream[row_id]
+
+    def __getitem__(self, row_id: int) -> SongDto:
+        if row_id < 0:
+            row_id += len(self)
+        return SongDto(
+            artist=self.artist[row_id],
+            track=self.track[row_id],
+            album=self.album[row_id],
+            spotify_uri=self.spotify_uri[row_id],
+            duration_ms=self.duration_ms[row_id],
+            spotify_url=self.spotify_url_at(row_id),
+            youtube_url=self.youtube_url[row_id],
+            stream=self.stream[row_id],
+            likes=self.likes[row_id],
+            views=self.views[row_id]
+        )
+
+    def __len__(self) -> int:
+        return len(self.duration_ms)
+
+    def __iter__(self):
+        for row_id in range(len(self)):
+            yield self[row_id]
+
+class SearchIndex:
+    """Índice de n-gramas sobre artista y título para búsquedas por subcadena.
+
+    Cada n-grama apunta a la lista de filas que lo contienen, ya ordenada por
+    popularidad (descendente), así que los resultados salen rankeados sin
+    tener que ordenar las coincidencias en cada búsqueda. Los textos
+    normalizados que confirman cada candidato se guardan en una StringColumn
+    (UTF-8 más offsets), no como un str por fila.
+    """
+
+    NGRAM = 3
+
+    def __init__(self, store: SongStore = None):
+        self._texts = StringColumn()
+        self._keys = array('q')
+        self._postings = {}
+        self._order = array('I')
+        if store is not None:
+            self.build(store)
+
+    @staticmethod
+    def _entries(store: SongStore, row_ids):
+        """Texto indexado y clave de popularidad de cada fila, leídos de las columnas"""
+        codes = store.artist.codes()
+        artists = {}
+        for row_id in row_ids:
+            code = codes[row_id]
+            artist = artists.get(code)
+            if artist is None:
+                # El separador evita coincidencias que crucen artista y título
+                artist = artists[code] = normalize_text(store.artist.values[code]) + '\0'
+            yield artist + normalize_text(store.track[row_id]), store.popularity(row_id)
+
+    def _rank_key(self, row_id: int):
+        # Mismo criterio que el sort original: popularidad descendente y,
+        # ante empates, el orden del archivo
+        return (-self._keys[row_id], row_id)
+
+    def _grams(self, text: str) -> set:
+        n = self.NGRAM
+        grams = set()
+        # Las consultas no cruzan el separador: cada parte (artista, título) por separado
+        for part in text.split('\0'):
+            if len(part) < n:
+                # Textos muy cortos se indexan completos para no perderlos
+                if part:
+                    grams.add(part)
+            else:
+                grams.update(part[i:i + n] for i in range(len(part) - n + 1))
+        return grams
+
+    def build(self, source) -> None:
+        """Construye el índice completo (una vez por carga del catálogo)"""
+        self._texts = StringColumn()
+        self._keys = array('q')
+        self._postings = {}
+        for text, key in self._entries(source, range(len(source))):
+            self._texts.append(text)
+            self._keys.append(key)
+        self._build_postings()
+
+    def _build_postings(self) -> None:
+        """Arma las listas de cada n-grama recorriendo las filas por popularidad"""
+        self._order = array('I', sorted(range(len(self._keys)), key=self._rank_key))
+        self._postings = postings = {}
+        texts = self._texts
+        for row_id in self._order:
+            for gram in self._grams(texts[row_id]):
+                posting = postings.get(gram)
+                if posting is None:
+                    posting = postings[gram] = array('I')
+                posting.append(row_id)
+
+    def _make_writable(self) -> None:
+        """Pasa a arrays modificables las columnas mapeadas desde el snapshot"""
+        self._keys = writable_array(self._keys)
+        self._order = writable_array(self._order)
+
+    def add_rows(self, source, row_ids: range) -> None:
+        """Indexa filas nuevas (las siguientes a las ya indexadas); si son muchas, rearma las listas"""
+        self._make_writable()
+        rebuild = len(row_ids) >= max(1_000, len(self._keys) // 100)
+        for text, key in self._entries(source, row_ids):
+            row_id = len(self._keys)
+            self._texts.append(text)
+            self._keys.append(key)
+            if rebuild:
+                continue
+            insort(self._order, row_id, key=self._rank_key)
+            for gram in self._grams(text):
+                posting = self._postings.setdefault(gram, array('I'))
+                insort(posting, row_id, key=self._rank_key)
+        if rebuild:
+            self._build_postings()
+
+    def update_key(self, row_id: int, key: int) -> None:
+        """Cambia la popularidad de una fila ya indexada y la reubica en cada lista"""
+        self._make_writable()
+        ranked_lists = [self._order] + [self._postings[gram] for gram in self._grams(self._texts[row_id])]
+        # Se quita con la clave vieja (la lista está ordenada por ella) y se reinserta con la nueva
+        for ranked in ranked_lists:
+            del ranked[bisect_left(ranked, self._rank_key(row_id), key=self._rank_key)]
+        self._keys[row_id] = key
+        for ranked in ranked_lists:
+            insort(ranked, row_id, key=self._rank_key)
+
+    def update_keys(self, keys: dict) -> None:
+        """Cambia la popularidad de varias filas; si son muchas, rearma las listas en una sola pasada"""
+        if len(keys) < max(1_000, len(self._keys) // 100):
+            for row_id, key in keys.items():
+                self.update_key(row_id, key)
+            return
+        self._make_writable()
+        for row_id, key in keys.items():
+            self._keys[row_id] = key
+        self._build_postings()
+
+    def buffers(self, prefix: str) -> dict:
+        """Buffers crudos del índice (para el snapshot): las listas van juntas en un solo array"""
+        grams = StringColumn()
+        starts = array('Q', [0])
+        postings = array('I')
+        for gram, posting in self._postings.items():
+            grams.append(gram)
+            postings.extend(posting)
+            starts.append(len(postings))
+        return {**self._texts.buffers(f'{prefix}.texts'), **grams.buffers(f'{prefix}.grams'),
+                f'{prefix}.keys': self._keys, f'{prefix}.order': self._order,
+                f'{prefix}.starts': starts, f'{prefix}.postings': postings}
+
+    @classmethod
+    def from_buffers(cls, buffers: dict, prefix: str):
+        """Arma el índice sobre buffers ya tipados; solo las listas de n-gramas se copian"""
+        index = cls()
+        index._texts = StringColumn.from_buffers(buffers, f'{prefix}.texts')
+        index._keys = buffers[f'{prefix}.keys']
+        index._order = buffers[f'{prefix}.order']
+        grams = StringColumn.from_buffers(buffers, f'{prefix}.grams')
+        starts, postings = buffers[f'{prefix}.starts'], buffers[f'{prefix}.postings']
+        index._postings = {grams[i]: array_slice(postings, starts[i], starts[i + 1]) for i in range(len(grams))}
+        return index
+
+    def search(self, query: str):
+        """Devuelve (de forma perezosa) los ids de fila que contienen la consulta, rankeados"""
+        term = normalize_text(query)
+        if not term:
+            return iter(())
+        if len(term) < self.NGRAM:
+            return self._search_short(term)
+
+        postings = []
+        for gram in self._grams(term):
+            posting = self._postings.get(gram)
+            if posting is None:
+                return iter(())
+            postings.append(posting)
+        # La lista más corta ya está rankeada; solo falta verificar la subcadena
+        candidates = min(postings, key=len)
+        return self._verified(candidates, term)
+
+    def _verified(self, candidates, term: str):
+        """Candidatos cuyo texto contiene el término (comparando UTF-8, sin decodificar)"""
+        needle = term.encode('utf-8')
+        contains = self._texts.contains
+        return (row_id for row_id in candidates if contains(row_id, needle))
+
+    def _search_short(self, term: str):
+        """Consultas más cortas que un n-grama (1 o 2 caracteres)"""
+        postings = [posting for gram, posting in self._postings.items() if term in gram]
+        if sum(len(posting) for posting in postings) >= len(self._order):
+            # Término muy común: es más barato recorrer el orden por popularidad
+            return self._verified(self._order, term)
+        return self._merge_ranked(postings)
+
+    def _merge_ranked(self, postings):
+        """Une listas rankeadas sin duplicados, manteniendo el orden por popularidad"""
+        last = None
+        for row_id in heapq.merge(*postings, key=self._rank_key):
+            if row_id != last:
+                last = row_id
+                yield row_id
+
+class ArtistNameIndex(SearchIndex):
+    """Índice de subcadenas sobre los nombres de artista (sin ranking)"""
+
+    @staticmethod
+    def _entries(names: list, row_ids):
+        return ((normalize_text(names[row_id]), 0) for row_id in row_ids)
+
+class ArtistIndex:
+    """Agregados por artista construidos al cargar el catálogo.
+
+    Permite responder el top de canciones y los álbumes de un artista en
+    tiempo proporcional a sus canciones, sin recorrer todo el catálogo. El id
+    de un artista es su código en store.artist; por artista se guardan sus
+    filas y, en un único array, su top ya ordenado (-1 en los huecos).
+    """
+
+    # Se guardan más canciones de las que muestra el menú (5) para poder
+    # pedir tops más largos sin recorrer el catálogo
+    TOP_N = 10
+
+    def __init__(self, store: SongStore = None, top_n: int = TOP_N):
+        self.top_n = top_n
+        self.store = SongStore() if store is None else store
+        self.build()
+
+    def _rank(self, row_id: int) -> tuple:
+        return (self.store.popularity(row_id), -row_id)
+
+    def build(self) -> None:
+        """Reparte las filas por artista y calcula cada top"""
+        artists = len(self.store.artist.values)
+        self._rows = [array('I') for _ in range(artists)]
+        for row_id, artist_id in enumerate(self.store.artist.codes()):
+            self._rows[artist_id].append(row_id)
+        self._top = array('i', [-1]) * (artists * self.top_n)
+        for artist_id in range(artists):
+            self._fill_top(artist_id)
+        self._names = ArtistNameIndex(self.store.artist.values)
+
+    def _fill_top(self, artist_id: int) -> None:
+        best = heapq.nlargest(self.top_n, self._rows[artist_id], key=self._rank)
+        start = artist_id * self.top_n
+        self._top[start:start + self.top_n] = array('i', best + [-1] * (self.top_n - len(best)))
+
+    def add(self, row_id: int) -> None:
+        """Actualiza los agregados con una fila nueva del almacén"""
+        artist_id = self.store.artist.codes()[row_id]
+        if artist_id == len(self._rows):
+            self._rows.append(array('I'))
+            self._top.extend(array('i', [-1]) * self.top_n)
+            self._names.add_rows(self.store.artist.values, range(artist_id, artist_id + 1))
+        self._rows[artist_id].append(row_id)
+
+        top, rank = self._top, self._rank(row_id)
+        start = artist_id * self.top_n
+        end = start + self.top_n
+        for slot in range(start, end):
+            if top[slot] < 0 or rank > self._rank(top[slot]):
+                top[slot + 1:end] = top[slot:end - 1]
+                top[slot] = row_id
+                break
+
+    def rebuild_top(self, row_ids) -> None:
+        """Recalcula el top de los artistas de esas filas (tras cambiar sus contadores)"""
+        codes = self.store.artist.codes()
+        # Solo las filas de cada artista: proporcional a sus canciones, no al catálogo
+        for artist_id in {codes[row_id] for row_id in row_ids}:
+            self._fill_top(artist_id)
+
+    def buffers(self, prefix: str) -> dict:
+        """Buffers crudos del índice (para el snapshot): las filas de cada artista van juntas"""
+        starts = array('Q', [0])
+        rows = array('I')
+        for artist_rows in self._rows:
+            rows.extend(artist_rows)
+            starts.append(len(rows))
+        return {f'{prefix}.rows': rows, f'{prefix}.starts': starts, f'{prefix}.top': self._top,
+                **self._names.buffers(f'{prefix}.names')}
+
+    @classmethod
+    def from_buffers(cls, buffers: dict, prefix: str, store: SongStore):
+        """Arma el índice de las filas de store guardado con buffers()"""
+        index = cls()
+        index.store = store
+        starts, rows = buffers[f'{prefix}.starts'], buffers[f'{prefix}.rows']
+        index._rows = [array_slice(rows, starts[i], starts[i + 1]) for i in range(len(starts) - 1)]
+        index._top = writable_array(buffers[f'{prefix}.top'])
+        index._names = ArtistNameIndex.from_buffers(buffers, f'{prefix}.names')
+        return index
+
+    def matching(self, artist_name: str):
+        """Ids de los artistas cuyo nombre contiene el texto buscado"""
+        if not normalize_text(artist_name):
+            return iter(range(len(self._rows)))
+        return self._names.search(artist_name)
+
+    def top_songs(self, artist_name: str, n: int = None) -> list:
+        """Ids de fila de las n canciones más populares de los artistas que coinciden"""
+        n = self.top_n if n is None else min(n, self.top_n)
+        top, size = self._top, self.top_n
+        candidates = (row_id for artist_id in self.matching(artist_name)
+                      for row_id in top[artist_id * size:(artist_id + 1) * size] if row_id >= 0)
+        return heapq.nlargest(n, candidates, key=self._rank)
+
+    def albums(self, artist_name: str) -> list:
+        """Lista de (álbum, canciones, duración total) en orden de aparición"""
+        album_codes, durations = self.store.album.codes(), self.store.duration_ms
+        merged = {}
+        for artist_id in self.matching(artist_name):
+            for row_id in self._rows[artist_id]:
+                current = merged.get(album_codes[row_id])
+                if current is None:
+                    merged[album_codes[row_id]] = [1, durations[row_id], row_id]
+                else:
+                    current[0] += 1
+                    current[1] += durations[row_id]
+                    current[2] = min(current[2], row_id)
+        ordered = sorted(merged.items(), key=lambda item: item[1][2])
+        return [(self.store.album.values[album], count, total) for album, (count, total, _) in ordered]
+
+class DuplicateIndex:
+    """Índice hash para detectar canciones repetidas al insertar.
+
+    La clave es la URI de Spotify; si a alguna de las dos filas le falta, se
+    compara artista + título normalizados (dos URIs distintas son canciones
+    distintas aunque coincidan los nombres). Solo se guarda el hash de cada
+    clave y cada coincidencia se confirma contra la fila real con fields.
+    """
+
+    def __init__(self, fields, count: int = 0):
+        # fields(row_id) -> (uri, artista, título) de una fila ya registrada
+        self._fields = fields
+        self._by_uri = {}
+        self._by_name = {}
+        for row_id in range(count):
+            self.add(row_id, *fields(row_id))
+
+    @staticmethod
+    def name_key(artist: str, track: str) -> str:
+        return normalize_text(artist.strip()) + '\0' + normalize_text(track.strip())
+
+    def add(self, row_id: int, uri: str, artist: str, track: str) -> None:
+        """Registra una fila; entre filas ya repetidas se queda con la primera"""
+        uri = uri.strip()
+        if uri:
+            self._by_uri.setdefault(hash(uri), row_id)
+        self._by_name.setdefault(hash(self.name_key(artist, track)), row_id)
+
+    def find(self, uri: str, artist: str, track: str):
+        """Id de la fila registrada que coincide, o None"""
+        uri = uri.strip()
+        if uri:
+            row_id = self._by_uri.get(hash(uri))
+            if row_id is not None and self._fields(row_id)[0].strip() == uri:
+                return row_id
+        key = self.name_key(artist, track)
+        row_id = self._by_name.get(hash(key))
+        if row_id is None:
+            return None
+        found_uri, found_artist, found_track = self._fields(row_id)
+        if uri and found_uri.strip():
+            return None
+        return row_id if self.name_key(found_artist, found_track) == key else None
+
+class QueryCache:
+    """Caché LRU con expiración (TTL) de resultados de consultas.
+
+    Las claves son (comando, consulta normalizada) y los valores listas de ids
+    de fila; una inserción solo invalida las consultas que su canción alcanza.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0, max_results: int = 1000):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # Búsquedas con más coincidencias no se guardan: la búsqueda perezosa ya es rápida
+        self.max_results = max_results
+        self._entries = OrderedDict()
+        # Cambia con cada invalidación para descartar resultados calculados antes
+        self.generation = 0
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def get(self, command: str, term: str):
+        key = (command, term)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires, value = entry
+        if expires < time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, command: str, term: str, value, generation: int = None) -> None:
+        if self.maxsize <= 0 or (generation is not None and generation != self.generation):
+            return
+        self._entries[(command, term)] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end((command, term))
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate_song(self, song: SongDto) -> None:
+        """Descarta las consultas cuyo resultado puede cambiar con esta canción"""
+        self.generation += 1
+        artist = normalize_text(song.artist)
+        text = artist + '\0' + normalize_text(song.track)
+        stale = [key for key in self._entries
+                 if key[1] in (text if key[0] == 'search' else artist)]
+        for key in stale:
+            del self._entries[key]
+        self.invalidations += len(stale)
+
+    def clear(self) -> None:
+        self.generation += 1
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+        }
+
+MUSIC_CSV = pathlib.Path(__file__).parent.absolute() / "music.csv"
+
+FIELDNAMES = ['Index','Artist','Url_spotify','Track','Album','Album_type','Uri',
+              'Danceability','Energy','Key','Loudness','Speechiness','Acousticness',
+              'Instrumentalness','Liveness','Valence','Tempo','Duration_ms','Url_youtube',
+              'Title','Channel','Views','Likes','Comments','Licensed','official_video','Stream']
+
+def row_to_song(row: dict) -> SongDto:
+    """Convierte una fila del CSV en un SongDto (lanza ValueError si la fila es inválida)"""
+    # Extraer valores con manejo seguro
+    stream_value = str(row.get('Stream', '0')).strip().split(';')[0]
+    views_value = str(row.get('Views', '0')).strip().split(';')[0]
+    stream_count = int(float(stream_value)) if stream_value else 0
+    views = int(float(views_value)) if views_value else 0
+
+    return SongDto(
+        artist=str(row.get('Artist', '')).strip(),
+        track=str(row.get('Track', '')).strip(),
+        album=str(row.get('Album', '')).strip(),
+        spotify_uri=str(row.get('Uri', '')).strip(),
+        duration_ms=int(float(row.get('Duration_ms', '0'))),
+        spotify_url=str(row.get('Url_spotify', '')).strip(),
+        youtube_url=str(row.get('Url_youtube', '')).strip(),
+        stream=stream_count,
+        likes=int(float(row.get('Likes', '0') or '0')),
+        views=views
+    )
+
+def iter_csv_songs(file_path: pathlib.Path = MUSIC_CSV):
+    """Recorre music.csv devolviendo un SongDto por fila válida"""
+    with open(file_path, 'r', encoding='utf-8') as file:
+        csv_reader = csv.DictReader(file, delimiter=',')
+        
+        for row in csv_reader:
+            try:
+                yield row_to_song(row)
+            except (ValueError, KeyError, TypeError):
+                continue
+
+def parse_csv(file_path: pathlib.Path = MUSIC_CSV) -> list:
     try:
-        file_path = pathlib.Path(__file__).parent.absolute() / "music.csv"
-        with open(file_path, 'r', encoding='utf-8') as file:
-            csv_reader = csv.DictReader(file, delimiter=',')
-            
-            for row in csv_reader:
-                try:
-                    # Extraer valores con manejo seguro
-                    stream_value = str(row.get('Stream', '0')).strip().split(';')[0]
-                    views_value = str(row.get('Views', '0')).strip().split(';')[0]
-                    stream_count = int(float(stream_value)) if stream_value else 0
-                    views = int(float(views_value)) if views_value else 0
-                    
-                    song = SongDto(
-                        artist=str(row.get('Artist', '')).strip(),
-                        track=str(row.get('Track', '')).strip(),
-                        album=str(row.get('Album', '')).strip(),
-                        spotify_uri=str(row.get('Uri', '')).strip(),
-                        duration_ms=int(float(row.get('Duration_ms', '0'))),
-                        spotify_url=str(row.get('Url_spotify', '')).strip(),
-                        youtube_url=str(row.get('Url_youtube', '')).strip(),
-                        stream=stream_count,
-                        likes=int(float(row.get('Likes', '0') or '0')),
-                        views=views
-                    )
-                    songs.append(song)
-                except (ValueError, KeyError, TypeError):
-                    continue
-                    
-        return songs
+        return list(iter_csv_songs(file_path))
     except FileNotFoundError:
         print("\nError: No se encontró el archivo music.csv")
         return []
     except Exception as e:
         print(f"\nError al leer el archivo: {e}")
         return []
-    
-def search_songs() -> None:
-    songs = parse_csv()
-    
+
+def _count(value) -> int:
+    value = str(value or '').strip().split(';')[0]
+    return int(float(value)) if value else 0
+
+def row_counts(row: dict) -> tuple:
+    """(vistas, likes, streams) de una fila del CSV"""
+    return _count(row.get('Views')), _count(row.get('Likes')), _count(row.get('Stream'))
+
+def row_index(row: dict):
+    """Valor numérico de la columna Index (None si falta o no es válido)"""
+    index_value = str(row.get('Index') or '').strip()
+    return int(index_value) if index_value.isdigit() else None
+
+def append_csv_rows(store: SongStore, rows, next_index: int = 0) -> int:
+    """Agrega al almacén las filas válidas y devuelve el siguiente Index libre"""
+    for row in rows:
+        index = row_index(row)
+        if index is not None and index >= next_index:
+            next_index = index + 1
+        try:
+            song = row_to_song(row)
+        except (ValueError, KeyError, TypeError):
+            continue
+        store.append(song, index)
+    return next_index
+
+# --- Snapshot binario del catálogo ---
+# Archivo music.csv.snapshot: encabezado fijo, metadatos en JSON y luego cada
+# columna del SongStore tal cual está en memoria, alineada a 8 bytes para
+# poder mapearla con mmap sin copiar. El catálogo agrega los buffers de
+# SearchIndex y ArtistIndex, así el arranque tampoco rearma los índices.
+
+SNAPSHOT_MAGIC = b'SONGSNAP'
+SNAPSHOT_VERSION = 4
+SNAPSHOT_HEADER = struct.Struct('<8sII')
+SNAPSHOT_HASH_CHUNK = 1 << 20
+# Los índices guardados solo sirven si se armaron con los mismos parámetros
+INDEX_PARAMS = {'ngram': SearchIndex.NGRAM, 'top_n': ArtistIndex.TOP_N}
+
+def snapshot_path(file_path: pathlib.Path) -> pathlib.Path:
+    return pathlib.Path(f"{file_path}.snapshot")
+
+def _padded(size: int) -> int:
+    return (size + 7) & ~7
+
+def csv_prefix_hash(file_path: pathlib.Path, size: int) -> str:
+    """Hash de los primeros size bytes del CSV (todos: una edición en el medio también cuenta)"""
+    digest = hashlib.blake2b(str(size).encode(), digest_size=16)
+    with open(file_path, 'rb') as file:
+        remaining = size
+        while remaining > 0:
+            chunk = file.read(min(remaining, SNAPSHOT_HASH_CHUNK))
+            if not chunk:
+                break
+            digest.update(chunk)
+            remaining -= len(chunk)
+    return digest.hexdigest()
+
+def write_snapshot(file_path: pathlib.Path, store: SongStore, next_index: int, csv_size: int,
+                   indexes: dict = None) -> None:
+    """Guarda el almacén columnar (y los buffers de los índices, si se pasan) junto al CSV.
+
+    Los errores de escritura se ignoran: el snapshot es solo un caché.
+    """
+    path = snapshot_path(file_path)
+    temp_path = path.with_name(path.name + '.tmp')
+    try:
+        stat = os.stat(file_path)
+        buffers = {name: memoryview(buffer) for name, buffer in {**store.buffers(), **(indexes or {})}.items()}
+        columns = {}
+        offset = 0
+        for name, buffer in buffers.items():
+            columns[name] = [buffer.format, buffer.itemsize, offset, buffer.nbytes]
+            offset += _padded(buffer.nbytes)
+        meta = json.dumps({
+            'csv_size': csv_size,
+            'csv_mtime_ns': stat.st_mtime_ns,
+            'csv_hash': csv_prefix_hash(file_path, csv_size),
+            'next_index': next_index,
+            'byteorder': sys.byteorder,
+            'indexes': INDEX_PARAMS if indexes else None,
+            'columns': columns,
+        }).encode('utf-8')
+
+        header_size = SNAPSHOT_HEADER.size + len(meta)
+        with open(temp_path, 'wb') as snapshot_file:
+            snapshot_file.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(meta)))
+            snapshot_file.write(meta)
+            snapshot_file.write(bytes(_padded(header_size) - header_size))
+            for buffer in buffers.values():
+                snapshot_file.write(buffer.cast('B'))
+                snapshot_file.write(bytes(_padded(buffer.nbytes) - buffer.nbytes))
+        os.replace(temp_path, path)
+    except OSError:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+def read_snapshot(file_path: pathlib.Path):
+    """Mapea el snapshot si sigue describiendo el principio del CSV.
+
+    Devuelve (almacén, siguiente Index, bytes del CSV cubiertos, índices) o
+    None si no existe, es de otra versión o el CSV cambió más allá de agregar
+    filas. índices son los buffers de SearchIndex y ArtistIndex para las filas
+    del almacén, o {} si el snapshot no los trae o son de otros parámetros.
+    """
+    try:
+        stat = os.stat(file_path)
+        with open(snapshot_path(file_path), 'rb') as snapshot_file:
+            mapped = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    try:
+        magic, version, meta_size = SNAPSHOT_HEADER.unpack_from(mapped)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            return None
+        meta = json.loads(mapped[SNAPSHOT_HEADER.size:SNAPSHOT_HEADER.size + meta_size])
+        csv_size = meta['csv_size']
+        if meta['byteorder'] != sys.byteorder or stat.st_size < csv_size:
+            return None
+        if stat.st_size == csv_size and stat.st_mtime_ns != meta['csv_mtime_ns']:
+            # Mismo tamaño pero otro mtime: el archivo se editó, no solo se agregaron filas
+            return None
+        if stat.st_size > csv_size and csv_prefix_hash(file_path, csv_size) != meta['csv_hash']:
+            return None
+
+        data_start = _padded(SNAPSHOT_HEADER.size + meta_size)
+        view = memoryview(mapped)
+        buffers = {}
+        for name, (typecode, itemsize, offset, size) in meta['columns'].items():
+            if array(typecode).itemsize != itemsize:
+                return None
+            start = data_start + offset
+            buffers[name] = view[start:start + size].cast(typecode)
+        indexes = buffers if meta['indexes'] == INDEX_PARAMS else {}
+        return SongStore.from_buffers(buffers), meta['next_index'], csv_size, indexes
+    except (struct.error, ValueError, KeyError, TypeError):
+        return None
+
+def scan_song_store(file_path: pathlib.Path = MUSIC_CSV, use_snapshot: bool = True) -> tuple:
+    """Almacén del snapshot (si sigue valiendo) más las filas del CSV que este no cubre.
+
+    Devuelve (almacén, siguiente Index, bytes del CSV leídos, snapshot). snapshot
+    es None o un dict con los bytes que cubría ('covered'), los buffers de
+    los índices ('indexes') y cuántas filas describen ('rows'). Si el CSV no
+    se pudo leer, los bytes leídos son None.
+    """
+    store = SongStore()
+    next_index = 0
+    snapshot = None
+    try:
+        covered = 0
+        header = None
+        loaded = read_snapshot(file_path) if use_snapshot else None
+        if loaded is not None:
+            store, next_index, covered, indexes = loaded
+            snapshot = {'covered': covered, 'indexes': indexes, 'rows': len(store)}
+            if covered == os.path.getsize(file_path):
+                return store, next_index, covered, snapshot
+            with open(file_path, 'r', encoding='utf-8', newline='') as file:
+                header = next(csv.reader(file), None)
+
+        with open(file_path, 'rb') as raw_file:
+            raw_file.seek(covered)
+            file = io.TextIOWrapper(raw_file, encoding='utf-8', newline='')
+            reader = csv.DictReader(file, fieldnames=header, delimiter=',')
+            next_index = append_csv_rows(store, reader, next_index)
+            covered = raw_file.tell()
+            file.detach()
+        return store, next_index, covered, snapshot
+    except FileNotFoundError:
+        print("\nError: No se encontró el archivo music.csv")
+    except Exception as e:
+        print(f"\nError al leer el archivo: {e}")
+    return store, next_index, None, snapshot
+
+def load_song_store(file_path: pathlib.Path = MUSIC_CSV, use_snapshot: bool = True) -> tuple:
+    """Carga music.csv directamente en el almacén columnar (sin lista intermedia).
+
+    Si hay un snapshot binario válido lo mapea en lugar de parsear el CSV; si
+    el CSV solo creció, parsea únicamente las filas nuevas y lo actualiza.
+    Devuelve el almacén y el siguiente Index libre, calculado en la misma pasada.
+    """
+    store, next_index, covered, snapshot = scan_song_store(file_path, use_snapshot)
+    if use_snapshot and covered is not None and (snapshot is None or snapshot['covered'] != covered):
+        write_snapshot(file_path, store, next_index, covered)
+    return store, next_index
+
+# --- Registro de escritura anticipada (WAL) ---
+
+WAL_MAGIC = b'SONGWAL1\n'
+# Tipos de registro: filas nuevas o contadores nuevos (Index, Views, Likes y Stream) de filas existentes
+WAL_INSERT = b'#'
+WAL_UPDATE = b'='
+# El registro se pliega en music.csv cuando supera este tamaño o la cuarta
+# parte del CSV (así copiar el CSV al compactar queda amortizado)
+WAL_COMPACT_BYTES = 8 << 20
+
+def wal_path(file_path: pathlib.Path) -> pathlib.Path:
+    """Registro de inserciones pendientes de plegar en el CSV"""
+    return pathlib.Path(f"{file_path}.wal")
+
+def encode_rows(rows) -> bytes:
+    """Filas del CSV (dicts con FIELDNAMES) codificadas igual que en music.csv"""
+    buffer = io.StringIO()
+    csv.DictWriter(buffer, fieldnames=FIELDNAMES).writerows(rows)
+    return buffer.getvalue().encode('utf-8')
+
+def decode_rows(payload: bytes):
+    return csv.DictReader(io.StringIO(payload.decode('utf-8'), newline=''), fieldnames=FIELDNAMES)
+
+def read_wal(path: pathlib.Path, limit: int = None) -> tuple:
+    """Registros completos del WAL, como (tipo, filas CSV), y el offset donde termina el último válido.
+
+    Un registro cortado por una caída (longitud o CRC que no coinciden) y todo
+    lo que le sigue se descartan, de modo que cada lote se aplica entero o nada.
+    """
+    try:
+        with open(path, 'rb') as file:
+            data = file.read() if limit is None else file.read(limit)
+    except FileNotFoundError:
+        return [], 0
+    if not data.startswith(WAL_MAGIC):
+        return [], 0
+
+    records = []
+    position = len(WAL_MAGIC)
+    while position < len(data):
+        line_end = data.find(b'\n', position)
+        kind = data[position:position + 1]
+        if line_end < 0 or kind not in (WAL_INSERT, WAL_UPDATE):
+            break
+        try:
+            length, checksum = data[position + 1:line_end].split()
+            length, checksum = int(length), int(checksum, 16)
+        except ValueError:
+            break
+        end = line_end + 1 + length
+        payload = data[line_end + 1:end]
+        if len(payload) != length or zlib.crc32(payload) != checksum:
+            break
+        records.append((kind, payload))
+        position = end
+    return records, position
+
+def pending_row(row: dict, csv_next_index: int) -> bool:
+    """True si una fila del WAL todavía no está plegada en el CSV (las sin Index se conservan)"""
+    index = row_index(row)
+    return index is None or index >= csv_next_index
+
+def wal_next_index(file_path: pathlib.Path) -> int:
+    """Siguiente Index según las filas del WAL (0 si está vacío)"""
+    records, _ = read_wal(wal_path(file_path))
+    indexes = (row_index(row) for kind, payload in records if kind == WAL_INSERT
+               for row in decode_rows(payload))
+    return max((index for index in indexes if index is not None), default=-1) + 1
+
+def counts_by_index(records) -> dict:
+    """Contadores de los registros de actualización, por Index (el último gana)"""
+    updates = {}
+    for kind, payload in records:
+        if kind == WAL_UPDATE:
+            for row in decode_rows(payload):
+                index = row_index(row)
+                if index is not None:
+                    updates[index] = row_counts(row)
+    return updates
+
+def with_counts(rows, updates: dict):
+    """Filas (dicts) con Views, Likes y Stream reemplazados según su Index"""
+    for row in rows:
+        counts = updates.get(row_index(row))
+        if counts is not None:
+            row = {**row, 'Views': str(counts[0]), 'Likes': str(counts[1]), 'Stream': str(counts[2])}
+        yield row
+
+def copy_csv_with_counts(source, target, updates: dict) -> None:
+    """Copia el CSV (archivos binarios) reemplazando los contadores de las filas con Index en updates"""
+    # Se reescriben todas las filas: las que no cambian pueden quedar con otras comillas
+    reader = csv.reader(io.TextIOWrapper(source, encoding='utf-8', newline=''))
+    output = io.TextIOWrapper(target, encoding='utf-8', newline='')
+    writer = csv.writer(output)
+    header = next(reader, None)
+    if header is not None:
+        writer.writerow(header)
+        columns = {name: position for position, name in enumerate(header)}
+        index_column = columns.get('Index', 0)
+        count_columns = [columns.get(name) for name in ('Views', 'Likes', 'Stream')]
+        for fields in reader:
+            index_value = fields[index_column].strip() if index_column < len(fields) else ''
+            counts = updates.get(int(index_value)) if index_value.isdigit() else None
+            if counts is not None:
+                for column, value in zip(count_columns, counts):
+                    if column is not None and column < len(fields):
+                        fields[column] = str(value)
+            writer.writerow(fields)
+    output.flush()
+    output.detach()
+
+def _fsync_directory(path: pathlib.Path) -> None:
+    """Persiste un rename (solo posible en POSIX)"""
+    if os.name == 'posix':
+        fd = os.open(path.parent, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+class WriteAheadLog:
+    """Registro de solo agregado para las inserciones de music.csv.
+
+    Cada lote de filas es un registro "#<longitud> <crc32>\n<filas CSV>" (con
+    "=" en lugar de "#" si son contadores nuevos de filas existentes). Las
+    sincronizaciones a disco se agrupan (group commit): append(sync=False)
+    solo escribe y sync() hace un único fsync por todos los registros
+    pendientes. compact() pliega el registro en el CSV con temporal + rename.
+    """
+
+    def __init__(self, file_path: pathlib.Path):
+        self.csv_path = pathlib.Path(file_path)
+        self.path = wal_path(file_path)
+        # Serializa escrituras, fsync y compactación (que puede correr en otro hilo)
+        self.lock = threading.RLock()
+        self._file = None
+        self._pending = 0
+        self.syncs = 0
+        self.records = 0
+
+    def _open(self):
+        if self._file is None:
+            _, valid_end = read_wal(self.path)
+            self._file = open(self.path, 'r+b' if valid_end else 'wb')
+            if valid_end:
+                # Descartar la cola de un lote que no llegó a escribirse completo
+                self._file.truncate(valid_end)
+                self._file.seek(valid_end)
+            else:
+                self._file.write(WAL_MAGIC)
+        return self._file
+
+    def size(self) -> int:
+        with self.lock:
+            if self._file is not None:
+                return self._file.tell()
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def append(self, rows, sync: bool = True, kind: bytes = WAL_INSERT) -> None:
+        """Agrega un lote como un solo registro (atómico ante caídas una vez sincronizado)"""
+        payload = encode_rows(rows)
+        with self.lock:
+            file = self._open()
+            file.write(kind + b'%d %08x\n' % (len(payload), zlib.crc32(payload)))
+            file.write(payload)
+            file.flush()
+            self._pending += 1
+            self.records += 1
+            if sync:
+                self.sync()
+
+    def sync(self) -> None:
+        """Un único fsync para todos los registros escritos desde el anterior"""
+        with self.lock:
+            if self._pending and self._file is not None:
+                os.fsync(self._file.fileno())
+                self._pending = 0
+                self.syncs += 1
+
+    def close(self) -> None:
+        with self.lock:
+            if self._file is not None:
+                self.sync()
+                self._file.close()
+                self._file = None
+
+    @staticmethod
+    def _unfolded(payload: bytes, csv_next_index: int) -> bytes:
+        """Quita de un registro las filas que ya están en el CSV (caída a mitad de compactar)"""
+        # Los Index de un registro son crecientes: basta mirar la primera fila
+        first = next(iter(decode_rows(payload)), None)
+        if first is None or pending_row(first, csv_next_index):
+            return payload
+        return encode_rows(row for row in decode_rows(payload) if pending_row(row, csv_next_index))
+
+    def compact(self, on_replace=None) -> bool:
+        """Pliega el WAL en el CSV de forma atómica; devuelve si había algo que plegar.
+
+        La copia del CSV se hace sin bloquear las inserciones; los registros
+        que lleguen mientras tanto pasan a un WAL nuevo. Si hay una caída entre
+        los dos rename, al cargar se ignoran las filas del WAL que ya están en
+        el CSV (su Index es menor que el siguiente Index del CSV) y las
+        actualizaciones se vuelven a aplicar (fijan valores, no suman).
+        """
+        with self.lock:
+            self.sync()
+            records, folded_end = read_wal(self.path)
+        if not records:
+            return False
+        updates = counts_by_index(records)
+
+        try:
+            csv_next_index = tail_next_index(self.csv_path)
+        except OSError:
+            csv_next_index = 0
+        temp_path = self.csv_path.with_name(self.csv_path.name + '.tmp')
+        with open(temp_path, 'w+b') as temp_file:
+            try:
+                with open(self.csv_path, 'rb') as csv_file:
+                    if updates:
+                        copy_csv_with_counts(csv_file, temp_file, updates)
+                    else:
+                        shutil.copyfileobj(csv_file, temp_file, 1 << 20)
+            except FileNotFoundError:
+                pass
+            if temp_file.tell() == 0:
+                temp_file.write(encode_rows([dict(zip(FIELDNAMES, FIELDNAMES))]))
+            else:
+                temp_file.seek(-1, os.SEEK_END)
+                if temp_file.read(1) != b'\n':
+                    temp_file.write(b'\r\n')
+            for kind, payload in records:
+                if kind != WAL_INSERT:
+                    continue
+                payload = self._unfolded(payload, csv_next_index)
+                if updates:
+                    payload = encode_rows(with_counts(decode_rows(payload), updates))
+                temp_file.write(payload)
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+
+        with self.lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            with open(self.path, 'rb') as wal_file:
+                wal_file.seek(folded_end)
+                remainder = wal_file.read()
+            if updates:
+                # Con filas del medio cambiadas, el muestreo del snapshot no lo notaría
+                try:
+                    os.remove(snapshot_path(self.csv_path))
+                except OSError:
+                    pass
+            os.replace(temp_path, self.csv_path)
+
+            temp_wal = self.path.with_name(self.path.name + '.tmp')
+            with open(temp_wal, 'wb') as wal_file:
+                wal_file.write(WAL_MAGIC + remainder)
+                wal_file.flush()
+                os.fsync(wal_file.fileno())
+            os.replace(temp_wal, self.path)
+            _fsync_directory(self.path)
+            if on_replace is not None:
+                on_replace(not remainder)
+        return True
+
+class SongCatalog:
+    """Catálogo de canciones cargado una sola vez en memoria.
+
+    Las inserciones se escriben en el WAL y se aplican en memoria; el catálogo
+    solo vuelve a leer los archivos si cambiaron por fuera (mtime/tamaño de
+    music.csv y del WAL). Los lectores ven siempre lotes completos.
+    """
+
+    def __init__(self, file_path: pathlib.Path = MUSIC_CSV, use_snapshot: bool = True,
+                 cache: QueryCache = None):
+        self.file_path = pathlib.Path(file_path)
+        self.use_snapshot = use_snapshot
+        self.cache = QueryCache() if cache is None else cache
+        self.log = WriteAheadLog(self.file_path)
+        self.songs = SongStore()
+        self._stamp = None
+        self._next_index = 0
+        self._bulk_start = None
+        self._bulk_updated = set()
+        self._duplicates = None
+        self._compactor = None
+        self.load()
+
+    def _file_stamp(self):
+        stamps = []
+        for path in (self.file_path, self.log.path):
+            try:
+                stat = os.stat(path)
+                stamps.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                stamps.append(None)
+        return tuple(stamps)
+
+    def load(self) -> None:
+        """Lee el CSV (o su snapshot) más las filas del WAL y recuerda sus mtime/tamaño"""
+        with self.log.lock:
+            self._stamp = self._file_stamp()
+            self.songs, self._next_index, covered, snapshot = scan_song_store(self.file_path, self.use_snapshot)
+            if self._stamp[0] is not None:
+                write_index_meta(self.file_path, self._next_index)
+
+            # Índices de las filas del CSV: del snapshot si los trae, si no se arman
+            if snapshot is not None and snapshot['indexes']:
+                self.search_index = SearchIndex.from_buffers(snapshot['indexes'], 'search')
+                self.artist_index = ArtistIndex.from_buffers(snapshot['indexes'], 'artists', self.songs)
+                self._index_rows(range(snapshot['rows'], len(self.songs)))
+            else:
+                self.search_index = SearchIndex(self.songs)
+                self.artist_index = ArtistIndex(self.songs)
+            if self.use_snapshot and covered is not None and (
+                    snapshot is None or snapshot['covered'] != covered or not snapshot['indexes']):
+                write_snapshot(self.file_path, self.songs, self._next_index, covered, self.index_buffers())
+
+            # Filas del WAL todavía no plegadas (las de Index menor ya están en el CSV)
+            csv_next_index = self._next_index
+            start = len(self.songs)
+            records, _ = read_wal(self.log.path)
+            rows = (row for kind, payload in records if kind == WAL_INSERT
+                    for row in decode_rows(payload) if pending_row(row, csv_next_index))
+            self._next_index = append_csv_rows(self.songs, rows, self._next_index)
+            self._index_rows(range(start, len(self.songs)))
+            # Las actualizaciones solo fijan contadores: alcanza con aplicarlas después de las filas
+            updates = counts_by_index(records)
+            if updates:
+                updated = []
+                for row_id, index in enumerate(self.songs.index):
+                    counts = updates.get(index)
+                    if counts is not None:
+                        self.songs.set_counts(row_id, *counts)
+                        updated.append(row_id)
+                self._rerank(updated, len(self.songs))
+
+        self._duplicates = None
+        self.cache.clear()
+
+    def _index_rows(self, row_ids: range) -> None:
+        """Agrega a los índices filas que ya están en el almacén"""
+        self.search_index.add_rows(self.songs, row_ids)
+        for row_id in row_ids:
+            self.artist_index.add(row_id)
+
+    def index_buffers(self) -> dict:
+        """Buffers de los índices para guardarlos en el snapshot"""
+        return {**self.search_index.buffers('search'), **self.artist_index.buffers('artists')}
+
+    def refresh(self) -> bool:
+        """Recarga el catálogo solo si los archivos cambiaron desde la última lectura"""
+        with self.log.lock:
+            changed = self._file_stamp() != self._stamp
+        if changed:
+            self.load()
+        return changed
+
+    def next_index(self) -> int:
+        """Siguiente Index libre, sin volver a leer music.csv si está al día"""
+        if self._file_stamp() == self._stamp:
+            return self._next_index
+        return get_next_index(self.file_path)
+
+    def insert_rows(self, rows: list, sync: bool = True) -> None:
+        """Escribe un lote en el WAL como un solo registro y lo aplica en memoria.
+
+        Con sync=False el fsync queda pendiente para agruparlo con otros lotes
+        (ver WriteAheadLog.sync).
+        """
+        with self.log.lock:
+            self.log.append(rows, sync)
+            self.append_rows(rows)
+        if self._bulk_start is None and self.log.size() >= self.compact_threshold():
+            self.compact(background=True)
+
+    def append_rows(self, rows) -> None:
+        """Aplica en memoria las filas que se acaban de escribir"""
+        for row in rows:
+            index = row_index(row)
+            if index is not None and index >= self._next_index:
+                self._next_index = index + 1
+            try:
+                song = row_to_song(row)
+            except (ValueError, KeyError, TypeError):
+                continue
+            row_id = self.songs.append(song, index)
+            self.artist_index.add(row_id)
+            if self._duplicates is not None:
+                self._duplicates.add(row_id, song.spotify_uri, song.artist, song.track)
+            if self._bulk_start is None:
+                self.search_index.add_rows(self.songs, range(row_id, row_id + 1))
+                self.cache.invalidate_song(song)
+        self._stamp = self._file_stamp()
+
+    @property
+    def duplicates(self) -> DuplicateIndex:
+        """Índice de canciones repetidas; se arma la primera vez que se necesita"""
+        if self._duplicates is None:
+            songs = self.songs
+            self._duplicates = DuplicateIndex(
+                lambda row_id: (songs.spotify_uri[row_id], songs.artist[row_id], songs.track[row_id]),
+                len(songs))
+        return self._duplicates
+
+    def find_duplicate(self, data: dict):
+        """Id de fila de la canción ya cargada igual a data (misma URI o artista + título), o None"""
+        return self.duplicates.find(data['spotify_uri'], data['artist'], data['track'])
+
+    def csv_index(self, row_id: int) -> int:
+        """Index en music.csv de una fila (-1 si no tiene)"""
+        return self.songs.index[row_id]
+
+    def update_counts(self, changes: dict, sync: bool = True) -> set:
+        """Reemplaza vistas, likes y streams de filas existentes ({id de fila: (vistas, likes, streams)}).
+
+        Se escriben en el WAL como un registro de actualización referido por
+        Index y se aplican en memoria. Devuelve los ids actualizados: las filas
+        sin Index no se pueden referenciar y quedan igual.
+        """
+        changes = {row_id: counts for row_id, counts in changes.items() if self.csv_index(row_id) >= 0}
+        if not changes:
+            return set()
+        rows = [{'Index': str(self.csv_index(row_id)), 'Views': str(views), 'Likes': str(likes),
+                 'Stream': str(stream)} for row_id, (views, likes, stream) in changes.items()]
+        with self.log.lock:
+            self.log.append(rows, sync, kind=WAL_UPDATE)
+            for row_id, counts in changes.items():
+                self.songs.set_counts(row_id, *counts)
+            if self._bulk_start is None:
+                self._rerank(changes, len(self.songs))
+            else:
+                self._bulk_updated.update(changes)
+            self._stamp = self._file_stamp()
+        return set(changes)
+
+    def _rerank(self, row_ids, indexed: int) -> None:
+        """Reubica en los índices las filas cuya popularidad cambió (las indexadas, id < indexed)"""
+        songs = self.songs
+        self.search_index.update_keys({row_id: songs.popularity(row_id)
+                                       for row_id in row_ids if row_id < indexed})
+        self.artist_index.rebuild_top(row_ids)
+        self.cache.clear()
+
+    @contextmanager
+    def bulk_append(self):
+        """Agrupa muchas llamadas a append_rows y update_counts y actualiza los índices una sola vez"""
+        self._bulk_start = len(self.songs)
+        try:
+            yield self
+        finally:
+            new_ids = range(self._bulk_start, len(self.songs))
+            updated, self._bulk_updated = self._bulk_updated, set()
+            self._bulk_start = None
+            if updated:
+                self._rerank(updated, new_ids.start)
+            self.search_index.add_rows(self.songs, new_ids)
+            if new_ids:
+                # Revisar cada consulta contra miles de filas cuesta más que recalcularlas
+                self.cache.clear()
+
+    def compact_threshold(self) -> int:
+        csv_size = self._stamp[0][1] if self._stamp and self._stamp[0] else 0
+        return max(WAL_COMPACT_BYTES, csv_size // 4)
+
+    def compact(self, background: bool = False) -> bool:
+        """Pliega el WAL en music.csv (temporal + rename); en segundo plano si se pide"""
+        if self._compactor is not None and self._compactor.is_alive():
+            if background:
+                return False
+            self._compactor.join()
+        if background:
+            self._compactor = threading.Thread(target=self.log.compact, args=(self._on_compacted,),
+                                               name='compactacion-wal', daemon=True)
+            self._compactor.start()
+            return True
+
+        compacted = self.log.compact(self._on_compacted)
+        if compacted and self.use_snapshot and not read_wal(self.log.path)[0]:
+            # Con todo plegado, el snapshot puede cubrir el CSV completo
+            write_snapshot(self.file_path, self.songs, self._next_index, self._stamp[0][1],
+                           self.index_buffers())
+        return compacted
+
+    def _on_compacted(self, log_empty: bool) -> None:
+        # Se llama con el lock del WAL tomado: el contenido en memoria no cambia
+        self._stamp = self._file_stamp()
+        if log_empty:
+            write_index_meta(self.file_path, self._next_index)
+
+    def close(self) -> None:
+        """Espera a la compactación en curso y cierra el WAL"""
+        if self._compactor is not None:
+            self._compactor.join()
+        self.log.close()
+
+    def search(self, term: str):
+        """Canciones cuyo artista o título contienen el término, por popularidad"""
+        songs = self.songs
+        key = normalize_text(term)
+        row_ids = self.cache.get('search', key) if key else None
+        if row_ids is None:
+            row_ids = self._search_and_cache(term, key)
+        return (songs[row_id] for row_id in row_ids)
+
+    def _search_and_cache(self, term: str, key: str):
+        """Recorre el índice y guarda el resultado si se consumió completo y es corto"""
+        generation = self.cache.generation
+        row_ids = []
+        for row_id in self.search_index.search(term):
+            if row_ids is not None:
+                row_ids.append(row_id)
+                if len(row_ids) > self.cache.max_results:
+                    row_ids = None
+            yield row_id
+        if row_ids is not None and key:
+            self.cache.put('search', key, row_ids, generation)
+
+    def top_songs(self, artist_name: str, n: int = 5) -> list:
+        """Canciones más populares de los artistas que coinciden con el nombre"""
+        key = normalize_text(artist_name)
+        row_ids = self.cache.get('top', key)
+        if row_ids is None:
+            # Se guarda el top completo para servir cualquier n desde la misma entrada
+            row_ids = self.artist_index.top_songs(artist_name)
+            self.cache.put('top', key, row_ids)
+        return [self.songs[row_id] for row_id in row_ids[:max(n, 0)]]
+
+    def albums(self, artist_name: str) -> list:
+        """Álbumes (nombre, canciones, duración total en ms) de un artista"""
+        key = normalize_text(artist_name)
+        albums = self.cache.get('albums', key)
+        if albums is None:
+            albums = self.artist_index.albums(artist_name)
+            self.cache.put('albums', key, albums)
+        return albums
+
+# --- Almacenamiento opcional en SQLite ---
+# Alternativa a music.csv + WAL con la misma interfaz que SongCatalog. Las
+# columnas de búsqueda tienen índices, las subcadenas se buscan con FTS5
+# (tokenizador trigram, si este SQLite lo trae) y cada lote de inserciones
+# es una transacción. music.csv sigue siendo el almacenamiento por defecto.
+
+# Columnas del CSV que no se consultan: se guardan juntas en JSON para poder exportarlas
+DB_EXTRA_FIELDS = [name for name in FIELDNAMES if name not in (
+    'Index', 'Artist', 'Url_spotify', 'Track', 'Album', 'Uri', 'Duration_ms', 'Url_youtube',
+    'Views', 'Likes', 'Stream')]
+
+SONGS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS artists (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    name_norm TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS songs (
+    id INTEGER PRIMARY KEY,
+    idx INTEGER,
+    artist_id INTEGER NOT NULL REFERENCES artists(id),
+    track TEXT NOT NULL,
+    album TEXT NOT NULL,
+    uri TEXT NOT NULL,
+    url_spotify TEXT NOT NULL,
+    url_youtube TEXT NOT NULL,
+    duration_ms INTEGER NOT NULL,
+    stream INTEGER NOT NULL,
+    likes INTEGER NOT NULL,
+    views INTEGER NOT NULL,
+    popularity INTEGER NOT NULL,
+    name_key TEXT NOT NULL,
+    search_text TEXT NOT NULL,
+    extra TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS songs_idx ON songs(idx);
+CREATE INDEX IF NOT EXISTS songs_uri ON songs(uri);
+CREATE INDEX IF NOT EXISTS songs_name_key ON songs(name_key);
+CREATE INDEX IF NOT EXISTS songs_track ON songs(track);
+CREATE INDEX IF NOT EXISTS songs_artist_popularity ON songs(artist_id, popularity DESC, id);
+CREATE INDEX IF NOT EXISTS songs_popularity ON songs(popularity DESC, id);
+"""
+
+SONG_SELECT = ("SELECT a.name, s.track, s.album, s.uri, s.duration_ms, s.url_spotify, s.url_youtube, "
+               "s.stream, s.likes, s.views FROM songs s JOIN artists a ON a.id = s.artist_id")
+MATCHING_ARTISTS = "SELECT id FROM artists WHERE instr(name_norm, ?) > 0"
+
+def db_search_text(artist: str, track: str) -> str:
+    # Salto de línea como separador: SQLite no compara bien textos con '\0'
+    return normalize_text(artist) + '\n' + normalize_text(track)
+
+def db_name_key(artist: str, track: str) -> str:
+    return DuplicateIndex.name_key(artist, track).replace('\0', '\n')
+
+class SqliteSongCatalog:
+    """Catálogo de canciones guardado en una base SQLite.
+
+    Tiene la interfaz de SongCatalog que usan los comandos (search,
+    top_songs, albums, insert_rows, update_counts, find_duplicate...), así
+    que el menú y la línea de comandos funcionan igual; en lugar de cargar
+    todo en memoria, cada consulta usa los índices de la base.
+    """
+
+    def __init__(self, db_path: pathlib.Path):
+        self.db_path = pathlib.Path(db_path)
+        self.connection = sqlite3.connect(self.db_path)
+        # WAL de SQLite: los lectores no bloquean al que escribe; NORMAL hace fsync al plegarlo
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SONGS_SCHEMA)
+        self.fts = self._create_fts()
+        self._artists = {}
+
+    def _create_fts(self) -> bool:
+        """Crea la tabla FTS5 de subcadenas; False si este SQLite no tiene FTS5 o trigram"""
+        existed = self.connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'songs_fts'").fetchone() is not None
+        try:
+            with self.connection:
+                self.connection.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS songs_fts USING fts5(search_text, "
+                    "content='songs', content_rowid='id', tokenize='trigram')")
+                if not existed:
+                    # Base creada por un SQLite sin trigram: indexar las filas que ya tenía
+                    self.connection.execute("INSERT INTO songs_fts(songs_fts) VALUES ('rebuild')")
+        except sqlite3.OperationalError:
+            return False
+        return True
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM songs").fetchone()[0]
+
+    def _artist_id(self, name: str) -> int:
+        artist_id = self._artists.get(name)
+        if artist_id is None:
+            found = self.connection.execute("SELECT id FROM artists WHERE name = ?", (name,)).fetchone()
+            if found is None:
+                artist_id = self.connection.execute(
+                    "INSERT INTO artists (name, name_norm) VALUES (?, ?)",
+                    (name, normalize_text(name))).lastrowid
+            else:
+                artist_id = found[0]
+            self._artists[name] = artist_id
+        return artist_id
+
+    def _song_values(self, row: dict):
+        """Valores de una fila del CSV para INSERT (None si la fila es inválida)"""
+        try:
+            song = row_to_song(row)
+        except (ValueError, KeyError, TypeError):
+            return None
+        return (row_index(row), self._artist_id(song.artist), song.track, song.album, song.spotify_uri,
+                song.spotify_url, song.youtube_url, song.duration_ms, song.stream, song.likes,
+                song.views, popularity(song), db_name_key(song.artist, song.track),
+                db_search_text(song.artist, song.track),
+                json.dumps({name: row.get(name) or '' for name in DB_EXTRA_FIELDS}, ensure_ascii=False))
+
+    def insert_rows(self, rows: list, sync: bool = True) -> None:
+        """Inserta un lote en una sola transacción (sync no aplica: cada lote se confirma entero)"""
+        with self.connection:
+            last_id = self.connection.execute("SELECT COALESCE(MAX(id), 0) FROM songs").fetchone()[0]
+            values = [value for value in map(self._song_values, rows) if value is not None]
+            self.connection.executemany(
+                "INSERT INTO songs (idx, artist_id, track, album, uri, url_spotify, url_youtube, "
+                "duration_ms, stream, likes, views, popularity, name_key, search_text, extra) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", values)
+            if self.fts:
+                self.connection.execute("INSERT INTO songs_fts(rowid, search_text) "
+                                        "SELECT id, search_text FROM songs WHERE id > ?", (last_id,))
+
+    def update_counts(self, changes: dict, sync: bool = True) -> set:
+        """Reemplaza vistas, likes y streams de filas existentes ({id de fila: (vistas, likes, streams)})"""
+        with self.connection:
+            self.connection.executemany(
+                "UPDATE songs SET views = ?, likes = ?, stream = ?, popularity = ? WHERE id = ?",
+                [(views, likes, stream, views if views > 0 else stream, row_id)
+                 for row_id, (views, likes, stream) in changes.items()])
+        return set(changes)
+
+    @contextmanager
+    def bulk_append(self):
+        # Cada lote ya es una transacción y los índices de la base se mantienen solos
+        yield self
+
+    def find_duplicate(self, data: dict):
+        """Id de fila de la canción igual a data (misma URI o artista + título), o None"""
+        uri = data['spotify_uri'].strip()
+        if uri:
+            found = self.connection.execute(
+                "SELECT id FROM songs WHERE uri = ? ORDER BY id LIMIT 1", (uri,)).fetchone()
+            if found is not None:
+                return found[0]
+        found = self.connection.execute(
+            "SELECT id, uri FROM songs WHERE name_key = ? ORDER BY id LIMIT 1",
+            (db_name_key(data['artist'], data['track']),)).fetchone()
+        # Mismo criterio que DuplicateIndex: dos URIs distintas son canciones distintas
+        if found is None or (uri and found[1]):
+            return None
+        return found[0]
+
+    def csv_index(self, row_id: int) -> int:
+        found = self.connection.execute("SELECT idx FROM songs WHERE id = ?", (row_id,)).fetchone()
+        return -1 if found is None or found[0] is None else found[0]
+
+    def next_index(self) -> int:
+        return self.connection.execute("SELECT COALESCE(MAX(idx), -1) + 1 FROM songs").fetchone()[0]
+
+    def refresh(self) -> bool:
+        # Cada consulta lee la base: no hay nada que recargar
+        return False
+
+    def compact(self, background: bool = False) -> bool:
+        """Pliega el WAL de SQLite en la base y actualiza las estadísticas del planificador"""
+        self.connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self.connection.execute("PRAGMA optimize")
+        return True
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def search(self, term: str):
+        """Canciones cuyo artista o título contienen el término, por popularidad"""
+        query = normalize_text(term)
+        if not query:
+            return iter(())
+        if self.fts and len(query) >= SearchIndex.NGRAM:
+            # Con trigram, una frase entre comillas coincide con cualquier subcadena
+            rows = self.connection.execute(
+                SONG_SELECT + " JOIN songs_fts ON songs_fts.rowid = s.id WHERE songs_fts MATCH ? "
+                "ORDER BY s.popularity DESC, s.id", ('"' + query.replace('"', '""') + '"',))
+        else:
+            # Términos cortos: se recorre el índice por popularidad y se cortan al paginar
+            rows = self.connection.execute(
+                SONG_SELECT + " WHERE instr(s.search_text, ?) > 0 ORDER BY s.popularity DESC, s.id",
+                (query,))
+        return (SongDto(*row) for row in rows)
+
+    def top_songs(self, artist_name: str, n: int = 5) -> list:
+        """Canciones más populares de los artistas que coinciden con el nombre"""
+        # Mismo tope que el índice de artistas del backend CSV
+        limit = min(max(n, 0), ArtistIndex.TOP_N)
+        rows = self.connection.execute(
+            SONG_SELECT + f" WHERE s.artist_id IN ({MATCHING_ARTISTS}) "
+            "ORDER BY s.popularity DESC, s.id LIMIT ?", (normalize_text(artist_name), limit))
+        return [SongDto(*row) for row in rows]
+
+    def albums(self, artist_name: str) -> list:
+        """Álbumes (nombre, canciones, duración total en ms) de un artista"""
+        return self.connection.execute(
+            f"SELECT album, COUNT(*), SUM(duration_ms) FROM songs WHERE artist_id IN ({MATCHING_ARTISTS}) "
+            "GROUP BY album ORDER BY MIN(id)", (normalize_text(artist_name),)).fetchall()
+
+    def import_csv(self, file_path: pathlib.Path, batch_size: int = 5_000) -> int:
+        """Copia music.csv (con su WAL ya plegado) a la base vacía; devuelve las canciones copiadas"""
+        if len(self):
+            raise ValueError(f"la base {self.db_path} ya tiene canciones")
+        log = WriteAheadLog(file_path)
+        log.compact()
+        log.close()
+        with open(file_path, 'r', encoding='utf-8', newline='') as file:
+            reader = csv.DictReader(file)
+            for batch in iter(lambda: list(itertools.islice(reader, batch_size)), []):
+                self.insert_rows(batch)
+        self.compact()
+        return len(self)
+
+    def export_csv(self, file_path: pathlib.Path) -> int:
+        """Reescribe music.csv (temporal + rename) con el contenido de la base"""
+        if read_wal(wal_path(file_path))[0]:
+            raise ValueError(f"{file_path} tiene inserciones sin plegar (usar el comando compact)")
+        file_path = pathlib.Path(file_path)
+        temp_path = file_path.with_name(file_path.name + '.tmp')
+        rows = self.connection.execute(
+            "SELECT s.idx, a.name, s.url_spotify, s.track, s.album, s.uri, s.duration_ms, s.url_youtube, "
+            "s.views, s.likes, s.stream, s.extra FROM songs s JOIN artists a ON a.id = s.artist_id ORDER BY s.id")
+        count = 0
+        with open(temp_path, 'w', encoding='utf-8', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=FIELDNAMES)
+            writer.writeheader()
+            for index, artist, url, track, album, uri, duration, youtube, views, likes, stream, extra in rows:
+                writer.writerow({
+                    **json.loads(extra), 'Index': '' if index is None else index, 'Artist': artist,
+                    'Url_spotify': url, 'Track': track, 'Album': album, 'Uri': uri, 'Duration_ms': duration,
+                    'Url_youtube': youtube, 'Views': views, 'Likes': likes, 'Stream': stream,
+                })
+                count += 1
+            file.flush()
+            os.fsync(file.fileno())
+        # El snapshot y el siguiente Index guardados describen el archivo anterior
+        for stale in (snapshot_path(file_path), index_meta_path(file_path)):
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+        os.replace(temp_path, file_path)
+        return count
+
+SEARCH_PAGE_SIZE = 20
+
+def paginate(items, page_size: int):
+    """Agrupa un iterable en páginas (listas) sin materializar el resto"""
+    items = iter(items)
+    while True:
+        page = list(itertools.islice(items, page_size))
+        if not page:
+            return
+        yield page
+
+def format_song(song: SongDto) -> str:
+    """Bloque de texto de una canción tal como lo muestra la búsqueda"""
+    lines = [f"Artista: {song.artist}", f"Canción: {song.track}",
+             f"Duración: {convert_duration(song.duration_ms)}"]
+    if song.views > 0:
+        lines.append(f"Reproducciones: {song.views / 1_000_000:.1f}M vistas")
+    elif song.stream > 0:
+        lines.append(f"Reproducciones: {song.stream / 1_000_000:.1f}M streams")
+    lines.append("-" * 50)
+    return "\n".join(lines) + "\n"
+
+def search_songs(catalog: SongCatalog, page_size: int = SEARCH_PAGE_SIZE) -> None:
     print("\nIngresa término de búsqueda para título o artista (presiona Enter sin texto para salir):")
     while True:
         search_term = input("> ").strip()
@@ -73,44 +1812,38 @@ def search_songs() -> None:
         if not search_term:
             break
             
-        # Búsqueda usando comparación sin distinción de mayúsculas para mejor confiabilidad
-        matches = [
-            song for song in songs 
-            if search_term.lower() in song.artist.lower() or search_term.lower() in song.track.lower()
-        ]
-        
-        # Ordenar por conteo de vistas (descendente) si está disponible, de lo contrario por streams
-        matches.sort(key=lambda x: (x.views if x.views > 0 else x.stream), reverse=True)
-        
-        if matches:
-            print(f"\nSe encontraron {len(matches)} coincidencias:")
-            for song in matches:
-                duration = convert_duration(song.duration_ms)
-                print(f"Artista: {song.artist}")
-                print(f"Canción: {song.track}")
-                print(f"Duración: {duration}")
-                if song.views > 0:
-                    views_m = song.views / 1_000_000
-                    print(f"Reproducciones: {views_m:.1f}M vistas")
-                elif song.stream > 0:
-                    stream_m = song.stream / 1_000_000
-                    print(f"Reproducciones: {stream_m:.1f}M streams")
-                print("-" * 50)
-        else:
+        # Búsqueda por índice (sin mayúsculas ni acentos); los resultados llegan
+        # perezosamente, ya ordenados por vistas (descendente) o por streams, así
+        # que cada página se arma sin recorrer ni ordenar el resto de coincidencias
+        pages = paginate(catalog.search(search_term), page_size)
+        page = next(pages, None)
+        if page is None:
             print("No se encontraron coincidencias.")
+            continue
 
-def artist_top_songs() -> None:
-    songs = parse_csv()
-    
+        shown = 0
+        while page is not None:
+            following = next(pages, None)
+            # Una sola escritura por página
+            text = [f"\nCoincidencias {shown + 1}-{shown + len(page)}:\n"]
+            text.extend(format_song(song) for song in page)
+            shown += len(page)
+            if following is None:
+                text.append(f"Se encontraron {shown} coincidencias.\n")
+            sys.stdout.write(''.join(text))
+            sys.stdout.flush()
+
+            if following is None:
+                break
+            if input("Enter para la siguiente página, 'q' para otra búsqueda: ").strip().lower() == 'q':
+                break
+            page = following
+
+def artist_top_songs(catalog: SongCatalog) -> None:
     artist_name = input("\nIngresa nombre del artista: ").strip()
 
-    artist_songs = [song for song in songs if artist_name.lower() in song.artist.lower()]
-    
-    # Ordenar por conteo de streams (descendente)
-    artist_songs.sort(key=lambda x: (x.views if x.views > 0 else x.stream), reverse=True)
-    
-    # Obtener top 5 canciones
-    top_songs = artist_songs[:5]
+    # Top 5 precalculado por artista (vistas si hay, si no streams)
+    top_songs = catalog.top_songs(artist_name, 5)
     
     if top_songs:
         print(f"\nTop 5 canciones de {artist_name}:")
@@ -158,9 +1891,17 @@ def spotify_url_to_uri(url):
     except Exception as e:
         raise ValueError(f"Error al procesar la URL: {str(e)}")
 
-def validate_song_data(data: dict):
+class SongValidator:
+    """Validador de datos de canciones con los patrones compilados una sola vez.
+
+    validate() devuelve una máscara de bits con los campos que fallaron (0 si
+    la canción es válida) en lugar de imprimir. Con fast=True los campos
+    numéricos (duración, likes, vistas) se verifican con operaciones de texto
+    en vez de expresiones regulares.
+    """
+
     # Patrones básicos de validación
-    patterns = {
+    PATTERNS = {
         'artist': r'^[A-Za-z0-9\s\.\,\-\_\'\&\(\)]+$',
         'track': r'^[A-Za-z0-9\s\.\,\-\_\'\&\(\)]+$',
         'album': r'^[A-Za-z0-9\s\.\,\-\_\'\&\(\)]+$',
@@ -172,47 +1913,212 @@ def validate_song_data(data: dict):
         'views': r'^\d+(\.\d+)?$'
     }
 
-    # Validar todos los campos
-    for field, pattern in patterns.items():
-        if field in data and data[field]:
-            if not re.match(pattern, str(data[field])):
-                print(f"Formato inválido para {field}: {data[field]}")
-                return False
-    
-    # Validar que los likes no sean más que las views
-    if 'likes' in data and 'views' in data and data['likes'] and data['views']:
-        try:
-            likes_val = float(data['likes'])
-            views_val = float(data['views'])
-            if likes_val > views_val:
-                print("Error: Los likes no pueden ser más que las vistas.")
-                return False
-        except ValueError:
-            print("Error: Los likes y vistas deben ser valores numéricos.")
-            return False
-            
+    FIELDS = tuple(PATTERNS)
+    # Un bit por campo, en el mismo orden que PATTERNS, más las reglas entre campos
+    FIELD_BITS = {field: 1 << bit for bit, field in enumerate(FIELDS)}
+    LIKES_OVER_VIEWS = 1 << len(FIELDS)
+    NOT_NUMERIC = 1 << (len(FIELDS) + 1)
+
+    def __init__(self, fast: bool = False):
+        self.fast = fast
+        self._checks = [(self.FIELD_BITS[field], field, re.compile(pattern).match)
+                        for field, pattern in self.PATTERNS.items()]
+        if fast:
+            # Las URIs y URLs de formato fijo también se probaron sin regex, pero
+            # el patrón compilado resultó más rápido; solo los números lo superan
+            fast_checks = {
+                'duration_ms': self._is_digits,
+                'likes': self._is_number,
+                'views': self._is_number,
+            }
+            self._checks = [(bit, field, fast_checks.get(field, check))
+                            for bit, field, check in self._checks]
+
+    # --- Verificaciones sin regex (equivalentes a los patrones, incluido que
+    # "$" acepta un salto de línea final) ---
+
+    @staticmethod
+    def _is_digits(value: str) -> bool:
+        return value.isdecimal() or (value[-1:] == '\n' and value[:-1].isdecimal())
+
+    @staticmethod
+    def _is_number(value: str) -> bool:
+        if value.isdecimal():
+            return True
+        if value[-1:] == '\n':
+            value = value[:-1]
+        whole, dot, decimals = value.partition('.')
+        return whole.isdecimal() and (not dot or decimals.isdecimal())
+
+    def validate(self, data: dict) -> int:
+        """Máscara de bits con los errores de una canción (0 si es válida)"""
+        mask = 0
+        for bit, field, check in self._checks:
+            value = data.get(field)
+            if value and not check(str(value)):
+                mask |= bit
+
+        # Validar que los likes no sean más que las views
+        likes, views = data.get('likes'), data.get('views')
+        if likes and views:
+            try:
+                if float(likes) > float(views):
+                    mask |= self.LIKES_OVER_VIEWS
+            except ValueError:
+                mask |= self.NOT_NUMERIC
+        return mask
+
+    def validate_batch(self, records: list) -> array:
+        """Valida un lote completo, campo por campo, y devuelve una máscara por fila"""
+        masks = [0] * len(records)
+        for bit, field, check in self._checks:
+            values = [record.get(field) for record in records]
+            for row in [row for row, value in enumerate(values) if value and not check(str(value))]:
+                masks[row] |= bit
+
+        for row, record in enumerate(records):
+            likes, views = record.get('likes'), record.get('views')
+            if likes and views:
+                try:
+                    if float(likes) > float(views):
+                        masks[row] |= self.LIKES_OVER_VIEWS
+                except ValueError:
+                    masks[row] |= self.NOT_NUMERIC
+        return array('I', masks)
+
+    def describe(self, data: dict, mask: int):
+        """Mensaje del primer error de la máscara (None si no hay errores)"""
+        for field in self.FIELDS:
+            if mask & self.FIELD_BITS[field]:
+                return f"Formato inválido para {field}: {data[field]}"
+        if mask & self.NOT_NUMERIC:
+            return "Error: Los likes y vistas deben ser valores numéricos."
+        if mask & self.LIKES_OVER_VIEWS:
+            return "Error: Los likes no pueden ser más que las vistas."
+        return None
+
+SONG_VALIDATOR = SongValidator(fast=True)
+
+def song_data_error(data: dict):
+    """Devuelve el motivo por el que los datos no son válidos, o None si lo son"""
+    return SONG_VALIDATOR.describe(data, SONG_VALIDATOR.validate(data))
+
+def validate_song_data(data: dict):
+    error = song_data_error(data)
+    if error:
+        print(error)
+        return False
     return True
 
-def get_next_index():
-    """Obtiene el siguiente índice disponible del archivo CSV"""
+def build_song_row(index: int, data: dict, stream: str = '0') -> dict:
+    """Arma la fila completa de music.csv para una canción validada"""
+    return {
+        'Index': str(index),
+        'Artist': data['artist'],
+        'Url_spotify': data['spotify_url'],
+        'Track': data['track'],
+        'Album': data['album'],
+        'Album_type': '',  # Nulo
+        'Uri': data['spotify_uri'],
+        'Danceability': '',  # Nulo
+        'Energy': '',  # Nulo
+        'Key': '',  # Nulo
+        'Loudness': '',  # Nulo
+        'Speechiness': '',  # Nulo
+        'Acousticness': '',  # Nulo
+        'Instrumentalness': '',  # Nulo
+        'Liveness': '',  # Nulo
+        'Valence': '',  # Nulo
+        'Tempo': '',  # Nulo
+        'Duration_ms': data['duration_ms'],
+        'Url_youtube': data['youtube_url'],
+        'Title': '',  # Nulo
+        'Channel': '',  # Nulo
+        'Views': data['views'],
+        'Likes': data['likes'],
+        'Comments': '',  # Nulo
+        'Licensed': '',  # Nulo
+        'official_video': '',  # Nulo
+        'Stream': stream
+    }
+
+def index_meta_path(file_path: pathlib.Path) -> pathlib.Path:
+    """Archivo auxiliar donde se guarda el siguiente Index libre"""
+    return pathlib.Path(f"{file_path}.meta.json")
+
+def write_index_meta(file_path: pathlib.Path, next_index: int) -> None:
+    """Guarda el siguiente Index junto con el tamaño/mtime actuales del CSV"""
+    try:
+        stat = os.stat(file_path)
+        with open(index_meta_path(file_path), 'w', encoding='utf-8') as meta_file:
+            json.dump({'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+                       'next_index': next_index}, meta_file)
+    except OSError:
+        pass
+
+def read_index_meta(file_path: pathlib.Path):
+    """Siguiente Index según el archivo auxiliar, o None si no existe o está desactualizado"""
     try:
-        if not os.path.exists("music.csv") or os.path.getsize("music.csv") == 0:
+        stat = os.stat(file_path)
+        with open(index_meta_path(file_path), 'r', encoding='utf-8') as meta_file:
+            meta = json.load(meta_file)
+        if meta['size'] == stat.st_size and meta['mtime_ns'] == stat.st_mtime_ns:
+            return int(meta['next_index'])
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return None
+
+def tail_next_index(file_path: pathlib.Path, block_size: int = 64 * 1024) -> int:
+    """Busca el último Index leyendo solo el final del CSV (los índices son crecientes)"""
+    size = os.path.getsize(file_path)
+    window = block_size
+    with open(file_path, 'rb') as file:
+        # La columna Index se ubica por el encabezado, como hace DictReader
+        header = next(csv.reader([file.readline().decode('utf-8', errors='replace')]), [])
+        if 'Index' not in header:
             return 0
-        
-        with open("music.csv", 'r', encoding='utf-8') as file:
-            csv_reader = csv.DictReader(file)
+        column = header.index('Index')
+        while True:
+            start = max(0, size - window)
+            file.seek(start)
+            text = file.read(size - start).decode('utf-8', errors='replace')
+            # Descartar la primera línea: es el encabezado o una fila cortada
+            text = text[text.find('\n') + 1:] if '\n' in text else ''
+
             last_index = -1
-            
-            for row in csv_reader:
-                index_value = row.get('Index', '').strip()
-                if index_value and index_value.isdigit():
-                    last_index = max(last_index, int(index_value))
-            
-            return last_index + 1
+            for fields in csv.reader(io.StringIO(text)):
+                # Filas cortas o con campos de más se aceptan si llegan a la columna Index
+                if len(fields) > column and fields[column].strip().isdigit():
+                    last_index = max(last_index, int(fields[column]))
+
+            if last_index >= 0 or start == 0:
+                return last_index + 1
+            window *= 2
+
+def get_next_index(file_path: pathlib.Path = MUSIC_CSV):
+    """Obtiene el siguiente índice disponible del archivo CSV y su WAL"""
+    try:
+        if not os.path.exists(file_path) or os.path.getsize(file_path) == 0:
+            return wal_next_index(file_path)
+
+        next_index = read_index_meta(file_path)
+        if next_index is None:
+            # Archivo auxiliar desactualizado: leer solo las últimas filas
+            next_index = tail_next_index(file_path)
+            write_index_meta(file_path, next_index)
+        return max(next_index, wal_next_index(file_path))
     except Exception:
         return 0
 
-def insert_song_manual() -> None:
+def append_song(catalog: SongCatalog, data: dict, sync: bool = True) -> int:
+    """Agrega al WAL y al catálogo una canción ya validada; devuelve su Index"""
+    # Obtener el siguiente índice disponible
+    next_index = catalog.next_index()
+    row = build_song_row(next_index, data)  # Stream '0' por defecto para nuevas canciones
+    catalog.insert_rows([row], sync)
+    return next_index
+
+def insert_song_manual(catalog: SongCatalog) -> None:
     """Insertar una canción manualmente desde entrada de terminal"""
     print("\nInsertar datos de nueva canción:")
     
@@ -249,145 +2155,197 @@ def insert_song_manual() -> None:
     data['views'] = input("Vistas: ").strip()
     
     if validate_song_data(data):
+        row_id = catalog.find_duplicate(data)
+        if row_id is not None:
+            print(f"La canción ya existe en el catálogo (Índice: {catalog.csv_index(row_id)}); no se agregó.")
+            return
         try:
-            # Obtener el siguiente índice disponible
-            next_index = get_next_index()
-
-            with open("music.csv", 'a', newline='', encoding='utf-8') as file:
-                fieldnames = ['Index','Artist','Url_spotify','Track','Album','Album_type','Uri',
-                              'Danceability','Energy','Key','Loudness','Speechiness','Acousticness',
-                              'Instrumentalness','Liveness','Valence','Tempo','Duration_ms','Url_youtube',
-                              'Title','Channel','Views','Likes','Comments','Licensed','official_video','Stream']
-                
-                writer = csv.DictWriter(file, fieldnames=fieldnames)
-                
-                # Verificar si el archivo está vacío y escribir encabezado si es necesario
-                if os.path.getsize("music.csv") == 0:
-                    writer.writeheader()
-                
-                writer.writerow({
-                    'Index': str(next_index),
-                    'Artist': data['artist'],
-                    'Url_spotify': data['spotify_url'],
-                    'Track': data['track'],
-                    'Album': data['album'],
-                    'Album_type': '',  # Nulo
-                    'Uri': data['spotify_uri'],
-                    'Danceability': '',  # Nulo
-                    'Energy': '',  # Nulo
-                    'Key': '',  # Nulo
-                    'Loudness': '',  # Nulo
-                    'Speechiness': '',  # Nulo
-                    'Acousticness': '',  # Nulo
-                    'Instrumentalness': '',  # Nulo
-                    'Liveness': '',  # Nulo
-                    'Valence': '',  # Nulo
-                    'Tempo': '',  # Nulo
-                    'Duration_ms': data['duration_ms'],
-                    'Url_youtube': data['youtube_url'],
-                    'Title': '',  # Nulo
-                    'Channel': '',  # Nulo
-                    'Views': data['views'],
-                    'Likes': data['likes'],
-                    'Comments': '',  # Nulo
-                    'Licensed': '',  # Nulo
-                    'official_video': '',  # Nulo
-                    'Stream': '0'  # Valores por defecto para nuevas canciones
-                })
-                
+            next_index = append_song(catalog, data)
             print(f"¡Canción agregada exitosamente con Índice: {next_index}!")
         except Exception as e:
             print(f"Error escribiendo al archivo: {e}")
     else:
         print("Datos de canción inválidos. Por favor intenta de nuevo.")
 
-def insert_song_batch() -> None:
+# Filas por bloque y tamaño mínimo de archivo para validar en paralelo
+IMPORT_CHUNK_SIZE = 5_000
+PARALLEL_IMPORT_MIN_BYTES = 1 << 20
+
+def batch_row_to_data(row: dict) -> dict:
+    """Campos a validar de una fila del CSV de importación"""
+    return {
+        'artist': row.get('Artist', ''),
+        'track': row.get('Track', ''),
+        'album': row.get('Album', ''),
+        'spotify_uri': row.get('Uri_spotify', ''),
+        'duration_ms': row.get('Duration_ms', '0'),
+        'spotify_url': row.get('Url_spotify', ''),
+        'youtube_url': row.get('Url_youtube', ''),
+        'likes': row.get('Likes', '0'),
+        'views': row.get('Views', '0')
+    }
+
+def validate_import_chunk(header: list, rows: list) -> list:
+    """Valida un bloque de filas (se ejecuta en los procesos del pool).
+
+    Devuelve, en el mismo orden, (data, stream, None) para cada fila válida
+    y (None, None, motivo) para cada fila rechazada.
+    """
+    rows = [dict(zip(header, values)) for values in rows]
+    records = [batch_row_to_data(row) for row in rows]
+    masks = SONG_VALIDATOR.validate_batch(records)
+
+    results = []
+    for row, data, mask in zip(rows, records, masks):
+        if mask:
+            results.append((None, None, SONG_VALIDATOR.describe(data, mask)))
+        else:
+            results.append((data, row.get('Stream', '0'), None))
+    return results
+
+def validated_chunks(reader, header: list, workers: int, chunk_size: int):
+    """Lee el CSV por bloques y los valida en paralelo, devolviéndolos en orden"""
+    chunks = iter(lambda: list(itertools.islice(reader, chunk_size)), [])
+    if workers <= 1:
+        for chunk in chunks:
+            yield chunk, validate_import_chunk(header, chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Se limita la cantidad de bloques en vuelo para no cargar todo el archivo
+        pending = deque()
+        for chunk in chunks:
+            pending.append((chunk, pool.submit(validate_import_chunk, header, chunk)))
+            if len(pending) >= workers * 2:
+                done_chunk, future = pending.popleft()
+                yield done_chunk, future.result()
+        while pending:
+            done_chunk, future = pending.popleft()
+            yield done_chunk, future.result()
+
+# Qué hacer con una fila cuya canción ya está en el catálogo (o antes en el mismo archivo)
+DUPLICATE_MODES = ('skip', 'upsert', 'insert')
+
+def import_songs(catalog: SongCatalog, input_path: str, rejected_path: str = None,
+                 workers: int = None, chunk_size: int = IMPORT_CHUNK_SIZE,
+                 on_duplicate: str = 'skip') -> dict:
+    """Importa canciones desde un CSV validando por bloques en paralelo.
+
+    Cada bloque de filas válidas se escribe en el WAL como un solo registro
+    (un fsync por bloque) y se aplica al catálogo; al terminar se pliega el
+    WAL en music.csv. Las rechazadas se guardan en rejected_path con el motivo.
+    Las repetidas (misma URI, o mismo artista + título) se omiten con 'skip',
+    actualizan vistas, likes y streams de la existente con 'upsert' o se
+    agregan igual con 'insert'.
+    """
+    if on_duplicate not in DUPLICATE_MODES:
+        raise ValueError(f"on_duplicate debe ser uno de {DUPLICATE_MODES}")
+    if workers is None:
+        small = os.path.getsize(input_path) < PARALLEL_IMPORT_MIN_BYTES
+        workers = 1 if small else (os.cpu_count() or 1)
+    if rejected_path is None:
+        rejected_path = f"{os.path.splitext(input_path)[0]}_rechazados.csv"
+
+    summary = {'imported': 0, 'rejected': 0, 'duplicates': 0, 'updated': 0, 'rejected_path': None}
+    start = time.perf_counter()
+    current_index = catalog.next_index()
+    rejected_file = None
+
+    try:
+        with catalog.bulk_append(), \
+             open(input_path, 'r', encoding='utf-8', newline='') as input_file:
+            reader = csv.reader(input_file)
+            header = next(reader, [])
+
+            for chunk, results in validated_chunks(reader, header, workers, chunk_size):
+                new_rows = []
+                # Repetidas dentro del bloque, que todavía no están en el catálogo
+                pending = DuplicateIndex(lambda position: (new_rows[position]['Uri'],
+                                                           new_rows[position]['Artist'],
+                                                           new_rows[position]['Track']))
+                changes = {}
+                for values, (data, stream, error) in zip(chunk, results):
+                    if error is None:
+                        if on_duplicate != 'insert':
+                            row_id = catalog.find_duplicate(data)
+                            position = None if row_id is not None else \
+                                pending.find(data['spotify_uri'], data['artist'], data['track'])
+                            if on_duplicate == 'skip' and (row_id is not None or position is not None):
+                                summary['duplicates'] += 1
+                                continue
+                            if row_id is not None:
+                                # La misma canción dos veces en el bloque: queda la última, la otra es omitida
+                                if row_id in changes:
+                                    summary['duplicates'] += 1
+                                changes[row_id] = row_counts({'Views': data['views'], 'Likes': data['likes'],
+                                                              'Stream': stream})
+                                continue
+                            if position is not None:
+                                new_rows[position].update(Views=data['views'], Likes=data['likes'], Stream=stream)
+                                summary['updated'] += 1
+                                continue
+                            pending.add(len(new_rows), data['spotify_uri'], data['artist'], data['track'])
+                        new_rows.append(build_song_row(current_index, data, stream))
+                        current_index += 1
+                        continue
+                    if rejected_file is None:
+                        rejected_file = open(rejected_path, 'w', newline='', encoding='utf-8')
+                        rejected_writer = csv.writer(rejected_file)
+                        rejected_writer.writerow(header + ['Motivo'])
+                        summary['rejected_path'] = rejected_path
+                    rejected_writer.writerow(values + [error])
+                    summary['rejected'] += 1
+
+                if new_rows:
+                    catalog.insert_rows(new_rows)
+                summary['imported'] += len(new_rows)
+                if changes:
+                    updated = catalog.update_counts(changes)
+                    # Las que no se pudieron actualizar (sin Index en el CSV) cuentan como omitidas
+                    for row_id in changes:
+                        summary['updated' if row_id in updated else 'duplicates'] += 1
+    finally:
+        if rejected_file is not None:
+            rejected_file.close()
+    catalog.compact()
+
+    elapsed = time.perf_counter() - start
+    total = summary['imported'] + summary['rejected'] + summary['duplicates'] + summary['updated']
+    summary['seconds'] = elapsed
+    summary['rows_per_second'] = total / elapsed if elapsed > 0 else 0.0
+    return summary
+
+def insert_song_batch(catalog: SongCatalog) -> None:
     """Insertar canciones desde un archivo CSV"""
     file_path = input("\nIngresa ruta del archivo CSV: ").strip()
     
     if not os.path.exists(file_path):
         print(f"Archivo {file_path} no encontrado.")
         return
-        
-    try:
-        valid_records = 0
-        invalid_records = 0
 
-        # Obtener índice inicial
-        current_index = get_next_index()
-        
-        with open(file_path, 'r', encoding='utf-8') as input_file:
-            csv_reader = csv.DictReader(input_file)
-            
-            with open("music.csv", 'a', newline='', encoding='utf-8') as output_file:
-                fieldnames = ['Index','Artist','Url_spotify','Track','Album','Album_type','Uri',
-                            'Danceability','Energy','Key','Loudness','Speechiness','Acousticness',
-                            'Instrumentalness','Liveness','Valence','Tempo','Duration_ms','Url_youtube',
-                            'Title','Channel','Views','Likes','Comments','Licensed','official_video','Stream']
-                
-                writer = csv.DictWriter(output_file, fieldnames=fieldnames)
-                
-                # Verificar si el archivo está vacío y escribir encabezado si es necesario
-                if os.path.getsize("music.csv") == 0:
-                    writer.writeheader()
-                
-                for row in csv_reader:
-                    try:
-                        data = {
-                            'artist': row.get('Artist', ''),
-                            'track': row.get('Track', ''),
-                            'album': row.get('Album', ''),
-                            'spotify_uri': row.get('Uri_spotify', ''),
-                            'duration_ms': row.get('Duration_ms', '0'),
-                            'spotify_url': row.get('Url_spotify', ''),
-                            'youtube_url': row.get('Url_youtube', ''),
-                            'likes': row.get('Likes', '0'),
-                            'views': row.get('Views', '0')
-                        }
-                        
-                        if validate_song_data(data):
-                            writer.writerow({
-                                'Index': str(current_index),
-                                'Artist': data['artist'],
-                                'Url_spotify': data['spotify_url'],
-                                'Track': data['track'],
-                                'Album': data['album'],
-                                'Album_type': '',  # Nulo
-                                'Uri': data['spotify_uri'],
-                                'Danceability': '',  # Nulo
-                                'Energy': '',  # Nulo
-                                'Key': '',  # Nulo
-                                'Loudness': '',  # Nulo
-                                'Speechiness': '',  # Nulo
-                                'Acousticness': '',  # Nulo
-                                'Instrumentalness': '',  # Nulo
-                                'Liveness': '',  # Nulo
-                                'Valence': '',  # Nulo
-                                'Tempo': '',  # Nulo
-                                'Duration_ms': data['duration_ms'],
-                                'Url_youtube': data['youtube_url'],
-                                'Title': '',  # Nulo
-                                'Channel': '',  # Nulo
-                                'Views': data['views'],
-                                'Likes': data['likes'],
-                                'Comments': '',  # Nulo
-                                'Licensed': '',  # Nulo
-                                'official_video': '',  # Nulo
-                                'Stream': row.get('Stream', '0')
-                            })
-                            current_index += 1  # Incrementar para el siguiente registro
-                            valid_records += 1
-                        else:
-                            invalid_records += 1
-                    except Exception as e:
-                        print(f"Error procesando fila: {e}")
-                        invalid_records += 1
-                        
-        print(f"Importación completa: {valid_records} registros importados, {invalid_records} registros omitidos.")
+    print("Canciones que ya están en el catálogo:")
+    print("1. Omitirlas")
+    print("2. Actualizar sus vistas, likes y streams")
+    print("3. Agregarlas igual")
+    option = input("Selecciona una opción (1-3, Enter = 1): ").strip() or "1"
+    if option not in ("1", "2", "3"):
+        print("Opción inválida")
+        return
+
+    try:
+        summary = import_songs(catalog, file_path, on_duplicate=DUPLICATE_MODES[int(option) - 1])
     except Exception as e:
         print(f"Error leyendo del archivo: {e}")
+        return
+
+    print(f"Importación completa: {summary['imported']} registros importados, "
+          f"{summary['rejected']} registros omitidos ({summary['rows_per_second']:,.0f} filas/s).")
+    if summary['duplicates'] or summary['updated']:
+        print(f"Repetidas: {summary['duplicates']} omitidas, {summary['updated']} actualizadas.")
+    if summary['rejected_path']:
+        print(f"Filas omitidas y motivo guardados en {summary['rejected_path']}")
 
-def insert_song() -> None:
+def insert_song(catalog: SongCatalog) -> None:
     """Menú de insertar canción"""
     while True:
         print("\nMenú Insertar Canción:")
@@ -398,52 +2356,41 @@ def insert_song() -> None:
         option = input("\nSelecciona una opción: ").strip()
         
         if option == "1":
-            insert_song_manual()
+            insert_song_manual(catalog)
         elif option == "2":
-            insert_song_batch()
+            insert_song_batch(catalog)
         elif option == "3":
             break
         else:
             print("Opción inválida")
 
-def show_albums() -> None:
+def show_albums(catalog: SongCatalog) -> None:
     """Mostrar álbumes para un artista específico"""
-    songs = parse_csv()
-    
     artist_name = input("\nIngresa nombre del artista: ").strip()
     
-    # Filtrar canciones por artista (sin distinción de mayúsculas)
-    pattern = re.compile(artist_name, re.IGNORECASE)
-    artist_songs = [song for song in songs if pattern.search(song.artist)]
+    # Álbumes agregados por artista al cargar el catálogo (sin distinción de mayúsculas)
+    albums = catalog.albums(artist_name)
     
-    if not artist_songs:
+    if not albums:
         print(f"No se encontraron canciones para el artista '{artist_name}'.")
         return
     
-    # Agrupar canciones por álbum
-    albums = {}
-    for song in artist_songs:
-        if song.album not in albums:
-            albums[song.album] = {
-                'songs': [],
-                'total_duration': 0
-            }
-        albums[song.album]['songs'].append(song)
-        albums[song.album]['total_duration'] += song.duration_ms
-    
     print(f"\nSe encontraron {len(albums)} álbumes para {artist_name}:")
     
-    for album_name, album_data in albums.items():
-        song_count = len(album_data['songs'])
-        total_duration = convert_duration(album_data['total_duration'])
+    for album_name, song_count, total_ms in albums:
+        total_duration = convert_duration(total_ms)
         
         print(f"Álbum: {album_name}")
         print(f"Canciones: {song_count}")
         print(f"Duración Total: {total_duration}")
         print("-" * 50)
 
-def main():
+def main(catalog: SongCatalog = None):
     """Menú principal integrado"""
+    # El catálogo se carga una sola vez y se reutiliza en todas las opciones
+    if catalog is None:
+        catalog = SongCatalog()
+
     while True:
         print("\n" + "="*50)
         print("           GESTOR DE BASE DE DATOS MUSICAL")
@@ -457,19 +2404,186 @@ def main():
         
         option = input("\nSelecciona una opción (1-5): ").strip()
         
+        # Recargar solo si music.csv cambió por fuera del programa
+        catalog.refresh()
+
         if option == "1":
-            search_songs()
+            search_songs(catalog)
         elif option == "2":
-            artist_top_songs()
+            artist_top_songs(catalog)
         elif option == "3":
-            insert_song()
+            insert_song(catalog)
         elif option == "4":
-            show_albums()
+            show_albums(catalog)
         elif option == "5":
+            # Dejar music.csv completo para las herramientas que lo leen directamente
+            catalog.compact()
+            catalog.close()
             print("\n¡Thanks for using Music Database Manager! Goodbye!")
             break
         else:
             print("\nInvalid option. Please try again.")
 
+# --- Perfilado opcional (ver profiling.py) ---
+
+PROFILED_FUNCTIONS = [
+    'open', 'print', 'row_to_song', 'iter_csv_songs', 'parse_csv', 'append_csv_rows',
+    'load_song_store', 'read_snapshot', 'write_snapshot', 'read_wal', 'SearchIndex.build',
+    'SearchIndex.search', 'ArtistIndex.__init__', 'ArtistIndex.top_songs', 'ArtistIndex.albums',
+    'SongCatalog.search', 'SongCatalog.top_songs', 'SongCatalog.albums', 'SongCatalog.insert_rows',
+    'SongCatalog.update_counts', 'SongCatalog.find_duplicate', 'DuplicateIndex.__init__',
+    'WriteAheadLog.compact', 'convert_duration', 'format_song', 'song_to_dict',
+    'SqliteSongCatalog.search', 'SqliteSongCatalog.top_songs', 'SqliteSongCatalog.albums',
+    'SqliteSongCatalog.insert_rows', 'SqliteSongCatalog.find_duplicate',
+]
+# Opciones del menú y subcomandos: agrupan lo que se mide mientras corren
+PROFILED_COMMANDS = [
+    'SongCatalog.load', 'search_songs', 'artist_top_songs', 'insert_song', 'show_albums',
+    'run_queries', 'import_songs', 'SongCatalog.compact', 'migrate',
+]
+
+def profiling_requested(flag: bool = False) -> bool:
+    """Mismo criterio que profiling.requested, sin importar el módulo"""
+    return flag or os.environ.get('PROFILE', '') not in ('', '0') or bool(os.environ.get('PROFILE_DUMP'))
+
+def enable_profiling(flag: bool = False, dump_path: str = None) -> bool:
+    """Envuelve las funciones calientes si se pidió con --profile o PROFILE=1"""
+    if not profiling_requested(flag or dump_path is not None):
+        return False
+    import profiling
+    profiling.instrument(globals(), PROFILED_FUNCTIONS, PROFILED_COMMANDS, dump_path=dump_path)
+    return True
+
+# --- Modo no interactivo (línea de comandos) ---
+
+def song_to_dict(song: SongDto) -> dict:
+    """Canción lista para serializar como JSON"""
+    return {**asdict(song), 'duration': convert_duration(song.duration_ms)}
+
+def read_queries(queries: list, queries_file: str):
+    """Consultas de la línea de comandos, de un archivo o de stdin (una por línea)"""
+    if queries:
+        yield from queries
+        return
+    if queries_file in (None, '-'):
+        source = sys.stdin
+    else:
+        source = open(queries_file, 'r', encoding='utf-8')
+    with source:
+        for line in source:
+            query = line.strip()
+            if query:
+                yield query
+
+def run_queries(catalog: SongCatalog, args, out) -> None:
+    """Resuelve cada consulta y escribe una línea JSON por resultado de consulta"""
+    for query in read_queries(args.queries, args.queries_file):
+        if args.command == 'search':
+            songs = itertools.islice(catalog.search(query), args.limit)
+            results = [song_to_dict(song) for song in songs]
+        elif args.command == 'top':
+            results = [song_to_dict(song) for song in catalog.top_songs(query, args.n)]
+        else:
+            results = [{'album': album, 'songs': count, 'duration_ms': total,
+                        'duration': convert_duration(total)}
+                       for album, count, total in catalog.albums(query)]
+        out.write(json.dumps({'command': args.command, 'query': query, 'results': results},
+                             ensure_ascii=False) + '\n')
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Gestor de base de datos musical. Sin subcomando abre el menú interactivo.")
+    parser.add_argument('--csv', default=MUSIC_CSV, type=pathlib.Path,
+                        help="ruta de music.csv (por defecto, junto a final.py)")
+    parser.add_argument('--no-snapshot', action='store_true',
+                        help="no usar ni escribir el snapshot binario del catálogo")
+    parser.add_argument('--db', type=pathlib.Path, metavar='ARCHIVO',
+                        help="usar una base SQLite en lugar de music.csv (crear con el comando migrate)")
+    parser.add_argument('--profile', action='store_true',
+                        help="medir las funciones calientes e imprimir un desglose al salir (o PROFILE=1)")
+    parser.add_argument('--profile-dump', metavar='ARCHIVO',
+                        help="guardar además un volcado de cProfile (o PROFILE_DUMP=ARCHIVO)")
+    subparsers = parser.add_subparsers(dest='command')
+
+    def add_query_command(name: str, help_text: str):
+        command = subparsers.add_parser(name, help=help_text)
+        command.add_argument('queries', nargs='*', help="consultas (si no se dan, se leen de --queries o stdin)")
+        command.add_argument('--queries', dest='queries_file', metavar='ARCHIVO',
+                             help="archivo con una consulta por línea ('-' para stdin)")
+        return command
+
+    search = add_query_command('search', "buscar por título o artista")
+    search.add_argument('--limit', type=int, default=None, help="máximo de resultados por consulta")
+    top = add_query_command('top', "top canciones por artista")
+    top.add_argument('-n', type=int, default=5, help="cantidad de canciones (máximo %d)" % ArtistIndex.TOP_N)
+    add_query_command('albums', "álbumes por artista")
+
+    import_command = subparsers.add_parser('import', help="importar canciones desde un CSV")
+    import_command.add_argument('file', help="CSV a importar")
+    import_command.add_argument('--rejected', help="CSV donde guardar las filas rechazadas")
+    import_command.add_argument('--workers', type=int, default=None, help="procesos para validar")
+    import_command.add_argument('--on-duplicate', choices=DUPLICATE_MODES, default='skip',
+                                help="canciones que ya están (misma URI o artista + título): "
+                                     "omitirlas, actualizar sus contadores o agregarlas igual")
+    subparsers.add_parser('compact', help="plegar el registro de inserciones (WAL) en music.csv")
+    migrate = subparsers.add_parser('migrate', help="copiar el catálogo entre music.csv y la base de --db")
+    migrate.add_argument('direction', choices=['to-db', 'to-csv'],
+                         help="to-db: de --csv a una base vacía; to-csv: reescribe --csv desde la base")
+    return parser
+
+def migrate(csv_path: pathlib.Path, db_path: pathlib.Path, direction: str) -> int:
+    """Copia única del catálogo de music.csv a la base SQLite o al revés"""
+    if direction == 'to-csv' and not os.path.exists(db_path):
+        print(f"Error: la base {db_path} no existe", file=sys.stderr)
+        return 1
+    catalog = SqliteSongCatalog(db_path)
+    start = time.perf_counter()
+    try:
+        if direction == 'to-db':
+            songs = catalog.import_csv(csv_path)
+        else:
+            songs = catalog.export_csv(csv_path)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        catalog.close()
+    print(json.dumps({'command': 'migrate', 'direction': direction, 'songs': songs,
+                      'seconds': time.perf_counter() - start}))
+    return 0
+
+def cli(argv: list = None) -> int:
+    """Punto de entrada: menú interactivo o subcomandos con salida JSON Lines"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    enable_profiling(args.profile, args.profile_dump)
+    if args.command == 'migrate':
+        if args.db is None:
+            parser.error("migrate necesita --db")
+        return migrate(args.csv, args.db, args.direction)
+    if args.command == 'top' and args.n > ArtistIndex.TOP_N:
+        parser.error(f"top -n admite como máximo {ArtistIndex.TOP_N}")
+    if args.db is not None:
+        catalog = SqliteSongCatalog(args.db)
+    else:
+        catalog = SongCatalog(args.csv, use_snapshot=not args.no_snapshot)
+
+    if args.command is None:
+        main(catalog)
+    elif args.command == 'import':
+        if not os.path.exists(args.file):
+            print(f"Archivo {args.file} no encontrado.", file=sys.stderr)
+            return 1
+        summary = import_songs(catalog, args.file, args.rejected, args.workers,
+                               on_duplicate=args.on_duplicate)
+        print(json.dumps({'command': 'import', **summary}, ensure_ascii=False))
+    elif args.command == 'compact':
+        compacted = catalog.compact()
+        print(json.dumps({'command': 'compact', 'compacted': compacted}))
+    else:
+        run_queries(catalog, args, sys.stdout)
+    catalog.close()
+    return 0
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(cli())
\ No newline at end of file
@@ -0,0 +1,317 @@
+"""Servicio HTTP local (asyncio) sobre el catálogo musical de final.py.
+
+Mantiene el catálogo y sus índices cargados en memoria y responde JSON:
+
+    GET  /search?q=TEXTO[&limit=N][&offset=M]  canciones por título o artista (paginado)
+    GET  /top?artist=NOMBRE[&n=N]              top canciones de un artista
+    GET  /albums?artist=NOMBRE                 álbumes de un artista
+    POST /songs                                insertar una canción (cuerpo JSON; 409 si ya existe)
+    GET  /metrics                              histogramas de latencia por endpoint
+
+Uso: python music_server.py [--host 127.0.0.1] [--port 8080] [--csv music.csv]
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import pathlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+from final import (MUSIC_CSV, SONG_VALIDATOR, ArtistIndex, QueryCache, SongCatalog, append_song,
+                   convert_duration, song_to_dict, spotify_url_to_uri)
+
+MAX_BODY_BYTES = 1 << 20
+# Espera antes del fsync para agrupar inserciones concurrentes (group commit)
+GROUP_COMMIT_DELAY = 0.002
+
+class LatencyHistogram:
+    """Histograma de latencias con cubetas fijas en milisegundos"""
+
+    BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKETS_MS) + 1)
+        self.total = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, elapsed_ms: float) -> None:
+        for bucket, limit in enumerate(self.BUCKETS_MS):
+            if elapsed_ms <= limit:
+                break
+        else:
+            bucket = len(self.BUCKETS_MS)
+        self.counts[bucket] += 1
+        self.total += 1
+        self.sum_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+
+    def to_dict(self) -> dict:
+        labels = [f"<={limit}ms" for limit in self.BUCKETS_MS] + ["+Inf"]
+        return {
+            'count': self.total,
+            'mean_ms': self.sum_ms / self.total if self.total else 0.0,
+            'max_ms': self.max_ms,
+            'buckets': dict(zip(labels, self.counts)),
+        }
+
+class HttpError(Exception):
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+def song_data_from_json(payload: dict) -> dict:
+    """Convierte el cuerpo JSON de POST /songs al dict que usa validate_song_data"""
+    fields = ('artist', 'track', 'album', 'spotify_url', 'spotify_uri', 'youtube_url', 'likes', 'views')
+    data = {field: str(payload.get(field) or '').strip() for field in fields}
+
+    if not data['spotify_uri'] and data['spotify_url']:
+        data['spotify_uri'] = spotify_url_to_uri(data['spotify_url'])
+
+    if payload.get('duration_ms') is not None:
+        data['duration_ms'] = str(payload['duration_ms']).strip()
+    elif payload.get('duration'):
+        # Mismo formato que la inserción manual: HH:MM:SS
+        h, m, s = map(int, str(payload['duration']).split(':'))
+        data['duration_ms'] = str((h * 3600 + m * 60 + s) * 1000)
+    else:
+        data['duration_ms'] = ''
+    return data
+
+class MusicService:
+    """Resuelve los endpoints sobre un SongCatalog ya cargado"""
+
+    def __init__(self, catalog: SongCatalog):
+        self.catalog = catalog
+        self.histograms = {}
+        self.started = time.monotonic()
+        self._commit = None
+        # Un solo hilo para el catálogo: libera el event loop y serializa el acceso
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='catalogo')
+
+    async def handle(self, method: str, target: str, body: bytes):
+        """Resuelve una petición fuera del event loop y, si inserta, espera el fsync"""
+        loop = asyncio.get_running_loop()
+        path, (status, payload) = await loop.run_in_executor(self.executor, self.route, method, target, body)
+        if status == HTTPStatus.CREATED:
+            try:
+                # Responder solo cuando la inserción es durable
+                await self.commit()
+            except OSError as e:
+                # La canción ya está en memoria y en el WAL; el próximo fsync vuelve a intentarlo
+                payload = {**payload, 'warning': f"Guardada, pero sin confirmar en disco: {e}"}
+        return path, status, payload
+
+    def route(self, method: str, target: str, body: bytes):
+        url = urlsplit(target)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        handlers = {
+            ('GET', '/search'): self.search,
+            ('GET', '/top'): self.top,
+            ('GET', '/albums'): self.albums,
+            ('POST', '/songs'): self.insert,
+            ('GET', '/metrics'): self.metrics,
+        }
+        handler = handlers.get((method, url.path))
+        if handler is None:
+            if any(path == url.path for _, path in handlers):
+                raise HttpError(HTTPStatus.METHOD_NOT_ALLOWED, f"Método {method} no permitido")
+            raise HttpError(HTTPStatus.NOT_FOUND, f"Ruta desconocida: {url.path}")
+
+        # Recargar solo si music.csv cambió por fuera del servicio
+        self.catalog.refresh()
+        return url.path, handler(params, body)
+
+    @staticmethod
+    def _int_param(params: dict, name: str, default):
+        try:
+            return int(params[name]) if name in params else default
+        except ValueError:
+            raise HttpError(HTTPStatus.BAD_REQUEST, f"El parámetro {name} debe ser un entero")
+
+    @staticmethod
+    def _required(params: dict, name: str) -> str:
+        value = params.get(name, '').strip()
+        if not value:
+            raise HttpError(HTTPStatus.BAD_REQUEST, f"Falta el parámetro {name}")
+        return value
+
+    def search(self, params: dict, body: bytes):
+        query = self._required(params, 'q')
+        limit = max(self._int_param(params, 'limit', 50), 0)
+        offset = max(self._int_param(params, 'offset', 0), 0)
+        # Se pide un resultado de más para saber si existe una página siguiente
+        songs = list(itertools.islice(self.catalog.search(query), offset, offset + limit + 1))
+        next_offset = offset + limit if len(songs) > limit else None
+        return HTTPStatus.OK, {'query': query, 'offset': offset, 'next_offset': next_offset,
+                               'results': [song_to_dict(song) for song in songs[:limit]]}
+
+    def top(self, params: dict, body: bytes):
+        artist = self._required(params, 'artist')
+        n = min(self._int_param(params, 'n', 5), ArtistIndex.TOP_N)
+        songs = self.catalog.top_songs(artist, n)
+        return HTTPStatus.OK, {'artist': artist, 'results': [song_to_dict(song) for song in songs]}
+
+    def albums(self, params: dict, body: bytes):
+        artist = self._required(params, 'artist')
+        albums = [{'album': album, 'songs': count, 'duration_ms': total,
+                   'duration': convert_duration(total)}
+                  for album, count, total in self.catalog.albums(artist)]
+        return HTTPStatus.OK, {'artist': artist, 'results': albums}
+
+    def insert(self, params: dict, body: bytes):
+        try:
+            payload = json.loads(body or b'{}')
+            if not isinstance(payload, dict):
+                raise ValueError("se esperaba un objeto JSON")
+            data = song_data_from_json(payload)
+        except ValueError as e:
+            raise HttpError(HTTPStatus.BAD_REQUEST, f"Cuerpo inválido: {e}")
+
+        # Misma validación que la inserción manual y la importación
+        error = SONG_VALIDATOR.describe(data, SONG_VALIDATOR.validate(data))
+        if error:
+            raise HttpError(HTTPStatus.BAD_REQUEST, error)
+        row_id = self.catalog.find_duplicate(data)
+        if row_id is not None:
+            raise HttpError(HTTPStatus.CONFLICT,
+                            f"La canción ya existe (Índice {self.catalog.csv_index(row_id)})")
+        # Se escribe en el WAL sin fsync; la respuesta espera a commit()
+        index = append_song(self.catalog, data, sync=False)
+        return HTTPStatus.CREATED, {'index': index}
+
+    async def commit(self) -> None:
+        """Un solo fsync del WAL para todas las inserciones que llegan juntas"""
+        if self._commit is not None:
+            await asyncio.shield(self._commit)
+            return
+        loop = asyncio.get_running_loop()
+        self._commit = commit = loop.create_future()
+        try:
+            await asyncio.sleep(GROUP_COMMIT_DELAY)
+            # Las inserciones que lleguen desde aquí esperan al siguiente grupo
+            self._commit = None
+            await loop.run_in_executor(None, self.catalog.log.sync)
+        except BaseException as e:
+            self._commit = None
+            commit.set_exception(e)
+        else:
+            commit.set_result(None)
+        # El grupo comparte el resultado (y el error de fsync, si lo hubo)
+        await commit
+
+    def metrics(self, params: dict, body: bytes):
+        return HTTPStatus.OK, {
+            'uptime_s': time.monotonic() - self.started,
+            'songs': len(self.catalog.songs),
+            'cache': self.catalog.cache.stats(),
+            'wal': {'records': self.catalog.log.records, 'fsyncs': self.catalog.log.syncs,
+                    'bytes': self.catalog.log.size()},
+            'endpoints': {path: histogram.to_dict() for path, histogram in self.histograms.items()},
+        }
+
+    def observe(self, path: str, elapsed_ms: float) -> None:
+        histogram = self.histograms.get(path)
+        if histogram is None:
+            histogram = self.histograms[path] = LatencyHistogram()
+        histogram.observe(elapsed_ms)
+
+async def read_request(reader: asyncio.StreamReader):
+    """Lee una petición HTTP/1.1; devuelve None si el cliente cerró la conexión"""
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    try:
+        method, target, version = request_line.decode('latin-1').split()
+    except ValueError:
+        raise HttpError(HTTPStatus.BAD_REQUEST, "Línea de petición inválida")
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get('content-length') or 0)
+    except ValueError:
+        raise HttpError(HTTPStatus.BAD_REQUEST, "Content-Length inválido")
+    if length > MAX_BODY_BYTES:
+        raise HttpError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Cuerpo demasiado grande")
+    body = await reader.readexactly(length) if length else b''
+    keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+    return method, target, body, keep_alive
+
+def encode_response(status: HTTPStatus, payload: dict, keep_alive: bool) -> bytes:
+    body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    head = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode('latin-1') + body
+
+async def handle_connection(service: MusicService, reader, writer) -> None:
+    """Atiende las peticiones de una conexión (con keep-alive)"""
+    try:
+        while True:
+            keep_alive = False
+            try:
+                request = await read_request(reader)
+                if request is None:
+                    break
+                method, target, body, keep_alive = request
+                start = time.perf_counter()
+                path, status, payload = await service.handle(method, target, body)
+                service.observe(path, (time.perf_counter() - start) * 1000)
+            except HttpError as e:
+                status, payload = e.status, {'error': str(e)}
+            except (asyncio.IncompleteReadError, ConnectionError):
+                break
+            except Exception as e:
+                status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {'error': str(e)}
+
+            writer.write(encode_response(status, payload, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    finally:
+        writer.close()
+
+async def serve(catalog: SongCatalog, host: str, port: int) -> None:
+    service = MusicService(catalog)
+    server = await asyncio.start_server(
+        lambda reader, writer: handle_connection(service, reader, writer), host, port)
+    print(f"Sirviendo {len(catalog.songs):,} canciones en http://{host}:{port}", flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.executor.shutdown()
+
+def main():
+    parser = argparse.ArgumentParser(description="Servicio HTTP local del catálogo musical")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--csv', default=MUSIC_CSV, type=pathlib.Path)
+    parser.add_argument('--no-snapshot', action='store_true')
+    parser.add_argument('--cache-size', type=int, default=1024, help="consultas en caché (0 la desactiva)")
+    parser.add_argument('--cache-ttl', type=float, default=300.0, help="segundos de validez de cada consulta")
+    args = parser.parse_args()
+
+    cache = QueryCache(maxsize=args.cache_size, ttl=args.cache_ttl)
+    catalog = SongCatalog(args.csv, use_snapshot=not args.no_snapshot, cache=cache)
+    try:
+        asyncio.run(serve(catalog, args.host, args.port))
+    except KeyboardInterrupt:
+        print("\nServicio detenido.")
+    finally:
+        catalog.compact()
+        catalog.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""Instrumentación opcional de las funciones calientes de los programas de menú.
+
+Se activa con la variable de entorno PROFILE=1 o con --profile; con
+PROFILE_DUMP=ARCHIVO o --profile-dump ARCHIVO además se guarda un volcado de
+cProfile (verlo con: python -m pstats ARCHIVO). Desactivada no cuesta nada:
+los programas ni siquiera importan este módulo y sus funciones quedan
+intactas. Activada, instrument() reemplaza las funciones indicadas por
+envoltorios que miden tiempo y cuentan, y al salir se imprime en stderr el
+desglose por comando:
+
+    llamadas   veces que se llamó la función
+    ms         tiempo inclusivo (en iteradores, también el de consumirlos)
+    elementos  filas de una lista, elementos entregados por un iterador o
+               resultados True (coincidencias de un validador)
+    errores    excepciones (por ejemplo, filas rechazadas por row_to_song)
+    bytes      tamaño de los archivos abiertos para leer y de los bloques procesados
+"""
+import atexit
+import builtins
+import cProfile
+import functools
+import inspect
+import os
+import sys
+import time
+from collections.abc import Iterator
+
+ENV_VAR = 'PROFILE'
+DUMP_ENV_VAR = 'PROFILE_DUMP'
+# Comando al que se atribuye lo que corre fuera de cualquier comando (p. ej. la carga inicial)
+DEFAULT_COMMAND = 'inicio'
+
+def requested(flag: bool = False) -> bool:
+    """True si se pidió el perfilado por argumento o por variable de entorno
+
+    Los programas repiten esta comprobación antes de importar el módulo.
+    """
+    return flag or os.environ.get(ENV_VAR, '') not in ('', '0') or bool(os.environ.get(DUMP_ENV_VAR))
+
+class Stat:
+    __slots__ = ('calls', 'seconds', 'items', 'errors', 'bytes')
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.items = 0
+        self.errors = 0
+        self.bytes = 0
+
+def _opened_bytes(args: tuple, kwargs: dict) -> int:
+    """Tamaño del archivo que open() abre para leer"""
+    mode = args[1] if len(args) > 1 else kwargs.get('mode', 'r')
+    if not args or 'r' not in mode or '+' in mode or isinstance(args[0], int):
+        return 0
+    try:
+        return os.path.getsize(args[0])
+    except (OSError, TypeError):
+        return 0
+
+class Profiler:
+    """Acumula tiempos y contadores por (comando, función)"""
+
+    def __init__(self, dump_path: str = None):
+        self.stats = {}
+        self.command = DEFAULT_COMMAND
+        self.dump_path = dump_path
+        self.cprofile = cProfile.Profile() if dump_path else None
+
+    def stat(self, name: str) -> Stat:
+        key = (self.command, name)
+        stat = self.stats.get(key)
+        if stat is None:
+            stat = self.stats[key] = Stat()
+        return stat
+
+    def _timed_iterator(self, stat: Stat, iterator):
+        """Mide el tiempo de cada next() y cuenta los elementos entregados"""
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    stat.seconds += time.perf_counter() - start
+                    return
+                stat.seconds += time.perf_counter() - start
+                stat.items += 1
+                yield item
+        finally:
+            close = getattr(iterator, 'close', None)
+            if close is not None:
+                close()
+
+    def wrap(self, name: str, func, sized: bool = False):
+        profiler = self
+        opened = func is builtins.open
+
+        def wrapper(*args, **kwargs):
+            stat = profiler.stat(name)
+            stat.calls += 1
+            if opened:
+                stat.bytes += _opened_bytes(args, kwargs)
+            elif sized and args:
+                stat.bytes += len(args[0])
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except BaseException:
+                stat.errors += 1
+                raise
+            finally:
+                stat.seconds += time.perf_counter() - start
+            if result is True:
+                stat.items += 1
+            elif isinstance(result, list):
+                stat.items += len(result)
+            elif isinstance(result, Iterator) and not opened:
+                return profiler._timed_iterator(stat, result)
+            return result
+
+        # Mismo __module__/__qualname__: pickle (ProcessPoolExecutor) lo sigue encontrando
+        return functools.update_wrapper(wrapper, func)
+
+    def wrap_command(self, name: str, func):
+        """Atribuye a name todo lo que se mide mientras corre func (el comando más externo gana)"""
+        profiler = self
+        timed = self.wrap(name, func)
+
+        def wrapper(*args, **kwargs):
+            if profiler.command != DEFAULT_COMMAND:
+                return timed(*args, **kwargs)
+            profiler.command = name
+            try:
+                return timed(*args, **kwargs)
+            finally:
+                profiler.command = DEFAULT_COMMAND
+
+        return functools.update_wrapper(wrapper, func)
+
+    def report(self, out=None) -> None:
+        out = out or sys.stderr
+        if self.cprofile is not None:
+            self.cprofile.disable()
+            self.cprofile.dump_stats(self.dump_path)
+        if not self.stats:
+            return
+        lines = ["\n--- Perfil por comando (tiempo inclusivo) ---"]
+        commands = {}
+        for (command, name), stat in self.stats.items():
+            commands.setdefault(command, []).append((name, stat))
+        for command, entries in commands.items():
+            lines.append(f"[{command}]")
+            lines.append(f"  {'función':<32}{'llamadas':>10}{'ms':>12}{'µs/llamada':>12}"
+                         f"{'elementos':>12}{'errores':>10}{'bytes':>14}")
+            for name, stat in sorted(entries, key=lambda entry: -entry[1].seconds):
+                lines.append(f"  {name:<32}{stat.calls:>10,}{stat.seconds * 1000:>12.1f}"
+                             f"{stat.seconds * 1e6 / stat.calls:>12.1f}{stat.items:>12,}"
+                             f"{stat.errors:>10,}{stat.bytes:>14,}")
+        if self.dump_path:
+            lines.append(f"Volcado de cProfile en {self.dump_path} (python -m pstats {self.dump_path})")
+        out.write('\n'.join(lines) + '\n')
+
+_profiler = None
+
+def enable(dump_path: str = None) -> Profiler:
+    """Crea el perfilador (una sola vez) e imprime su desglose al salir"""
+    global _profiler
+    if _profiler is None:
+        _profiler = Profiler(dump_path or os.environ.get(DUMP_ENV_VAR) or None)
+        atexit.register(_profiler.report)
+        if _profiler.cprofile is not None:
+            _profiler.cprofile.enable()
+    return _profiler
+
+def _resolve(namespace: dict, name: str):
+    """(dueño, atributo, valor) de 'funcion', 'Clase.metodo' o un builtin como 'print'"""
+    owner_name, _, attribute = name.rpartition('.')
+    if owner_name:
+        owner = namespace[owner_name]
+        # getattr_static conserva staticmethod/classmethod para volver a envolverlos igual
+        return owner, attribute, inspect.getattr_static(owner, attribute)
+    if name in namespace:
+        return namespace, name, namespace[name]
+    return namespace, name, getattr(builtins, name)
+
+def instrument(namespace: dict, functions=(), commands=(), sized=(), dump_path: str = None) -> Profiler:
+    """Reemplaza en namespace (los globals() de un módulo) las funciones indicadas.
+
+    functions: funciones a medir; commands: puntos de entrada (opciones del
+    menú, subcomandos) que agrupan lo medido mientras corren; sized: funciones
+    cuyo primer argumento es un bloque de bytes a contabilizar.
+    """
+    profiler = enable(dump_path)
+    for name in (*functions, *commands):
+        owner, attribute, value = _resolve(namespace, name)
+        func = value.__func__ if isinstance(value, (staticmethod, classmethod)) else value
+        if name in commands:
+            wrapped = profiler.wrap_command(name, func)
+        else:
+            wrapped = profiler.wrap(name, func, sized=name in sized)
+        if isinstance(value, (staticmethod, classmethod)):
+            wrapped = type(value)(wrapped)
+        if isinstance(owner, dict):
+            owner[attribute] = wrapped
+        else:
+            setattr(owner, attribute, wrapped)
+    return profiler
@@ -0,0 +1,52 @@
+"""ArtistIndex de final.py frente a recorrer todas las canciones."""
+import pathlib
+import random
+import sys
+import unittest
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+import final  # noqa: E402
+
+ARTISTS = ['Queen', 'Queens of the Stone Age', 'Björk', 'Bad Bunny', 'Shakira', 'Abba']
+
+def linear_top(store: final.SongStore, name: str, n: int) -> list:
+    term = final.normalize_text(name)
+    rows = [row_id for row_id, song in enumerate(store) if term in final.normalize_text(song.artist)]
+    return sorted(rows, key=lambda row_id: -store.popularity(row_id))[:n]
+
+def linear_albums(store: final.SongStore, name: str) -> list:
+    term = final.normalize_text(name)
+    albums = {}
+    for song in store:
+        if term in final.normalize_text(song.artist):
+            count, total = albums.get(song.album, (0, 0))
+            albums[song.album] = (count + 1, total + song.duration_ms)
+    return [(album, count, total) for album, (count, total) in albums.items()]
+
+class ArtistIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.rng = rng = random.Random(3)
+        self.store = final.SongStore(
+            final.SongDto(rng.choice(ARTISTS), f"Tema {i}", f"Album {rng.randint(1, 4)}", '',
+                          rng.randint(1, 9) * 1000, '', '', rng.randint(0, 50), 0, rng.randint(0, 50))
+            for i in range(500))
+        self.index = final.ArtistIndex(self.store)
+
+    def assert_matches_linear(self):
+        for name in ARTISTS + ['que', 'bjork', 'a', 'nadie']:
+            self.assertEqual(self.index.top_songs(name, 10), linear_top(self.store, name, 10), name)
+            self.assertEqual(self.index.albums(name), linear_albums(self.store, name), name)
+
+    def test_build(self):
+        self.assert_matches_linear()
+
+    def test_rebuild_top_after_count_changes(self):
+        changed = self.rng.sample(range(len(self.store)), 40)
+        for row_id in changed:
+            self.store.set_counts(row_id, self.rng.choice([0, 1, 1_000]), 0, self.rng.randint(0, 50))
+        self.index.rebuild_top(changed)
+        self.assert_matches_linear()
+
+if __name__ == '__main__':
+    unittest.main()
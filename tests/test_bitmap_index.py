@@ -0,0 +1,62 @@
+"""BitmapIndex de Peliculas_csv/Programa1.py frente al filtro lineal sobre la lista."""
+import contextlib
+import io
+import pathlib
+import random
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / 'Peliculas_csv'))
+
+import Programa1  # noqa: E402
+
+def random_movies(count: int, seed: int = 15) -> list:
+    rng = random.Random(seed)
+    edades = Programa1.EDADES + ['']
+    return [Programa1.MovieDto(f"Pelicula {i}", str(rng.randint(1950, 2021)), rng.choice(edades),
+                               f"{rng.randint(0, 100)}/100", *(rng.random() < 0.4 for _ in range(4)))
+            for i in range(count)]
+
+def linear_filter(movies: list, plataformas: list, edad: str, todas: bool) -> list:
+    """El recorrido de la lista que hacía buscar_por_plataforma_y_categoria, con y/o y '<='"""
+    atributos = [Programa1.PLATAFORMAS[p] for p in plataformas]
+    if edad.startswith('<='):
+        edades = Programa1.EDADES[:Programa1.EDADES.index(edad[2:]) + 1]
+    else:
+        edades = None if edad == 'all' else [edad]
+    combinar = all if todas else any
+    return [m for m in movies
+            if combinar(getattr(m, a) for a in atributos) and (edades is None or m.age in edades)]
+
+class BitmapIndexTest(unittest.TestCase):
+    CONSULTAS = [(['Netflix'], 'all', True), (['Hulu'], '13+', True), (['Netflix', 'Hulu'], '18+', True),
+                 (['Prime Video', 'Disney+'], 'all', False), (['Netflix', 'Hulu', 'Disney+'], '<=13+', False),
+                 (list(Programa1.PLATAFORMAS), '<=16+', True), (['Disney+'], '<=all', True)]
+
+    def check(self, catalogo: Programa1.MovieCatalog) -> None:
+        for plataformas, edad, todas in self.CONSULTAS:
+            self.assertEqual(catalogo.por_plataforma(plataformas, edad, todas),
+                             linear_filter(catalogo.movies, plataformas, edad, todas),
+                             (plataformas, edad, todas))
+
+    def test_construido_y_agregando(self):
+        movies = random_movies(800)
+        self.check(Programa1.MovieCatalog(movies[:500]))
+        catalogo = Programa1.MovieCatalog(movies[:500])
+        catalogo.agregar(movies[500:])
+        self.check(catalogo)
+
+    def buscar(self, plataforma: str, categoria: str = 'all') -> str:
+        catalogo = Programa1.MovieCatalog(random_movies(50))
+        salida = io.StringIO()
+        with mock.patch('builtins.input', side_effect=[plataforma, categoria]), contextlib.redirect_stdout(salida):
+            Programa1.buscar_por_plataforma_y_categoria(catalogo)
+        return salida.getvalue()
+
+    def test_operadores_mezclados(self):
+        self.assertIn("No se pueden combinar & y |", self.buscar('Netflix & Hulu | Prime Video'))
+        self.assertIn("resultado(s)", self.buscar('Netflix | Hulu | Prime Video'))
+
+if __name__ == '__main__':
+    unittest.main()
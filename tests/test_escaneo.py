@@ -0,0 +1,43 @@
+"""Candidatos de escanear (Tp1/Ejercicio3) frente a lo que aceptan los validadores."""
+import pathlib
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / 'Tp1' / 'Ejercicio3'))
+
+import Ejercicio3  # noqa: E402
+
+URLS_VALIDAS = ['example.com', 'example.com/', 'sub.dominio.edu?q=1', 'www.sitio.net',
+                'https://hola.com', 'http://www.google.org/']
+
+class EscaneoUrlTest(unittest.TestCase):
+    def hallazgos(self, texto: str, tipos=('url', 'email', 'ipv4')) -> list:
+        return Ejercicio3._escanear_bloque(texto.encode('utf-8'), tipos)[2]
+
+    def test_urls_aceptadas_por_validar_url_son_candidatas(self):
+        for url in URLS_VALIDAS:
+            self.assertTrue(Ejercicio3.validar_url(url), url)
+            self.assertEqual(self.hallazgos(f"ver {url}, gracias\n"), [('url', True, url)])
+
+    def test_dominio_sin_esquema_invalido(self):
+        self.assertEqual(self.hallazgos("ver example.com.ar hoy\n"), [('url', False, 'example.com.ar')])
+        self.assertEqual(self.hallazgos("ver example.com/x hoy\n"), [('url', False, 'example.com/x')])
+
+    def test_no_confunde_palabras_ni_emails(self):
+        self.assertEqual(self.hallazgos("la foo.community y v1.2\n"), [])
+        # El dominio de un email no se cuenta como URL aunque solo se busquen URLs
+        self.assertEqual(self.hallazgos("escribir a pepe.luis@correo.com\n", ('url',)), [])
+        self.assertEqual(self.hallazgos("escribir a pepe.luis@correo.com\n"),
+                         [('email', False, 'pepe.luis@correo.com')])
+
+    def test_escanear_archivo(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            archivo = pathlib.Path(tmp) / 'log.txt'
+            archivo.write_text('\n'.join(f"GET {url} 200" for url in URLS_VALIDAS) + '\n', encoding='utf-8')
+            resumen = Ejercicio3.escanear(archivo, ('url',), procesos=1)
+        self.assertEqual(resumen['lineas'], len(URLS_VALIDAS))
+        self.assertEqual(resumen['tipos']['url'], {'validos': len(URLS_VALIDAS), 'invalidos': 0})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+"""Resumen y resultado de import_songs de final.py según el modo de repetidas."""
+import csv
+import pathlib
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+import final  # noqa: E402
+
+IMPORT_HEADER = ['Artist', 'Track', 'Album', 'Uri_spotify', 'Duration_ms', 'Url_spotify',
+                 'Url_youtube', 'Likes', 'Views', 'Stream']
+
+def song_data(track: str, views: str = '10', likes: str = '1') -> dict:
+    return {'artist': 'Artista', 'track': track, 'album': 'Album', 'spotify_uri': '',
+            'duration_ms': '200000', 'spotify_url': '', 'youtube_url': '', 'likes': likes, 'views': views}
+
+def import_row(track: str, views: str, likes: str = '1') -> list:
+    return ['Artista', track, 'Album', '', '200000', '', '', likes, views, '0']
+
+class ImportSongsTest(unittest.TestCase):
+    # Vieja y Otra ya están en el catálogo; Vieja aparece dos veces en el archivo,
+    # Nueva también, y la última fila tiene más likes que vistas
+    ROWS = [import_row('Vieja', '500'), import_row('Nueva', '20'), import_row('Vieja', '700'),
+            import_row('Nueva', '30'), import_row('Otra', '40'), import_row('Mala', '5', likes='9')]
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        folder = pathlib.Path(self.tmp.name)
+        self.csv_path = folder / 'music.csv'
+        with open(self.csv_path, 'w', newline='', encoding='utf-8') as file:
+            writer = csv.DictWriter(file, fieldnames=final.FIELDNAMES, lineterminator='\n')
+            writer.writeheader()
+            writer.writerows(final.build_song_row(i, song_data(track)) for i, track in enumerate(['Vieja', 'Otra']))
+        self.input_path = folder / 'nuevas.csv'
+        with open(self.input_path, 'w', newline='', encoding='utf-8') as file:
+            writer = csv.writer(file)
+            writer.writerow(IMPORT_HEADER)
+            writer.writerows(self.ROWS)
+        self.rejected_path = folder / 'rechazadas.csv'
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_import(self, on_duplicate: str, workers: int = 1, chunk_size: int = final.IMPORT_CHUNK_SIZE) -> tuple:
+        catalog = final.SongCatalog(self.csv_path)
+        try:
+            summary = final.import_songs(catalog, str(self.input_path), str(self.rejected_path),
+                                         workers=workers, chunk_size=chunk_size, on_duplicate=on_duplicate)
+        finally:
+            catalog.close()
+        store, _ = final.load_song_store(self.csv_path, use_snapshot=False)
+        views = {song.track: song.views for song in store}
+        counted = summary['imported'] + summary['rejected'] + summary['duplicates'] + summary['updated']
+        self.assertEqual(counted, len(self.ROWS))
+        return summary, views, len(store)
+
+    def test_skip(self):
+        summary, views, size = self.run_import('skip')
+        self.assertEqual((summary['imported'], summary['duplicates'], summary['updated']), (1, 4, 0))
+        self.assertEqual(views, {'Vieja': 10, 'Otra': 10, 'Nueva': 20})
+        self.assertEqual(size, 3)
+
+    def test_upsert_of_existing_and_repeated_rows(self):
+        summary, views, size = self.run_import('upsert')
+        # Vieja se actualiza una vez con la última fila; la primera cuenta como omitida
+        self.assertEqual((summary['imported'], summary['duplicates'], summary['updated']), (1, 1, 3))
+        self.assertEqual(views, {'Vieja': 700, 'Otra': 40, 'Nueva': 30})
+        self.assertEqual(size, 3)
+
+    def test_insert(self):
+        summary, _, size = self.run_import('insert')
+        self.assertEqual((summary['imported'], summary['duplicates'], summary['updated']), (5, 0, 0))
+        self.assertEqual(size, 7)
+
+    def test_rejected_rows_file(self):
+        summary, _, _ = self.run_import('skip')
+        self.assertEqual(summary['rejected'], 1)
+        self.assertEqual(summary['rejected_path'], str(self.rejected_path))
+        with open(self.rejected_path, newline='', encoding='utf-8') as file:
+            rows = list(csv.reader(file))
+        self.assertEqual(rows[0], IMPORT_HEADER + ['Motivo'])
+        self.assertEqual(rows[1][:-1], self.ROWS[-1])
+        self.assertEqual(rows[1][-1], "Error: Los likes no pueden ser más que las vistas.")
+
+    def test_parallel_chunks_match_serial(self):
+        original = self.csv_path.read_bytes()
+        results = []
+        for workers in (1, 2):
+            # Volver al catálogo de partida, sin los archivos auxiliares de la corrida anterior
+            for auxiliary in (final.snapshot_path, final.wal_path, final.index_meta_path):
+                auxiliary(self.csv_path).unlink(missing_ok=True)
+            self.csv_path.write_bytes(original)
+            summary, _, _ = self.run_import('upsert', workers=workers, chunk_size=2)
+            results.append(({key: summary[key] for key in ('imported', 'rejected', 'duplicates', 'updated')},
+                            self.csv_path.read_bytes(), self.rejected_path.read_bytes()))
+        self.assertEqual(results[1], results[0])
+
+if __name__ == '__main__':
+    unittest.main()
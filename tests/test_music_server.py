@@ -0,0 +1,58 @@
+"""Inserciones de music_server.py cuando el fsync del WAL falla."""
+import asyncio
+import csv
+import json
+import pathlib
+import sys
+import tempfile
+import unittest
+from http import HTTPStatus
+from unittest import mock
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+import final  # noqa: E402
+import music_server  # noqa: E402
+
+SONG = {'artist': 'Artista', 'track': 'Tema', 'album': 'Album', 'duration_ms': 200000,
+        'likes': 1, 'views': 10}
+
+class InsertCommitTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        csv_path = pathlib.Path(self.tmp.name) / 'music.csv'
+        with open(csv_path, 'w', newline='', encoding='utf-8') as file:
+            csv.writer(file).writerow(final.FIELDNAMES)
+        self.catalog = final.SongCatalog(csv_path, use_snapshot=False)
+        self.service = music_server.MusicService(self.catalog)
+
+    def tearDown(self):
+        self.service.executor.shutdown()
+        self.catalog.close()
+        self.tmp.cleanup()
+
+    def post(self):
+        body = json.dumps(SONG).encode('utf-8')
+        return asyncio.run(self.service.handle('POST', '/songs', body))
+
+    def test_failed_fsync_reports_the_song_as_stored(self):
+        with mock.patch.object(final.os, 'fsync', side_effect=OSError("disco lleno")):
+            path, status, payload = self.post()
+        self.assertEqual(status, HTTPStatus.CREATED)
+        self.assertIn('disco lleno', payload['warning'])
+        self.assertEqual([song.track for song in self.catalog.songs], ['Tema'])
+
+        # El reintento del cliente no duplica la canción
+        with self.assertRaises(music_server.HttpError) as raised:
+            self.post()
+        self.assertEqual(raised.exception.status, HTTPStatus.CONFLICT)
+        self.assertEqual(self.catalog.log.syncs, 0)
+
+    def test_successful_insert_has_no_warning(self):
+        path, status, payload = self.post()
+        self.assertEqual(status, HTTPStatus.CREATED)
+        self.assertNotIn('warning', payload)
+        self.assertEqual(self.catalog.log.syncs, 1)
+
+if __name__ == '__main__':
+    unittest.main()
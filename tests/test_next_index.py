@@ -0,0 +1,60 @@
+"""tail_next_index de final.py frente a recorrer todo el CSV con DictReader."""
+import csv
+import pathlib
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+import final  # noqa: E402
+
+def linear_next_index(file_path: pathlib.Path) -> int:
+    """Como el get_next_index original: el mayor Index numérico más uno"""
+    with open(file_path, newline='', encoding='utf-8') as file:
+        indexes = [int(row['Index']) for row in csv.DictReader(file)
+                   if (row.get('Index') or '').strip().isdigit()]
+    return max(indexes, default=-1) + 1
+
+class TailNextIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.csv_path = pathlib.Path(self.tmp.name) / 'music.csv'
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, header: list, rows: list) -> None:
+        with open(self.csv_path, 'w', newline='', encoding='utf-8') as file:
+            writer = csv.writer(file, lineterminator='\n')
+            writer.writerow(header)
+            writer.writerows(rows)
+
+    def check(self, expected: int) -> None:
+        self.assertEqual(linear_next_index(self.csv_path), expected)
+        for block_size in (16, 64 * 1024):
+            self.assertEqual(final.tail_next_index(self.csv_path, block_size), expected)
+
+    def test_full_rows(self):
+        rows = [[str(i), f"Artista {i}"] + [''] * (len(final.FIELDNAMES) - 2) for i in range(200)]
+        self.write(final.FIELDNAMES, rows)
+        self.check(200)
+
+    def test_index_column_from_the_header(self):
+        rows = [[f"Artista {i}", 'Tema', str(i)] for i in range(50)]
+        self.write(['Artist', 'Track', 'Index', 'Views'], rows)
+        self.check(50)
+
+    def test_short_and_long_rows(self):
+        # Filas con menos o más campos que el encabezado, como las acepta DictReader
+        rows = [[str(i), 'Artista'] for i in range(30)] + [['30', 'Artista', 'x', 'y', 'z', 'extra']]
+        rows += [['Artista sin Index'], ['']]
+        self.write(['Index', 'Artist', 'Track'], rows)
+        self.check(31)
+
+    def test_without_index_column(self):
+        self.write(['Artist', 'Track'], [['Artista', '7']])
+        self.check(0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+"""Invalidación de QueryCache en final.py: por canción y por generación."""
+import csv
+import pathlib
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+import final  # noqa: E402
+
+def song_data(artist: str, track: str, views: str = '10') -> dict:
+    return {'artist': artist, 'track': track, 'album': 'Album', 'spotify_uri': '',
+            'duration_ms': '200000', 'spotify_url': '', 'youtube_url': '', 'likes': '1', 'views': views}
+
+class QueryCacheTest(unittest.TestCase):
+    def test_put_from_an_old_generation_is_dropped(self):
+        cache = final.QueryCache()
+        generation = cache.generation
+        cache.invalidate_song(final.SongDto('Otro', 'Tema', '', '', 0, '', '', 0))
+        cache.put('search', 'tema', [1, 2], generation)
+        self.assertIsNone(cache.get('search', 'tema'))
+        cache.put('search', 'tema', [1, 2], cache.generation)
+        self.assertEqual(cache.get('search', 'tema'), [1, 2])
+
+    def test_invalidate_song_only_drops_reachable_queries(self):
+        cache = final.QueryCache()
+        for command, term in [('search', 'luna'), ('search', 'sol'), ('top', 'lun'), ('albums', 'mar')]:
+            cache.put(command, term, [0])
+        cache.invalidate_song(final.SongDto('Luna', 'Mar azul', '', '', 0, '', '', 0))
+        # 'mar' está en el título pero albums solo depende del artista
+        self.assertEqual([cache.get(c, t) for c, t in [('search', 'luna'), ('search', 'sol'),
+                                                      ('top', 'lun'), ('albums', 'mar')]],
+                         [None, [0], None, [0]])
+        self.assertEqual(cache.stats()['invalidations'], 2)
+
+class CatalogCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.csv_path = pathlib.Path(self.tmp.name) / 'music.csv'
+        with open(self.csv_path, 'w', newline='', encoding='utf-8') as file:
+            writer = csv.DictWriter(file, fieldnames=final.FIELDNAMES, lineterminator='\n')
+            writer.writeheader()
+            writer.writerows(final.build_song_row(i, song_data(f"Artista {i % 3}", f"Tema {i}"))
+                             for i in range(30))
+        self.catalog = final.SongCatalog(self.csv_path, use_snapshot=False)
+
+    def tearDown(self):
+        self.catalog.close()
+        self.tmp.cleanup()
+
+    def tracks(self, term: str) -> list:
+        return [song.track for song in self.catalog.search(term)]
+
+    def test_insert_during_a_search_is_not_cached_stale(self):
+        results = self.catalog.search('tema')
+        next(results)
+        self.catalog.insert_rows([final.build_song_row(30, song_data('Artista 0', 'Tema nuevo', '99'))])
+        list(results)  # Termina con la generación vieja: no debe quedar en la caché
+        self.assertIn('Tema nuevo', self.tracks('tema'))
+        self.assertEqual(self.tracks('tema'), self.tracks('tema'))
+        self.assertGreater(self.catalog.cache.hits, 0)
+
+    def test_updates_clear_cached_top(self):
+        self.assertEqual(self.catalog.top_songs('Artista 1', 1)[0].track, 'Tema 1')
+        self.catalog.update_counts({28: (5_000, 0, 0)})
+        self.assertEqual(self.catalog.top_songs('Artista 1', 1)[0].track, 'Tema 28')
+
+    def test_unrelated_queries_survive_an_insert(self):
+        self.tracks('artista 2')
+        hits = self.catalog.cache.hits
+        self.catalog.insert_rows([final.build_song_row(30, song_data('Otra', 'Cancion', '99'))])
+        self.tracks('artista 2')
+        self.assertEqual(self.catalog.cache.hits, hits + 1)
+
+if __name__ == '__main__':
+    unittest.main()
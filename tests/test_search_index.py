@@ -0,0 +1,65 @@
+"""SearchIndex de final.py frente a la búsqueda lineal original."""
+import pathlib
+import random
+import sys
+import unittest
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+import final  # noqa: E402
+
+WORDS = ['amor', 'Ánimo', 'noche', 'baile', 'sol', 'luna', 'Björk', 'ab', 'x']
+QUERIES = ['a', 'ab', 'amo', 'anim', 'ánimo', 'noche sol', 'bjork', 'bjö', 'luna b', 'x', 'zzz', 'ol l', 'e']
+
+def random_song(rng: random.Random) -> final.SongDto:
+    artist = ' '.join(rng.choices(WORDS, k=rng.randint(1, 2)))
+    track = ' '.join(rng.choices(WORDS, k=rng.randint(1, 3)))
+    # Pocas popularidades distintas para que haya empates (se desempatan por fila)
+    return final.SongDto(artist, track, 'Album', '', 1000, '', '', rng.randint(0, 5), 0, rng.randint(0, 5))
+
+def linear_search(store: final.SongStore, query: str) -> list:
+    """Búsqueda original: recorrer todo y ordenar por popularidad (estable por fila)"""
+    term = final.normalize_text(query)
+    matches = [row_id for row_id, song in enumerate(store)
+               if term in final.normalize_text(song.artist) or term in final.normalize_text(song.track)]
+    return sorted(matches, key=lambda row_id: -store.popularity(row_id))
+
+class SearchIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.rng = random.Random(7)
+        self.store = final.SongStore(random_song(self.rng) for _ in range(300))
+        self.index = final.SearchIndex(self.store)
+
+    def assert_matches_linear(self):
+        for query in QUERIES:
+            self.assertEqual(list(self.index.search(query)), linear_search(self.store, query), query)
+
+    def test_build(self):
+        self.assert_matches_linear()
+
+    def test_incremental_inserts(self):
+        for _ in range(20):
+            row_id = self.store.append(random_song(self.rng))
+            self.index.add_rows(self.store, range(row_id, row_id + 1))
+        self.assert_matches_linear()
+        # Un lote grande rearma las listas en una sola pasada
+        start = len(self.store)
+        for _ in range(1_000):
+            self.store.append(random_song(self.rng))
+        self.index.add_rows(self.store, range(start, len(self.store)))
+        self.assert_matches_linear()
+
+    def test_update_key(self):
+        for row_id in self.rng.sample(range(len(self.store)), 30):
+            self.store.set_counts(row_id, self.rng.randint(0, 9), 0, 0)
+            self.index.update_key(row_id, self.store.popularity(row_id))
+        self.assert_matches_linear()
+        # Más de 1.000 cambios: update_keys rearma las listas
+        changed = {row_id: self.rng.randint(0, 9) for row_id in range(len(self.store))}
+        for row_id, views in changed.items():
+            self.store.set_counts(row_id, views, 0, 0)
+        self.index.update_keys({row_id: self.store.popularity(row_id) for row_id in changed})
+        self.assert_matches_linear()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+"""Validez del snapshot binario de final.py frente a cambios en music.csv."""
+import csv
+import pathlib
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+import final  # noqa: E402
+
+ROWS = 3_000
+
+def song_data(track: str) -> dict:
+    return {'artist': 'Artista', 'track': track, 'album': 'Album', 'spotify_uri': '',
+            'duration_ms': '200000', 'spotify_url': '', 'youtube_url': '', 'likes': '1', 'views': '10'}
+
+class SnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.csv_path = pathlib.Path(self.tmp.name) / 'music.csv'
+        with open(self.csv_path, 'w', newline='', encoding='utf-8') as file:
+            writer = csv.DictWriter(file, fieldnames=final.FIELDNAMES, lineterminator='\n')
+            writer.writeheader()
+            writer.writerows(final.build_song_row(i, song_data(f"T{i:05d}")) for i in range(ROWS))
+        final.load_song_store(self.csv_path)
+        self.assertTrue(final.snapshot_path(self.csv_path).exists())
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def tracks(self) -> list:
+        store, _ = final.load_song_store(self.csv_path)
+        return [song.track for song in store]
+
+    def test_append_uses_the_snapshot(self):
+        with open(self.csv_path, 'a', newline='', encoding='utf-8') as file:
+            csv.DictWriter(file, fieldnames=final.FIELDNAMES, lineterminator='\n').writerow(
+                final.build_song_row(ROWS, song_data('Nueva')))
+        self.assertIsNotNone(final.read_snapshot(self.csv_path))
+        self.assertEqual(self.tracks()[-2:], [f"T{ROWS - 1:05d}", 'Nueva'])
+
+    def test_mid_file_edit_plus_append_is_detected(self):
+        # Editar una fila del medio sin cambiar el tamaño y luego agregar otra
+        text = self.csv_path.read_text(encoding='utf-8').replace('T01500', 'X01500')
+        text += 'Artista,Nueva\n'
+        self.csv_path.write_text(text, encoding='utf-8')
+        self.assertIsNone(final.read_snapshot(self.csv_path))
+        self.assertIn('X01500', self.tracks())
+
+class CatalogSnapshotTest(unittest.TestCase):
+    """El catálogo guarda sus índices en el snapshot y debe responder igual que sin él"""
+
+    QUERIES = ['t0', 'T01', '99', 'nueva', 'a', 'artista']
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.csv_path = pathlib.Path(self.tmp.name) / 'music.csv'
+        with open(self.csv_path, 'w', newline='', encoding='utf-8') as file:
+            writer = csv.DictWriter(file, fieldnames=final.FIELDNAMES, lineterminator='\n')
+            writer.writeheader()
+            rows = [final.build_song_row(i, song_data(f"T{i:05d}")) for i in range(300)]
+            for i, row in enumerate(rows):
+                row['Artist'] = f"Artista {i % 7}"
+                row['Views'] = str(i * 37 % 101)
+            writer.writerows(rows)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def answers(self, use_snapshot: bool) -> list:
+        catalog = final.SongCatalog(self.csv_path, use_snapshot=use_snapshot)
+        try:
+            return [(list(catalog.search(q)), catalog.top_songs(q, 10), catalog.albums(q)) for q in self.QUERIES]
+        finally:
+            catalog.close()
+
+    def test_indexes_are_saved_and_reused(self):
+        expected = self.answers(use_snapshot=False)
+        self.assertEqual(self.answers(use_snapshot=True), expected)
+        self.assertTrue(final.read_snapshot(self.csv_path)[3])
+        self.assertEqual(self.answers(use_snapshot=True), expected)
+
+    def test_appended_rows_extend_the_saved_indexes(self):
+        self.answers(use_snapshot=True)
+        with open(self.csv_path, 'a', newline='', encoding='utf-8') as file:
+            row = final.build_song_row(300, song_data('Nueva'))
+            row['Artist'] = 'Artista nueva'
+            row['Views'] = '1000'
+            csv.DictWriter(file, fieldnames=final.FIELDNAMES, lineterminator='\n').writerow(row)
+        self.assertEqual(self.answers(use_snapshot=True), self.answers(use_snapshot=False))
+
+    def test_wal_rows_and_updates_on_top_of_the_saved_indexes(self):
+        self.answers(use_snapshot=True)
+        catalog = final.SongCatalog(self.csv_path)
+        catalog.insert_rows([final.build_song_row(300, song_data('Nueva'))])
+        catalog.update_counts({5: (5_000, 0, 0), 6: (0, 0, 0)})
+        catalog.close()
+        self.assertEqual(self.answers(use_snapshot=True), self.answers(use_snapshot=False))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+"""TitleIndex de Peliculas_csv/Programa1.py frente a recorrer todos los títulos."""
+import pathlib
+import random
+import sys
+import unittest
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / 'Peliculas_csv'))
+
+import Programa1  # noqa: E402
+
+PALABRAS = ['amor', 'guerra', 'noche', 'El', 'la', 'Ciudad', 'perdida', 'Canción', 'del', 'mar', 'x']
+
+def random_movies(count: int, seed: int = 16) -> list:
+    rng = random.Random(seed)
+    return [Programa1.MovieDto(' '.join(rng.choice(PALABRAS) for _ in range(rng.randint(1, 4))),
+                               '2000', '13+', '50/100', True, False, False, False)
+            for _ in range(count)]
+
+def linear_search(movies: list, consulta: str) -> list:
+    """Subcadena como el buscar_por_titulo original, más la similitud por trigramas de todos los títulos"""
+    termino = Programa1.normalizar(consulta.strip())
+    gramas = Programa1.TitleIndex._gramas(termino)
+    resultados = []
+    for i, movie in enumerate(movies):
+        texto = Programa1.normalizar(movie.title)
+        if termino in texto:
+            resultados.append((i, 1.0, True))
+        elif len(termino) >= Programa1.TitleIndex.NGRAM:
+            similitud = sum(grama in texto for grama in gramas) / len(gramas)
+            if similitud >= Programa1.TitleIndex.SIMILITUD_MINIMA:
+                resultados.append((i, similitud, False))
+    return resultados
+
+class TitleIndexTest(unittest.TestCase):
+    CONSULTAS = ['amor', 'Guerra', 'cancion', 'ciudad perdida', 'el', 'x', 'noche del mr', 'gerra', 'zzz', '']
+
+    def check(self, movies: list, indice: Programa1.TitleIndex) -> None:
+        for consulta in self.CONSULTAS:
+            self.assertEqual(sorted(indice.buscar(consulta)), linear_search(movies, consulta), consulta)
+
+    def test_construido_y_agregando(self):
+        movies = random_movies(600)
+        self.check(movies[:400], Programa1.TitleIndex(movies[:400]))
+        indice = Programa1.TitleIndex(movies[:400])
+        for movie in movies[400:]:
+            indice.agregar(movie)
+        self.check(movies, indice)
+
+    def test_subcadenas_como_la_lista(self):
+        movies = random_movies(300)
+        catalogo = Programa1.MovieCatalog(movies)
+        for consulta in self.CONSULTAS:
+            _, encontrados = catalogo.buscar_titulo(consulta)
+            exactos = [m for m, _, subcadena in encontrados if subcadena]
+            esperados = [m for m in movies if consulta.lower().strip() in Programa1.normalizar(m.title)]
+            self.assertCountEqual(exactos, esperados, consulta)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+"""Recuperación y reaplicación del WAL de final.py (caídas a mitad de compactar, registros # y =)."""
+import csv
+import os
+import pathlib
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+import final  # noqa: E402
+
+def song_data(track: str) -> dict:
+    return {'artist': 'Artista', 'track': track, 'album': 'Álbum', 'spotify_uri': '',
+            'duration_ms': '200000', 'spotify_url': '', 'youtube_url': '', 'likes': '1', 'views': '10'}
+
+class CrashBetweenRenamesTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.csv_path = pathlib.Path(self.tmp.name) / 'music.csv'
+        with open(self.csv_path, 'w', newline='', encoding='utf-8') as file:
+            csv.writer(file).writerow(final.FIELDNAMES)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def csv_tracks(self) -> list:
+        with open(self.csv_path, newline='', encoding='utf-8') as file:
+            return [row['Track'] for row in csv.DictReader(file)]
+
+    def test_rows_folded_before_the_crash_are_not_duplicated(self):
+        catalog = final.SongCatalog(self.csv_path, use_snapshot=False)
+        catalog.insert_rows([final.build_song_row(0, song_data('T0')),
+                             final.build_song_row(1, song_data('T1'))])
+        self.assertEqual([song.track for song in catalog.songs], ['T0', 'T1'])
+
+        # El CSV nuevo queda en su lugar, pero la caída llega antes de reemplazar el WAL
+        real_replace = os.replace
+        wal = str(final.wal_path(self.csv_path))
+
+        def crash_on_wal(source, target):
+            if str(target) == wal:
+                raise OSError("caída simulada")
+            real_replace(source, target)
+
+        with mock.patch.object(final.os, 'replace', crash_on_wal):
+            with self.assertRaises(OSError):
+                catalog.compact()
+        catalog.log.close()
+        self.assertEqual(self.csv_tracks(), ['T0', 'T1'])
+        self.assertTrue(final.read_wal(final.wal_path(self.csv_path))[0])
+
+        reloaded = final.SongCatalog(self.csv_path, use_snapshot=False)
+        self.assertEqual([song.track for song in reloaded.songs], ['T0', 'T1'])
+        self.assertEqual(reloaded.next_index(), 2)
+        reloaded.compact()
+        reloaded.close()
+        self.assertEqual(self.csv_tracks(), ['T0', 'T1'])
+
+class WalReplayTest(unittest.TestCase):
+    """Las inserciones (#) y actualizaciones (=) del WAL se reaplican igual al volver a cargar"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.csv_path = pathlib.Path(self.tmp.name) / 'music.csv'
+        with open(self.csv_path, 'w', newline='', encoding='utf-8') as file:
+            writer = csv.DictWriter(file, fieldnames=final.FIELDNAMES, lineterminator='\n')
+            writer.writeheader()
+            writer.writerows(final.build_song_row(i, song_data(f"T{i}")) for i in range(3))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def counts(self, catalog) -> list:
+        return [(song.track, song.views, song.likes, song.stream) for song in catalog.songs]
+
+    def test_inserts_and_updates_are_replayed(self):
+        catalog = final.SongCatalog(self.csv_path, use_snapshot=False)
+        catalog.insert_rows([final.build_song_row(3, song_data('T3')), final.build_song_row(4, song_data('T4'))])
+        # Una fila del CSV y una que solo está en el WAL, la segunda actualizada dos veces
+        catalog.update_counts({1: (100, 5, 7), 4: (50, 2, 0)})
+        catalog.update_counts({4: (60, 3, 1)})
+        expected = [('T0', 10, 1, 0), ('T1', 100, 5, 7), ('T2', 10, 1, 0), ('T3', 10, 1, 0), ('T4', 60, 3, 1)]
+        self.assertEqual(self.counts(catalog), expected)
+        catalog.log.close()
+
+        records, _ = final.read_wal(final.wal_path(self.csv_path))
+        self.assertEqual([kind for kind, _ in records], [final.WAL_INSERT, final.WAL_UPDATE, final.WAL_UPDATE])
+
+        reloaded = final.SongCatalog(self.csv_path, use_snapshot=False)
+        self.assertEqual(self.counts(reloaded), expected)
+        self.assertEqual(reloaded.next_index(), 5)
+        self.assertEqual([song.track for song in reloaded.top_songs('Artista', 2)], ['T1', 'T4'])
+        reloaded.compact()
+        reloaded.close()
+        compacted = final.SongCatalog(self.csv_path, use_snapshot=False)
+        self.assertEqual(self.counts(compacted), expected)
+        self.assertEqual(final.read_wal(final.wal_path(self.csv_path))[0], [])
+        compacted.close()
+
+    def test_cut_record_is_ignored(self):
+        catalog = final.SongCatalog(self.csv_path, use_snapshot=False)
+        catalog.update_counts({0: (100, 5, 7)})
+        catalog.update_counts({2: (200, 5, 7)})
+        catalog.log.close()
+        wal = final.wal_path(self.csv_path)
+        wal.write_bytes(wal.read_bytes()[:-3])  # La segunda actualización quedó a medias
+
+        reloaded = final.SongCatalog(self.csv_path, use_snapshot=False)
+        self.assertEqual(self.counts(reloaded),
+                         [('T0', 100, 5, 7), ('T1', 10, 1, 0), ('T2', 10, 1, 0)])
+        reloaded.close()
+
+if __name__ == '__main__':
+    unittest.main()